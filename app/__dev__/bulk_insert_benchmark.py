@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+""" Benchmark for db.add_tweets.
+
+    Compares the original ORM session.add path with the bulk upsert
+    path, which uses a Core insert executemany, or COPY FROM STDIN when
+    the database is PostgreSQL with a psycopg2 driver.
+
+    Usage:
+        python -m app.__dev__.bulk_insert_benchmark [tweet_count] [db_url]
+
+    db_url defaults to an in-memory SQLite database.  Tables in the
+    database are dropped and created for each run.
+"""
+
+# Imports - Python Standard Library
+from sys import argv
+from time import perf_counter
+from typing import Callable, List
+
+# Imports - Third-Party
+from sqlalchemy import create_engine, func
+from sqlalchemy.orm import Session
+from tweepy.models import Status
+
+# Imports - Local
+from app.db.db import add_tweets
+from app.db.db_models import BASE, TweetData
+from app.tweeter.local_api import synthetic_corpus
+
+# Constants
+ACCOUNTS = 10
+BENCHMARK_DB_URL = 'sqlite://'
+TWEET_COUNT = 100000
+
+
+# Functions
+def orm_add_tweets(
+    tweets: List,
+    session: Session
+) -> None:
+    """ Original add_tweets, which adds one ORM instance per tweet. """
+
+    for tweet in tweets:
+        session.add(instance=TweetData(
+                    tweet_id=tweet.id,
+                    tweet_text=tweet.text,
+                    created=tweet.created_at,
+                    likes=tweet.favorite_count,
+                    retweets=tweet.retweet_count)
+                    )
+
+    session.commit()
+
+    return None
+
+
+def bulk_add_tweets(
+    tweets: List,
+    session: Session
+) -> None:
+    """ Current add_tweets, which writes chunked bulk upserts. """
+
+    add_tweets(tweets=tweets, session=session)
+
+    return None
+
+
+def benchmark(
+    name: str,
+    writer: Callable,
+    tweets: List,
+    db_url: str
+) -> None:
+    """ Time a tweet writer against empty tables. """
+
+    engine = create_engine(db_url)
+    BASE.metadata.drop_all(engine)
+    BASE.metadata.create_all(engine)
+
+    with Session(bind=engine) as session:
+        start = perf_counter()
+        writer(tweets=tweets, session=session)
+        elapsed = perf_counter() - start
+
+        rows = session.query(func.count(TweetData.id)).scalar()
+
+    engine.dispose()
+
+    assert rows == len(tweets)
+    print(f'{name:<32} {elapsed:8.3f}s {len(tweets) / elapsed:10.0f} rows/s')
+
+    return None
+
+
+def main() -> None:
+    """ Main program. """
+
+    tweet_count = int(argv[1]) if len(argv) > 1 else TWEET_COUNT
+    db_url = argv[2] if len(argv) > 2 else BENCHMARK_DB_URL
+
+    corpus = synthetic_corpus(
+        accounts=[f'account_{index}' for index in range(ACCOUNTS)],
+        tweets=tweet_count // ACCOUNTS
+    )
+    tweets = [
+        Status.parse(api=None, json=tweet)
+        for timeline in corpus.values()
+        for tweet in timeline
+    ]
+
+    dialect = create_engine(db_url).dialect
+    bulk_name = 'bulk upsert, COPY FROM STDIN' if (
+        dialect.name == 'postgresql' and dialect.driver == 'psycopg2'
+    ) else 'bulk upsert, executemany'
+
+    print(f'{len(tweets)} tweets, {dialect.name}+{dialect.driver}')
+    benchmark('ORM session.add (original)', orm_add_tweets, tweets, db_url)
+    benchmark(bulk_name, bulk_add_tweets, tweets, db_url)
+
+    return None
+
+
+if __name__ == '__main__':
+    main()
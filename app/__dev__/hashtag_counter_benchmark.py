@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+""" Benchmark for tweeter.hashtag_counter.
+
+    Compares the original joined-string hashtag counter with the
+    streaming counter, with and without Twitter hashtag entities, and
+    with the parallel counter, on a synthetic corpus from
+    app.tweeter.local_api.
+
+    Usage:
+        python -m app.__dev__.hashtag_counter_benchmark [tweet_count]
+"""
+
+# Imports - Python Standard Library
+from collections import Counter
+from sys import argv
+from time import perf_counter
+from typing import Callable, Dict, Iterable
+import tracemalloc
+
+# Imports - Third-Party
+from tweepy.models import Status
+
+# Imports - Local
+from app.db.db import VALID_HASHTAG
+from app.tweeter.local_api import synthetic_corpus
+from app.tweeter.tweeter import hashtag_counter, parallel_hashtag_counter
+
+# Constants
+ACCOUNTS = 10
+TEXT_PADDING = (
+    'Combining strategy and execution to help customers make a new world '
+    'happen, with insights from our experts and partners. '
+)  # Brings synthetic tweets closer to the length of real tweets
+TWEET_COUNT = 200000
+
+
+# Functions
+def joined_hashtag_counter(
+    tweets: Iterable
+) -> Dict:
+    """ Original hashtag_counter, which joins all tweet text first. """
+
+    tweet_text = ' '.join(tweet.text.lower() for tweet in tweets)
+    hashtag_count = Counter(VALID_HASHTAG.findall(tweet_text)).most_common()
+    hashtag_count = dict(hashtag_count)
+
+    return hashtag_count
+
+
+def benchmark(
+    name: str,
+    counter: Callable,
+    tweets: Iterable
+) -> Dict:
+    """ Time a hashtag counter, and measure its peak memory use. """
+
+    # Time without tracing, since tracemalloc slows every allocation
+    start = perf_counter()
+    hashtag_count = counter(tweets)
+    elapsed = perf_counter() - start
+
+    tracemalloc.start()
+    counter(tweets)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    print(f'{name:<28} {elapsed:8.3f}s {peak / 2 ** 20:10.2f} MiB peak')
+
+    return hashtag_count
+
+
+def main() -> None:
+    """ Main program. """
+
+    tweet_count = int(argv[1]) if len(argv) > 1 else TWEET_COUNT
+    corpus = synthetic_corpus(
+        accounts=[f'account_{index}' for index in range(ACCOUNTS)],
+        tweets=tweet_count // ACCOUNTS
+    )
+
+    # Parse tweets with entities, and copies without them for the regex path
+    tweets = [
+        Status.parse(
+            api=None,
+            json=dict(tweet, text=TEXT_PADDING + tweet['text'])
+        )
+        for timeline in corpus.values()
+        for tweet in timeline
+    ]
+    text_tweets = [
+        Status.parse(api=None, json={'text': tweet.text}) for tweet in tweets
+    ]
+
+    print(f'{len(tweets)} tweets')
+    joined = benchmark('joined string (original)', joined_hashtag_counter,
+                       text_tweets)
+    regex = benchmark('streaming, text regex', hashtag_counter, text_tweets)
+    entities = benchmark('streaming, entities', hashtag_counter, tweets)
+    parallel = benchmark('parallel, process pool', parallel_hashtag_counter,
+                         [tweet.text for tweet in text_tweets])
+
+    assert joined == regex == entities == parallel
+
+    return None
+
+
+if __name__ == '__main__':
+    main()
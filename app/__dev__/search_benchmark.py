@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+""" Benchmark for db.search_tweets.
+
+    Loads a synthetic corpus from app.tweeter.local_api into a
+    database, and times searches for common, rare, and misspelled
+    words.
+
+    Usage:
+        python -m app.__dev__.search_benchmark [tweet_count] [db_url]
+
+    db_url defaults to an SQLite database file in the temporary
+    directory.  Tables in the database are dropped and created.
+"""
+
+# Imports - Python Standard Library
+from os.path import join
+from statistics import median
+from sys import argv
+from tempfile import gettempdir
+from time import perf_counter
+
+# Imports - Third-Party
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from tweepy.models import Status
+
+# Imports - Local
+from app.db.db import add_tweets, search_tweets
+from app.db.db_models import BASE
+from app.tweeter.local_api import synthetic_corpus
+
+# Constants
+ACCOUNTS = 10
+BENCHMARK_DB_URL = f'sqlite:///{join(gettempdir(), "search_benchmark.db")}'
+REPEATS = 20
+SEARCHES = ['cloud', 'security devops', '12345 account_3', 'secu']
+TWEET_COUNT = 1000000
+
+
+# Functions
+def main() -> None:
+    """ Main program. """
+
+    tweet_count = int(argv[1]) if len(argv) > 1 else TWEET_COUNT
+    db_url = argv[2] if len(argv) > 2 else BENCHMARK_DB_URL
+
+    engine = create_engine(db_url)
+    BASE.metadata.drop_all(engine)
+    BASE.metadata.create_all(engine)
+
+    with Session(bind=engine) as session:
+        # Load the corpus one account at a time, to bound memory use
+        for screen_name, timeline in synthetic_corpus(
+            accounts=[f'account_{index}' for index in range(ACCOUNTS)],
+            tweets=tweet_count // ACCOUNTS
+        ).items():
+            add_tweets(
+                tweets=[
+                    Status.parse(api=None, json=tweet) for tweet in timeline
+                ],
+                screen_name=screen_name,
+                session=session
+            )
+
+        print(f'{tweet_count} tweets, {engine.dialect.name}')
+
+        for query in SEARCHES:
+            timings = []
+            for _ in range(REPEATS):
+                start = perf_counter()
+                tweets = search_tweets(query=query, session=session)
+                timings.append(perf_counter() - start)
+
+            print(
+                f'{query!r:<16} {len(tweets):3} results '
+                f'{median(timings) * 1000:8.2f} ms median'
+            )
+
+    return None
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+""" Read-through query result cache for ww-tweeter.
+
+    Results of get_hashtags and get_tweets are kept in memory, keyed by
+    function and arguments, until the dataset version written by ingest
+    changes.  The version is a single row primary key read, checked on
+    every lookup, so results are never older than the latest ingest.
+
+    Usage:
+        from app.db import cache
+
+        hashtags = cache.get_hashtags()
+        tweets = cache.get_tweets(search_tag='#wwt', limit=50)
+"""
+
+# Imports - Python Standard Library
+from collections import OrderedDict
+from datetime import datetime
+from functools import wraps
+from os import getenv
+from threading import Lock
+from time import monotonic
+from typing import Callable, Dict, Hashable, Tuple, Union
+
+# Imports - Third-Party
+import sqlalchemy
+
+# Imports - Local
+from app.db import db
+
+# Constants
+CACHE_MISSING = object()  # Sentinel for keys that are not in the cache
+CACHE_SIZE = int(getenv(key='CACHE_SIZE', default='256'))  # Cached results
+CACHE_VERSION_TTL = float(
+    getenv(key='CACHE_VERSION_TTL', default='0')
+)  # Seconds between dataset version checks, 0 checks on every lookup
+
+
+# Functions
+def _dataset_version() -> Tuple[int, Union[datetime, None]]:
+    """ Get the dataset version with the session of the current thread.
+
+        Args:
+            None.
+
+        Returns:
+            version, updated (Tuple[int, Union[datetime, None]]):
+                Dataset version number and update time, from
+                db.get_dataset_version.
+    """
+
+    version, updated = db.get_dataset_version(session=db.session)
+
+    return version, updated
+
+
+def _detach(
+    result: object
+) -> object:
+    """ Detach ORM instances in a result from their session.
+
+        Cached instances outlive the session that loaded them, so they
+        are expunged to keep a later commit or close of that session
+        from expiring their attributes.
+
+        Args:
+            result (object):
+                Query result, such as a list of Hashtag objects.
+
+        Returns:
+            result (object):
+                The same result, with its instances detached.
+    """
+
+    instances = result if isinstance(result, list) else [result]
+
+    for instance in instances:
+        state = sqlalchemy.inspect(instance, raiseerr=False)
+        if state is not None and state.session is not None:
+            state.session.expunge(instance)
+
+    return result
+
+
+# Classes
+class QueryCache:
+    """ Thread-safe LRU cache of query results, invalidated by version.
+
+        Holds at most maxsize results, and evicts the least recently
+        used result when full.  The dataset version is checked on every
+        lookup, or at most once every version_ttl seconds when it is
+        set, and the cache is cleared when it changes.  Results are
+        never older than the latest ingest, or by up to version_ttl
+        seconds when it is set.
+    """
+
+    def __init__(
+        self,
+        get_version: Callable = _dataset_version,
+        maxsize: int = CACHE_SIZE,
+        version_ttl: float = CACHE_VERSION_TTL
+    ) -> None:
+        """ Class initialization method.
+
+            Args:
+                get_version (Callable, optional):
+                    Function that returns the current dataset version.
+                    Default value is _dataset_version.
+
+                maxsize (int, optional):
+                    Maximum number of cached results.  Default value is
+                    CACHE_SIZE.
+
+                version_ttl (float, optional):
+                    Seconds between dataset version checks, which
+                    results and versions may be out of date by.
+                    Default value is CACHE_VERSION_TTL, 0 checks the
+                    version on every call.
+
+            Returns:
+                None.
+        """
+
+        self.get_version = get_version
+        self.maxsize = maxsize
+        self.version_ttl = version_ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key: result, least recent first
+        self._lock = Lock()
+        self._version = None
+        self._version_expires = 0.0
+
+        return None
+
+    def version(self) -> Hashable:
+        """ Get the dataset version, clearing the cache if it changed.
+
+            Args:
+                None.
+
+            Returns:
+                version (Hashable):
+                    Current dataset version.
+        """
+
+        now = monotonic()
+        if now < self._version_expires:
+            return self._version
+
+        # Look up the version outside the lock, so readers are not blocked
+        version = self.get_version()
+
+        with self._lock:
+            if version != self._version:
+                self._entries.clear()
+                self._version = version
+            self._version_expires = now + self.version_ttl
+
+        return version
+
+    def invalidate(self) -> None:
+        """ Check the dataset version on the next call.
+
+            Args:
+                None.
+
+            Returns:
+                None.
+        """
+
+        self._version_expires = 0.0
+
+        return None
+
+    def get(
+        self,
+        key: Hashable
+    ) -> object:
+        """ Get a cached result, and mark it as most recently used.
+
+            Args:
+                key (Hashable):
+                    Cache key, from make_key.
+
+            Returns:
+                result (object):
+                    Cached result, or CACHE_MISSING.
+        """
+
+        with self._lock:
+            result = self._entries.get(key, CACHE_MISSING)
+
+            if result is CACHE_MISSING:
+                self.misses += 1
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+
+        return result
+
+    def set(
+        self,
+        key: Hashable,
+        result: object,
+        version: Hashable
+    ) -> None:
+        """ Cache a result, evicting the least recently used if full.
+
+            Args:
+                key (Hashable):
+                    Cache key, from make_key.
+
+                result (object):
+                    Result to cache.
+
+                version (Hashable):
+                    Dataset version the result was read at.  Results
+                    from an outdated version are not cached.
+
+            Returns:
+                None.
+        """
+
+        with self._lock:
+            if version != self._version:
+                return None
+
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+        return None
+
+    @staticmethod
+    def make_key(
+        function: Callable,
+        args: Tuple,
+        kwargs: Dict
+    ) -> Hashable:
+        """ Create a cache key from a function and its arguments.
+
+            The session argument is not part of the key, since every
+            session reads the same dataset.
+
+            Args:
+                function (Callable):
+                    Cached function.
+
+                args (Tuple):
+                    Positional arguments.
+
+                kwargs (Dict):
+                    Keyword arguments.
+
+            Returns:
+                key (Hashable):
+                    Tuple of the function name and arguments.
+        """
+
+        key = (
+            function.__module__,
+            function.__qualname__,
+            args,
+            tuple(sorted(
+                (name, value) for name, value in kwargs.items()
+                if name != 'session'
+            ))
+        )
+
+        return key
+
+    def cached(
+        self,
+        function: Callable
+    ) -> Callable:
+        """ Wrap a query function with a read-through cache.
+
+            Args:
+                function (Callable):
+                    Query function, such as db.get_hashtags.
+
+            Returns:
+                wrapper (Callable):
+                    Function with the same arguments, that returns
+                    cached results when the dataset is unchanged.
+        """
+
+        @wraps(function)
+        def wrapper(*args, **kwargs) -> object:
+            version = self.version()
+            key = self.make_key(function=function, args=args, kwargs=kwargs)
+
+            try:
+                result = self.get(key=key)
+            except TypeError:
+                # Unhashable arguments, run the query without caching
+                return function(*args, **kwargs)
+
+            if result is CACHE_MISSING:
+                result = _detach(result=function(*args, **kwargs))
+                self.set(key=key, result=result, version=version)
+
+            return result
+
+        return wrapper
+
+    def clear(self) -> None:
+        """ Remove all cached results.
+
+            Args:
+                None.
+
+            Returns:
+                None.
+        """
+
+        with self._lock:
+            self._entries.clear()
+
+        return None
+
+
+# Create the cache shared by the web application threads
+query_cache = QueryCache()
+get_hashtags = query_cache.cached(function=db.get_hashtags)
+get_tweets = query_cache.cached(function=db.get_tweets)
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+""" Database maintenance commands for ww-tweeter.
+
+    Usage:
+        python -m app.db.commands backfill-hashtags [--chunk-size N]
+        python -m app.db.commands backfill-screen-names SCREEN_NAME
+        python -m app.db.commands rebuild-aggregates
+        python -m app.db.commands recount-hashtags
+"""
+
+# Imports - Python Standard Library
+from argparse import ArgumentParser, Namespace
+from typing import List
+
+# Imports - Third-Party
+
+# Imports - Local
+from app.db import db
+
+
+# Functions
+def backfill_hashtags(
+    args: Namespace
+) -> None:
+    """ Add the hashtags of stored tweets to the tweet_hashtags table.
+
+        Args:
+            args (argparse.Namespace):
+                Parsed arguments, with a chunk_size attribute.
+
+        Returns:
+            None.
+    """
+
+    tweet_count = db.backfill_tweet_hashtags(
+        chunk_size=args.chunk_size,
+        session=db.session
+    )
+    db.bump_dataset_version(session=db.session)
+
+    print(f'Backfilled hashtags for {tweet_count} tweets')
+
+    return None
+
+
+def backfill_screen_names(
+    args: Namespace
+) -> None:
+    """ Set the account of stored tweets that have none.
+
+        Args:
+            args (argparse.Namespace):
+                Parsed arguments, with a screen_name attribute.
+
+        Returns:
+            None.
+    """
+
+    tweet_count = db.backfill_screen_names(
+        screen_name=args.screen_name,
+        session=db.session
+    )
+
+    print(f'Set the account of {tweet_count} tweets to {args.screen_name}')
+
+    return None
+
+
+def rebuild_aggregates(
+    args: Namespace
+) -> None:
+    """ Rebuild the hashtag aggregate tables from the stored tweets.
+
+        Args:
+            args (argparse.Namespace):
+                Parsed arguments.
+
+        Returns:
+            None.
+    """
+
+    db.rebuild_hashtag_aggregates(session=db.session)
+    db.bump_dataset_version(session=db.session)
+
+    print('Rebuilt hashtag aggregates')
+
+    return None
+
+
+def recount_hashtags(
+    args: Namespace
+) -> None:
+    """ Recount the hashtags of all stored tweets into the hashtags table.
+
+        Args:
+            args (argparse.Namespace):
+                Parsed arguments.
+
+        Returns:
+            None.
+    """
+
+    hashtag_count = db.recount_hashtags(session=db.session)
+    db.bump_dataset_version(session=db.session)
+
+    print(f'Recounted {hashtag_count} hashtags')
+
+    return None
+
+
+def main(
+    argv: List[str] = None
+) -> None:
+    """ Main program, run a database maintenance command.
+
+        Args:
+            argv (List[str], optional):
+                Command line arguments.  Default value is None, and
+                uses sys.argv.
+
+        Returns:
+            None.
+    """
+
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    backfill_parser = commands.add_parser(
+        'backfill-hashtags',
+        help='Add the hashtags of stored tweets to tweet_hashtags'
+    )
+    backfill_parser.add_argument(
+        '--chunk-size',
+        type=int,
+        default=db.BULK_CHUNK_SIZE
+    )
+    backfill_parser.set_defaults(handler=backfill_hashtags)
+
+    screen_names_parser = commands.add_parser(
+        'backfill-screen-names',
+        help='Set the account of stored tweets that have none'
+    )
+    screen_names_parser.add_argument('screen_name')
+    screen_names_parser.set_defaults(handler=backfill_screen_names)
+
+    rebuild_parser = commands.add_parser(
+        'rebuild-aggregates',
+        help='Rebuild the hashtag aggregate tables from stored tweets'
+    )
+    rebuild_parser.set_defaults(handler=rebuild_aggregates)
+
+    recount_parser = commands.add_parser(
+        'recount-hashtags',
+        help='Recount the hashtags of stored tweets in the database'
+    )
+    recount_parser.set_defaults(handler=recount_hashtags)
+
+    args = parser.parse_args(argv)
+    args.handler(args)
+
+    return None
+
+
+if __name__ == '__main__':
+    main()
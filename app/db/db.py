@@ -2,19 +2,37 @@
 """ Database/controller interactions for ww-tweeter. """
 
 # Imports - Python Standard Library
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
+from collections import Counter
+from datetime import datetime
+from io import StringIO
+from itertools import chain, islice
 from os import getenv
+from threading import Lock
+import json
 import re
 from sys import argv
-from typing import Dict, List, Tuple, Union
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple, Union
 
 # Imports - Third-Party
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import (
+    BigInteger, cast, create_engine, delete, func, insert, literal,
+    literal_column, or_, select, text, tuple_, update
+)
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.orm import scoped_session, sessionmaker
 import dotenv
 import sqlalchemy
 
 # Imports - Local
-from app.db.db_models import BASE, Hashtag, TweetData
+from app.db.db_models import (
+    BASE, DatasetVersion, Hashtag, HashtagDay, HashtagEngagement,
+    HashtagTopTweet, IngestMark, TweetData, TweetHashtag, SEARCH_CONFIG,
+    SEARCH_FTS_TABLE, SEARCH_VECTOR, STAGING_METADATA, STAGING_TABLES,
+    create_sqlite_search
+)
 
 # Load environment variables
 env_vars = dotenv.load_dotenv()
@@ -22,9 +40,29 @@ env_vars = dotenv.load_dotenv()
 
 # Constants
 AUTO_FLUSH = True
-DB_LOGGING = True
+DATASET_VERSION_ID = 1  # Primary key of the single dataset_version row
+BULK_CHUNK_SIZE = 5000  # Rows written per transaction by bulk inserts
+COPY_DRIVERS = ('psycopg2',)  # PostgreSQL drivers with COPY FROM STDIN
+COPY_STAGING_TABLE = 'copy_staging'  # Temporary table for COPY upserts
+UPSERT_INSERTS = {
+    # Dialect insert constructs with ON CONFLICT DO UPDATE support
+    'postgresql': postgresql.insert,
+    'sqlite': sqlite.insert
+}
+DB_LOGGING = getenv(key='DB_LOGGING', default='false').lower() == 'true'
+DB_MAX_OVERFLOW = int(getenv(key='DB_MAX_OVERFLOW', default='10'))
+DB_POOL_PRE_PING = True  # Test pooled connections before each checkout
+DB_POOL_SIZE = int(getenv(key='DB_POOL_SIZE', default='5'))
 DB_URL = getenv(key='DB_URL', default=None)
 DB_TEST_URL = getenv(key='DB_TEST_URL', default=None)
+HASHTAG_AGGREGATES = (HashtagDay, HashtagEngagement, HashtagTopTweet)
+LEADERBOARD_SIZE = 10  # Top tweets kept for each hashtag
+SEARCH_PAGE_SIZE = 20  # Tweets per page of search results
+SEARCH_TOKEN = re.compile(r'\w+')
+STREAM_CHUNK_SIZE = 10000  # Rows fetched at a time by server-side cursors
+TWEET_FIELDS = (
+    'tweet_id', 'tweet_text', 'created', 'likes', 'retweets'
+)  # Public TweetData columns
 VALID_HASHTAG = re.compile(r'#([a-z0-9]{3,})')
 
 
@@ -34,53 +72,329 @@ Session = sessionmaker(
 )
 
 
+class TweetPage(list):
+    """ Page of tweets, with cursors for the adjacent pages.
+
+        A list of TweetData objects, newest first, so it can be used
+        anywhere a list of tweets is expected.
+
+        Attributes:
+            next_cursor (Union[str, None]):
+                Opaque cursor for the page of older tweets, or None on
+                the last page.
+
+            prev_cursor (Union[str, None]):
+                Opaque cursor for the page of newer tweets, or None on
+                the first page.
+    """
+
+    next_cursor = None
+    prev_cursor = None
+
+
 # Functions
-def _create_session() -> sqlalchemy.orm.Session:
-    """ Create and Bind an Engine object to a Session object.
+def get_engine() -> Engine:
+    """ Get the database Engine object, creating it on first use.
 
-        Add an sqlalchemy.engine.Engine binding to the custom Session
-        class.
+        The engine is created once per process, with a connection pool
+        shared by all threads.  The database tables and indexes are
+        created, and the Session class is bound to the engine.
 
         Args:
             None.
 
         Returns:
-            session (sqlalchemy.orm.Session):
-                Instance of the Session class with an engine binding.
+            engine (sqlalchemy.engine.Engine):
+                Engine object bound to the database URL.
     """
 
-    # Set the context appropriate DB URL
-    if 'pytest' in argv[0]:
-        db_url = DB_TEST_URL
-    else:
-        db_url = DB_URL
+    global _engine
+
+    with _engine_lock:
+        if _engine is not None:
+            return _engine
+
+        # Set the context appropriate DB URL
+        if 'pytest' in argv[0]:
+            db_url = DB_TEST_URL
+        else:
+            db_url = DB_URL
+
+        # Verify db_url is not None
+        if db_url is None:
+            raise EnvironmentError(
+                '\nSet the "DB_URL" and/or "DB_TEST_URL" environment '
+                'variables\n'
+            )
 
-    # Verify db_url is not None
-    if db_url is None:
-        raise EnvironmentError(
-            '\nSet the "DB_URL" and/or "DB_TEST_URL" environment variables\n'
+        # SQLite uses a connection per thread, other databases use a pool
+        pool_options = {}
+        if make_url(db_url).get_backend_name() != 'sqlite':
+            pool_options = {
+                'pool_size': DB_POOL_SIZE,
+                'max_overflow': DB_MAX_OVERFLOW
+            }
+
+        # Create an sqlalchemy.engine.Engine object
+        engine = create_engine(
+            db_url,
+            echo=DB_LOGGING,
+            pool_pre_ping=DB_POOL_PRE_PING,
+            **pool_options
         )
 
-    # Create an sqlalchemy.engine.Engine object
-    engine = create_engine(db_url, echo=DB_LOGGING)
+        # Create database tables, and upgrade tables from older versions
+        upgrade_schema(engine=engine)
+
+        # Bind the Session class to the engine
+        Session.configure(bind=engine)
+
+        _engine = engine
+
+    return _engine
+
+
+def set_pool_size(
+    pool_size: int,
+    max_overflow: int = 0
+) -> None:
+    """ Set the connection pool size of the engine, before it is created.
+
+        Each process creates its own engine, so processes that share a
+        database, such as web application workers, must split the
+        database connection limit between them.
+
+        Args:
+            pool_size (int):
+                Connections kept open in the pool.
+
+            max_overflow (int, optional):
+                Connections opened beyond pool_size under load.  Default
+                value is 0.
+
+        Returns:
+            None.
+
+        Raises:
+            RuntimeError:
+                The engine was already created with the old pool size.
+    """
+
+    global DB_POOL_SIZE, DB_MAX_OVERFLOW
+
+    with _engine_lock:
+        if _engine is not None:
+            raise RuntimeError(
+                'Set the pool size before the database engine is created'
+            )
+
+        DB_POOL_SIZE = pool_size
+        DB_MAX_OVERFLOW = max_overflow
+
+    return None
+
+
+def upgrade_schema(
+    engine: Engine
+) -> List[str]:
+    """ Create the database tables, and upgrade existing tables.
+
+        Tables are created if they do not exist.  Columns added to a
+        model after its table was created are added to the table, with
+        NULL values, and missing indexes are created.  Older versions
+        stored duplicate tweets and hashtags, so before the unique
+        tweet_id index is created, only the newest row of each tweet is
+        kept, and before the unique hashtag name index is created, the
+        counts of each hashtag are merged into one row.
+
+        Args:
+            engine (sqlalchemy.engine.Engine):
+                Engine object bound to the database.
+
+        Returns:
+            added_columns (List[str]):
+                Names of the columns added, as 'table.column'.
+
+        Raises:
+            RuntimeError:
+                A missing column is not nullable, and can not be added.
+    """
 
     # Call the BASE object's create_all method to create database tables
     BASE.metadata.create_all(engine)
 
-    # Bind the Session class to a database URL
-    Session.configure(bind=engine)
+    inspector = sqlalchemy.inspect(engine)
+    added_columns = []
+
+    with engine.begin() as connection:
+        for table in BASE.metadata.sorted_tables:
+            existing_columns = {
+                column['name'] for column in inspector.get_columns(table.name)
+            }
+
+            for column in table.columns:
+                if column.name in existing_columns:
+                    continue
+
+                if not column.nullable:
+                    raise RuntimeError(
+                        f'Column {table.name}.{column.name} is missing, and '
+                        'is not nullable, recreate the table to add it'
+                    )
+
+                column_type = column.type.compile(dialect=engine.dialect)
+                connection.exec_driver_sql(
+                    f'ALTER TABLE {table.name} '
+                    f'ADD COLUMN {column.name} {column_type}'
+                )
+                added_columns.append(f'{table.name}.{column.name}')
+
+    # Remove duplicate rows, which would fail the unique indexes
+    remove_duplicates = {
+        TweetData: _remove_duplicate_tweets,
+        Hashtag: _merge_duplicate_hashtags
+    }
+
+    for model, remove_function in remove_duplicates.items():
+        unique_index = next(
+            index for index in model.__table__.indexes if index.unique
+        )
+        index_names = {
+            index['name']
+            for index in sqlalchemy.inspect(engine).get_indexes(
+                model.__tablename__
+            )
+        }
+
+        if unique_index.name not in index_names:
+            remove_function(engine=engine)
+
+    # Add indexes to tables that existed before the indexes were defined
+    for table in BASE.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+
+    return added_columns
+
+
+def _remove_duplicate_tweets(
+    engine: Engine
+) -> int:
+    """ Delete all but the newest row of each tweet.
+
+        Args:
+            engine (sqlalchemy.engine.Engine):
+                Engine object bound to the database.
+
+        Returns:
+            tweet_count (int):
+                Number of duplicate rows deleted.
+    """
+
+    newest_rows = select(func.max(TweetData.id)).where(
+        TweetData.tweet_id.is_not(None)
+    ).group_by(TweetData.tweet_id)
+
+    with engine.begin() as connection:
+        tweet_count = connection.execute(
+            delete(TweetData).where(
+                TweetData.tweet_id.is_not(None),
+                TweetData.id.not_in(newest_rows)
+            )
+        ).rowcount
+
+    return tweet_count
+
+
+def _merge_duplicate_hashtags(
+    engine: Engine
+) -> int:
+    """ Merge the counts of each hashtag into its newest row.
+
+        Args:
+            engine (sqlalchemy.engine.Engine):
+                Engine object bound to the database.
+
+        Returns:
+            hashtag_count (int):
+                Number of duplicate rows deleted.
+    """
+
+    newest_rows = select(func.max(Hashtag.id)).where(
+        Hashtag.name.is_not(None)
+    ).group_by(Hashtag.name)
+
+    with engine.begin() as connection:
+        duplicates = connection.execute(
+            select(
+                func.max(Hashtag.id), func.sum(Hashtag.count)
+            ).where(
+                Hashtag.name.is_not(None)
+            ).group_by(
+                Hashtag.name
+            ).having(
+                func.count() > 1
+            )
+        ).all()
+
+        for hashtag_id, count in duplicates:
+            connection.execute(
+                update(Hashtag).where(
+                    Hashtag.id == hashtag_id
+                ).values(count=count)
+            )
+
+        hashtag_count = connection.execute(
+            delete(Hashtag).where(
+                Hashtag.name.is_not(None),
+                Hashtag.id.not_in(newest_rows)
+            )
+        ).rowcount
+
+    return hashtag_count
+
+
+def _create_session() -> sqlalchemy.orm.Session:
+    """ Create a Session object bound to the database Engine.
+
+        Used by the scoped session to create one session per thread.
+
+        Args:
+            None.
+
+        Returns:
+            session (sqlalchemy.orm.Session):
+                Instance of the Session class with an engine binding.
+    """
 
     # Create a session class instance
-    session = Session()
+    session = Session(bind=get_engine())
 
     return session
 
 
-# Create a session object using _create_session, or set to None for pytest
-if 'pytest' in argv[0]:
-    session = None
-else:
-    session = _create_session()
+def remove_session() -> None:
+    """ Close and discard the session of the current thread.
+
+        Call at the end of each web request, or worker thread, so the
+        session's connection is returned to the pool.
+
+        Args:
+            None.
+
+        Returns:
+            None.
+    """
+
+    session.remove()
+
+    return None
+
+
+# Create the engine on first use, and a session per thread when it is used
+_engine = None
+_engine_lock = Lock()
+session = scoped_session(session_factory=_create_session)
 
 
 def commit_session(
@@ -103,18 +417,130 @@ def commit_session(
     # Commit the changes to the database
     session.commit()
 
-    # Collect the session transaction status
+    # Collect the session transaction status, from the thread's session
+    if isinstance(session, scoped_session):
+        session = session()
+
     session_in_transaction = session.in_transaction()
 
     return session_in_transaction
 
 
+def get_dataset_version(
+    session: sqlalchemy.orm.Session = session
+) -> Tuple[int, Union[datetime, None]]:
+    """ Get the version of the stored dataset.
+
+        Args:
+            session (sqlalchemy.orm.Session, optional):
+                By default, uses the session object created by the
+                _create_session function.  Allows the ability to pass a
+                mock Session object for pytest testing.
+
+        Returns:
+            version, updated (Tuple[int, Union[datetime, None]]):
+                Dataset version number, and the time it was last
+                incremented.  (0, None) before the first ingest.
+    """
+
+    dataset_version = session.query(
+        DatasetVersion.version, DatasetVersion.updated
+    ).filter(
+        DatasetVersion.id == DATASET_VERSION_ID
+    ).first()
+
+    if dataset_version is None:
+        dataset_version = (0, None)
+
+    version, updated = dataset_version
+
+    return version, updated
+
+
+def _increment_dataset_version(
+    session: sqlalchemy.orm.Session = session
+) -> None:
+    """ Increment the dataset version, in the session's transaction.
+
+        Args:
+            session (sqlalchemy.orm.Session, optional):
+                By default, uses the session object created by the
+                _create_session function.  Allows the ability to pass a
+                mock Session object for pytest testing.
+
+        Returns:
+            None.
+    """
+
+    updated = datetime.utcnow().replace(microsecond=0)
+
+    row_count = session.query(DatasetVersion).filter(
+        DatasetVersion.id == DATASET_VERSION_ID
+    ).update(
+        {
+            DatasetVersion.version: DatasetVersion.version + 1,
+            DatasetVersion.updated: updated
+        },
+        synchronize_session=False
+    )
+
+    # Create the row on the first ingest
+    if row_count == 0:
+        session.add(instance=DatasetVersion(
+            id=DATASET_VERSION_ID,
+            version=1,
+            updated=updated
+        ))
+
+    return None
+
+
+def bump_dataset_version(
+    session: sqlalchemy.orm.Session = session
+) -> bool:
+    """ Increment the dataset version after new data is committed.
+
+        Invalidates query results cached by app.db.cache.
+
+        Args:
+            session (sqlalchemy.orm.Session, optional):
+                By default, uses the session object created by the
+                _create_session function.  Allows the ability to pass a
+                mock Session object for pytest testing.
+
+        Returns:
+            session_active (bool):
+                False if the transaction is complete, True if the
+                transaction is neither committed nor rolled back.
+    """
+
+    _increment_dataset_version(session=session)
+
+    # Commit the changes to the database
+    session_active = commit_session(
+        session=session
+    )
+
+    return session_active
+
+
 def truncate_tables(
+    models: Iterable[type] = (
+        TweetData, TweetHashtag, Hashtag, IngestMark
+    ) + HASHTAG_AGGREGATES,
     session: sqlalchemy.orm.Session = session
 ) -> bool:
     """ Remove all rows from the database tables.
 
+        PostgreSQL tables are emptied with TRUNCATE, which frees their
+        storage at once, instead of deleting rows one at a time.
+
         Args:
+            models (Iterable[type], optional):
+                Model classes of the tables to clear.  Default value is
+                TweetData, TweetHashtag, Hashtag, IngestMark, and the
+                HASHTAG_AGGREGATES tables.
+
             session (sqlalchemy.orm.Session, optional):
                 By default, uses the session object created by the
                 _create_session function.  Allows the ability to pass a
@@ -126,9 +552,7 @@ def truncate_tables(
                 transaction is neither committed nor rolled back.
     """
 
-    # Delete data returned by a query of the TweetData and Hashtag tables
-    session.query(TweetData).delete()
-    session.query(Hashtag).delete()
+    _clear_tables(models=models, session=session)
 
     # Commit the changes to the database
     session_active = commit_session(
@@ -138,57 +562,61 @@ def truncate_tables(
     return session_active
 
 
-def get_hashtags(
+def _clear_tables(
+    models: Iterable[type],
     session: sqlalchemy.orm.Session = session
-) -> List:
-    """ Get all hashtags from the database.
+) -> None:
+    """ Remove all rows from tables, in the session's transaction.
 
         Args:
+            models (Iterable[type]):
+                Model classes of the tables to clear.
+
             session (sqlalchemy.orm.Session, optional):
                 By default, uses the session object created by the
                 _create_session function.  Allows the ability to pass a
                 mock Session object for pytest testing.
 
         Returns:
-            hashtags (List):
-                All entries in the hashtags table.
+            None.
     """
 
-    # Retreive and sort all entries from the hashtags table
-    hashtags = session.query(Hashtag).order_by(Hashtag.name.asc()).all()
+    # Truncate PostgreSQL tables, or delete data returned by a query
+    if session.get_bind().dialect.name == 'postgresql':
+        table_names = ', '.join(model.__tablename__ for model in models)
+        session.execute(text(f'TRUNCATE TABLE {table_names}'))
+    else:
+        for model in models:
+            session.query(model).delete()
 
-    return hashtags
+    return None
 
 
-def add_hashtags(
-    hashtags: Dict,
+def create_staging_tables(
     session: sqlalchemy.orm.Session = session
 ) -> bool:
-    """ Add hashtags to the database.
+    """ Create empty staging tables for a dataset refresh.
 
-        Args:
-            hashtags (Dict):
-                Dictionary object with new hashtags.
+        Staging tables left by an earlier refresh that did not finish
+        are dropped first.  Load the staging tables with the staging
+        arguments of add_tweets and add_hashtags, then swap them in
+        with swap_staging_tables.
 
-        session (sqlalchemy.orm.Session, optional):
-            By default, uses the session object created by the
-            _create_session function.  Allows the ability to pass a
-            mock Session object for pytest testing.
+        Args:
+            session (sqlalchemy.orm.Session, optional):
+                By default, uses the session object created by the
+                _create_session function.  Allows the ability to pass a
+                mock Session object for pytest testing.
 
         Returns:
-           session_active (bool):
+            session_active (bool):
                 False if the transaction is complete, True if the
                 transaction is neither committed nor rolled back.
     """
 
-    # Add new hashtags to the session object
-    for hashtag, count in hashtags.items():
-        session.add(
-            instance=Hashtag(
-                name=hashtag,
-                count=count
-            )
-        )
+    connection = session.connection()
+    STAGING_METADATA.drop_all(bind=connection)
+    STAGING_METADATA.create_all(bind=connection)
 
     # Commit the changes to the database
     session_active = commit_session(
@@ -198,91 +626,1768 @@ def add_hashtags(
     return session_active
 
 
-def get_tweets(
-    search_tag: str = None,
+def swap_staging_tables(
     session: sqlalchemy.orm.Session = session
-) -> List:
-    """ Get all hashtags from the database.
+) -> bool:
+    """ Replace the database tables with the loaded staging tables.
 
-        Args:
-            search_tag (str, optional):
-                Hashtag search string for query filter.  Default value
-                is None, and will return all results.
+        The live tables are dropped and the staging tables are renamed
+        in their place, in a single transaction, so readers see either
+        the old dataset or the new one, and never an empty or partly
+        loaded one.  Staging index and constraint names are renamed to
+        the live names, the SQLite FTS5 index is rebuilt, and the
+        dataset version is incremented.  The high-water marks of the
+        replaced tweets are removed, so record the marks of the loaded
+        accounts with record_since_id after the swap.
 
+        Args:
             session (sqlalchemy.orm.Session, optional):
                 By default, uses the session object created by the
                 _create_session function.  Allows the ability to pass a
                 mock Session object for pytest testing.
 
         Returns:
-            tweets (List):
-                All entries in the tweets table.
+            session_active (bool):
+                False if the transaction is complete, True if the
+                transaction is neither committed nor rolled back.
     """
 
-    # Get tweets from the database
-    tweets = session.query(TweetData)
-
-    # Attemt to filter tweet results
-    if search_tag is not None:
-        valid_hashtag = VALID_HASHTAG.match(
-            string=search_tag.lower()
-        )
+    connection = session.connection()
+    dialect_name = connection.dialect.name
 
-        # Check the validity of the hashtag
-        if valid_hashtag is not None:
-            filter = search_tag.lower()
+    if dialect_name not in ('postgresql', 'sqlite'):
+        raise ValueError(f'Table swaps are not supported on "{dialect_name}"')
 
-            # Apply a filter to the tweet data
-            tweets = tweets.filter(
-                TweetData.tweet_text.ilike(f'%{filter}%')
-            )
+    if dialect_name == 'sqlite':
+        # pysqlite runs DDL outside of a transaction unless one is open
+        if not connection.connection.dbapi_connection.in_transaction:
+            connection.exec_driver_sql('BEGIN')
 
-    # Return all tweets from the query
-    tweets = tweets.all()
+        # The FTS5 index and its triggers are created again after the swap
+        connection.exec_driver_sql(f'DROP TABLE IF EXISTS {SEARCH_FTS_TABLE}')
 
-    return tweets
+    for model, staging_table in STAGING_TABLES.items():
+        table_name = model.__tablename__
 
+        connection.exec_driver_sql(f'DROP TABLE {table_name}')
+        connection.exec_driver_sql(
+            f'ALTER TABLE {staging_table.name} RENAME TO {table_name}'
+        )
 
-def add_tweets(
-    tweets: Union[Dict, List, Tuple],
-    session: sqlalchemy.orm.Session = session
-) -> bool:
-    """ Add hashtags to the database.
+        if dialect_name == 'postgresql':
+            # Rename indexes, the primary key, and the id sequence
+            for index in staging_table.indexes:
+                index_name = index.name.replace(
+                    staging_table.name, table_name, 1
+                )
+                connection.exec_driver_sql(
+                    f'ALTER INDEX {index.name} RENAME TO {index_name}'
+                )
+
+            connection.exec_driver_sql(
+                f'ALTER TABLE {table_name} RENAME CONSTRAINT '
+                f'{staging_table.name}_pkey TO {table_name}_pkey'
+            )
 
-        Args:
-            tweets (Dict, List, or Tuple):
-                Dictionary object with new tweets.
+            column = model.__table__.autoincrement_column
+            if column is not None:
+                connection.exec_driver_sql(
+                    f'ALTER SEQUENCE {staging_table.name}_{column.name}_seq '
+                    f'RENAME TO {table_name}_{column.name}_seq'
+                )
+        else:
+            # SQLite can not rename indexes, so create them again
+            for index in staging_table.indexes:
+                connection.exec_driver_sql(
+                    f'DROP INDEX IF EXISTS {index.name}'
+                )
 
-        session (sqlalchemy.orm.Session, optional):
-            By default, uses the session object created by the
-            _create_session function.  Allows the ability to pass a
-            mock Session object for pytest testing.
+            for index in model.__table__.indexes:
+                index.create(bind=connection, checkfirst=True)
 
-        Returns:
-           session_active (bool):
-                False if the transaction is complete, True if the
-                transaction is neither committed nor rolled back.
-    """
+    if dialect_name == 'sqlite':
+        create_sqlite_search(connection=connection)
 
-    # Determine the object type of tweets, and set/reset the value accordingly
-    if isinstance(tweets, list) or isinstance(tweets, tuple):
-        tweets = tweets
-    elif isinstance(tweets, dict):
-        tweets = tweets.items()
-    else:
-        raise ValueError('"tweets" must be of type "list" or "dict"')
+    _clear_tables(models=(IngestMark,), session=session)
 
-    # Add new tweets to the session object
-    for tweet in tweets:
-        session.add(instance=TweetData(
-                    tweet_id=tweet.id,
-                    tweet_text=tweet.text,
-                    created=tweet.created_at,
-                    likes=tweet.favorite_count,
-                    retweets=tweet.retweet_count)
-                    )
+    # Readers see the new dataset and version in the same transaction
+    _increment_dataset_version(session=session)
 
     # Commit the changes to the database
-    session_active = commit_session(session=session)
+    session_active = commit_session(
+        session=session
+    )
 
     return session_active
+
+
+def get_hashtags(
+    session: sqlalchemy.orm.Session = session
+) -> List:
+    """ Get all hashtags from the database.
+
+        Args:
+            session (sqlalchemy.orm.Session, optional):
+                By default, uses the session object created by the
+                _create_session function.  Allows the ability to pass a
+                mock Session object for pytest testing.
+
+        Returns:
+            hashtags (List):
+                All entries in the hashtags table.
+    """
+
+    # Retreive and sort all entries from the hashtags table
+    hashtags = session.query(Hashtag).order_by(Hashtag.name.asc()).all()
+
+    return hashtags
+
+
+def add_hashtags(
+    hashtags: Dict,
+    staging: bool = False,
+    session: sqlalchemy.orm.Session = session
+) -> bool:
+    """ Add hashtags to the database.
+
+        Hashtags that already exist have the new count added to their
+        count.
+
+        Args:
+            hashtags (Dict):
+                Dictionary object with new hashtags.
+
+            staging (bool, optional):
+                When True, write to the staging hashtags table created
+                by create_staging_tables.  Default value is False.
+
+        session (sqlalchemy.orm.Session, optional):
+            By default, uses the session object created by the
+            _create_session function.  Allows the ability to pass a
+            mock Session object for pytest testing.
+
+        Returns:
+           session_active (bool):
+                False if the transaction is complete, True if the
+                transaction is neither committed nor rolled back.
+    """
+
+    # Create a row for each hashtag
+    rows = (
+        {'name': hashtag, 'count': count}
+        for hashtag, count in hashtags.items()
+    )
+
+    # Write the rows with a bulk upsert
+    session_active = bulk_insert(
+        model=_table(model=Hashtag, staging=staging),
+        rows=rows,
+        conflict_columns=('name',),
+        increment_columns=('count',),
+        session=session
+    )
+
+    return session_active
+
+
+def recount_hashtags(
+    counter: Callable = None,
+    session: sqlalchemy.orm.Session = session
+) -> int:
+    """ Recount the hashtags of all stored tweets into the hashtags table.
+
+        On PostgreSQL, hashtags are extracted with regexp_matches and
+        counted with GROUP BY in a single INSERT ... SELECT, so no tweet
+        text leaves the database.  Other databases stream the tweet
+        text and count the hashtags in Python.  The hashtags table is
+        replaced in one transaction.
+
+        Args:
+            counter (Callable, optional):
+                Function that counts the hashtags in streamed tweet
+                text, such as tweeter.parallel_hashtag_counter, for
+                databases other than PostgreSQL.  Default value is
+                None, and counts in this process.
+
+            session (sqlalchemy.orm.Session, optional):
+                By default, uses the session object created by the
+                _create_session function.  Allows the ability to pass a
+                mock Session object for pytest testing.
+
+        Returns:
+            hashtag_count (int):
+                Number of distinct hashtags.
+    """
+
+    _clear_tables(models=(Hashtag,), session=session)
+
+    if session.get_bind().dialect.name == 'postgresql':
+        # One row per hashtag occurrence, as VALID_HASHTAG.findall finds
+        matches = select(
+            func.regexp_matches(
+                func.lower(TweetData.tweet_text),
+                VALID_HASHTAG.pattern,
+                'g',
+                type_=postgresql.ARRAY(sqlalchemy.String)
+            )[1].label('name')
+        ).subquery()
+
+        count = func.count()
+        session.execute(insert(Hashtag).from_select(
+            ['name', 'count'],
+            select(
+                matches.c.name, count
+            ).group_by(
+                matches.c.name
+            ).order_by(
+                count.desc(), matches.c.name.asc()
+            )
+        ))
+
+        hashtag_count = session.query(func.count(Hashtag.id)).scalar()
+    else:
+        texts = stream_tweet_text(session=session)
+
+        if counter is None:
+            hashtags = Counter()
+            for tweet_text in texts:
+                hashtags.update(
+                    VALID_HASHTAG.findall((tweet_text or '').lower())
+                )
+            hashtags = dict(hashtags.most_common())
+        else:
+            hashtags = counter(tweets=texts)
+
+        bulk_insert(
+            model=Hashtag,
+            rows=(
+                {'name': hashtag, 'count': count}
+                for hashtag, count in hashtags.items()
+            ),
+            commit=False,
+            session=session
+        )
+
+        hashtag_count = len(hashtags)
+
+    # Commit the changes to the database
+    commit_session(
+        session=session
+    )
+
+    return hashtag_count
+
+
+def get_latest_tweet_id(
+    screen_name: str = None,
+    session: sqlalchemy.orm.Session = session
+) -> Union[str, None]:
+    """ Get the newest tweet ID in the database.
+
+        Used as a high-water mark (since_id) for incremental loads.
+
+        Args:
+            screen_name (str, optional):
+                Twitter account to get the newest tweet ID for.  Default
+                value is None, and checks tweets from all accounts.
+
+            session (sqlalchemy.orm.Session, optional):
+                By default, uses the session object created by the
+                _create_session function.  Allows the ability to pass a
+                mock Session object for pytest testing.
+
+        Returns:
+            latest_tweet_id (Union[str, None]):
+                The highest tweet_id in the tweets table, or None if
+                the table is empty.
+    """
+
+    # Tweet IDs are stored as strings, cast to compare them numerically
+    latest_tweet_id = session.query(
+        func.max(cast(TweetData.tweet_id, BigInteger))
+    )
+
+    # Limit the query to a single account
+    if screen_name is not None:
+        latest_tweet_id = latest_tweet_id.filter(
+            TweetData.screen_name == screen_name
+        )
+
+    latest_tweet_id = latest_tweet_id.scalar()
+
+    # Convert the tweet ID to a string to match the tweet_id column
+    if latest_tweet_id is not None:
+        latest_tweet_id = str(latest_tweet_id)
+
+    return latest_tweet_id
+
+
+def get_since_id(
+    screen_name: str,
+    session: sqlalchemy.orm.Session = session
+) -> Union[str, None]:
+    """ Get the high-water mark (since_id) of an account.
+
+        Used for incremental loads, instead of the newest stored tweet,
+        which can be newer than tweets a failed ingest did not store.
+
+        Args:
+            screen_name (str):
+                Twitter account to get the high-water mark for.
+
+            session (sqlalchemy.orm.Session, optional):
+                By default, uses the session object created by the
+                _create_session function.  Allows the ability to pass a
+                mock Session object for pytest testing.
+
+        Returns:
+            since_id (Union[str, None]):
+                Newest tweet ID of the account's last finished ingest,
+                or None if no ingest of the account has finished.
+    """
+
+    since_id = session.query(IngestMark.since_id).filter(
+        IngestMark.screen_name == screen_name
+    ).scalar()
+
+    return since_id
+
+
+def record_since_id(
+    screen_name: str,
+    session: sqlalchemy.orm.Session = session
+) -> Union[str, None]:
+    """ Record the newest stored tweet of an account as its high-water mark.
+
+        Call only after every tweet of an account's ingest is committed,
+        so no tweet older than the mark is missing.
+
+        Args:
+            screen_name (str):
+                Twitter account to record the high-water mark for.
+
+            session (sqlalchemy.orm.Session, optional):
+                By default, uses the session object created by the
+                _create_session function.  Allows the ability to pass a
+                mock Session object for pytest testing.
+
+        Returns:
+            since_id (Union[str, None]):
+                The recorded tweet ID, or None if the account has no
+                stored tweets, and no mark is recorded.
+    """
+
+    since_id = get_latest_tweet_id(screen_name=screen_name, session=session)
+
+    if since_id is None:
+        return None
+
+    bulk_insert(
+        model=IngestMark,
+        rows=[{
+            'screen_name': screen_name,
+            'since_id': since_id,
+            'updated': datetime.utcnow().replace(microsecond=0)
+        }],
+        conflict_columns=('screen_name',),
+        update_columns=('since_id', 'updated'),
+        session=session
+    )
+
+    return since_id
+
+
+def backfill_screen_names(
+    screen_name: str,
+    session: sqlalchemy.orm.Session = session
+) -> int:
+    """ Set the account of stored tweets that have none.
+
+        Tweets stored before the screen_name column was added have no
+        account, and record_since_id does not find them.  Run once
+        after upgrading, with the account the tweets were loaded from.
+
+        Args:
+            screen_name (str):
+                Twitter account the tweets belong to.
+
+            session (sqlalchemy.orm.Session, optional):
+                By default, uses the session object created by the
+                _create_session function.  Allows the ability to pass a
+                mock Session object for pytest testing.
+
+        Returns:
+            tweet_count (int):
+                Number of tweets updated.
+    """
+
+    tweet_count = session.query(TweetData).filter(
+        TweetData.screen_name.is_(None)
+    ).update(
+        {TweetData.screen_name: screen_name},
+        synchronize_session=False
+    )
+
+    # Commit the changes to the database
+    commit_session(
+        session=session
+    )
+
+    return tweet_count
+
+
+def encode_cursor(
+    tweet: TweetData,
+    direction: str
+) -> str:
+    """ Create an opaque page cursor from the position of a tweet.
+
+        Args:
+            tweet (TweetData):
+                Tweet at the edge of a page.
+
+            direction (str):
+                'next' for the tweets after the tweet, or 'prev' for
+                the tweets before it.
+
+        Returns:
+            cursor (str):
+                URL safe cursor string.
+    """
+
+    position = {
+        'created': tweet.created.isoformat(),
+        'id': tweet.id,
+        'direction': direction
+    }
+    cursor = urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+    return cursor
+
+
+def decode_cursor(
+    cursor: str
+) -> Tuple[datetime, int, str]:
+    """ Get the position of a tweet from a page cursor.
+
+        Args:
+            cursor (str):
+                Cursor created by encode_cursor.
+
+        Returns:
+            created, tweet_id, direction (Tuple[datetime, int, str]):
+                Creation time and id of the tweet, and the direction
+                of the page.
+
+        Raises:
+            ValueError:
+                The cursor is not valid.
+    """
+
+    try:
+        position = json.loads(urlsafe_b64decode(cursor.encode()))
+        created = datetime.fromisoformat(position['created'])
+        tweet_id = int(position['id'])
+        direction = position['direction']
+    except (BinasciiError, KeyError, TypeError, ValueError) as e:
+        raise ValueError(f'Invalid page cursor "{cursor}"') from e
+
+    if direction not in ('next', 'prev'):
+        raise ValueError(f'Invalid page cursor "{cursor}"')
+
+    return created, tweet_id, direction
+
+
+def _filter_hashtag(
+    query: sqlalchemy.orm.Query,
+    search_tag: str = None
+) -> sqlalchemy.orm.Query:
+    """ Filter a query of tweets to the tweets with a hashtag.
+
+        Args:
+            query (sqlalchemy.orm.Query):
+                Query of the tweets table.
+
+            search_tag (str, optional):
+                Hashtag search string, such as '#wwt'.  Default value
+                is None, and does not filter the query.  Invalid
+                hashtags do not filter the query either.
+
+        Returns:
+            query (sqlalchemy.orm.Query):
+                Query joined to the tweet_hashtags index.
+    """
+
+    if search_tag is not None:
+        valid_hashtag = VALID_HASHTAG.match(
+            string=search_tag.lower()
+        )
+
+        # Check the validity of the hashtag
+        if valid_hashtag is not None:
+            filter = valid_hashtag.group(1)
+
+            # Join the tweets with an exact match in the tweet_hashtags index
+            query = query.join(
+                TweetHashtag,
+                TweetHashtag.tweet_id == TweetData.tweet_id
+            ).filter(
+                TweetHashtag.hashtag == filter
+            )
+
+    return query
+
+
+def get_tweets(
+    search_tag: str = None,
+    limit: int = None,
+    cursor: str = None,
+    session: sqlalchemy.orm.Session = session
+) -> List:
+    """ Get tweets from the database, newest first.
+
+        With a limit, tweets are returned one page at a time, using
+        keyset pagination on (created, id), so each page is an index
+        range scan no matter how deep it is.  Tweets without a creation
+        time have no position in the page order, so they are left out
+        of pages.
+
+        Args:
+            search_tag (str, optional):
+                Hashtag search string for query filter.  Default value
+                is None, and will return all results.
+
+            limit (int, optional):
+                Maximum number of tweets per page.  Default value is
+                None, and returns all tweets.
+
+            cursor (str, optional):
+                Cursor from the next_cursor or prev_cursor of a page.
+                Default value is None, and returns the first page.
+
+            session (sqlalchemy.orm.Session, optional):
+                By default, uses the session object created by the
+                _create_session function.  Allows the ability to pass a
+                mock Session object for pytest testing.
+
+        Returns:
+            tweets (List):
+                TweetPage of the entries in the tweets table, with
+                next_cursor and prev_cursor attributes.
+
+        Raises:
+            ValueError:
+                The cursor is not valid.
+    """
+
+    # Get tweets from the database, and attempt to filter tweet results
+    tweets = _filter_hashtag(
+        query=session.query(TweetData),
+        search_tag=search_tag
+    )
+
+    # Return all tweets from the query
+    if limit is None:
+        tweets = TweetPage(tweets.order_by(
+            TweetData.created.desc(),
+            TweetData.id.desc()
+        ).all())
+
+        return tweets
+
+    # Read the page after, or before, the cursor position, NULL creation
+    # times do not compare with a position, and sort differently by dialect
+    direction = 'next'
+    position = tuple_(TweetData.created, TweetData.id)
+    tweets = tweets.filter(TweetData.created.is_not(None))
+
+    if cursor is not None:
+        created, tweet_id, direction = decode_cursor(cursor=cursor)
+
+        if direction == 'next':
+            tweets = tweets.filter(position < tuple_(created, tweet_id))
+        else:
+            tweets = tweets.filter(position > tuple_(created, tweet_id))
+
+    if direction == 'next':
+        order = (TweetData.created.desc(), TweetData.id.desc())
+    else:
+        order = (TweetData.created.asc(), TweetData.id.asc())
+
+    # Read one extra tweet, to find out if there is another page
+    rows = tweets.order_by(*order).limit(limit + 1).all()
+    more = len(rows) > limit
+    tweets = TweetPage(rows[:limit])
+
+    if direction == 'prev':
+        tweets.reverse()
+
+    # Coming from one side of the cursor means there is a page there
+    has_next = more if direction == 'next' else True
+    has_prev = more if direction == 'prev' else cursor is not None
+
+    if tweets and has_next:
+        tweets.next_cursor = encode_cursor(tweet=tweets[-1], direction='next')
+    if tweets and has_prev:
+        tweets.prev_cursor = encode_cursor(tweet=tweets[0], direction='prev')
+
+    return tweets
+
+
+def stream_tweets(
+    search_tag: str = None,
+    fields: Iterable[str] = TWEET_FIELDS,
+    chunk_size: int = STREAM_CHUNK_SIZE,
+    session: sqlalchemy.orm.Session = session
+) -> Iterator[Dict]:
+    """ Stream tweets from the database with a server-side cursor, newest
+        first.
+
+        Only the selected columns are read, and rows are fetched
+        chunk_size at a time, so the whole result is never loaded into
+        memory.
+
+        Args:
+            search_tag (str, optional):
+                Hashtag search string for query filter.  Default value
+                is None, and streams all tweets.
+
+            fields (Iterable[str], optional):
+                Names of the TweetData columns to read.  Default value
+                is TWEET_FIELDS.
+
+            chunk_size (int, optional):
+                Number of rows to fetch at a time.  Default value is
+                STREAM_CHUNK_SIZE.
+
+            session (sqlalchemy.orm.Session, optional):
+                By default, uses the session object created by the
+                _create_session function.  Allows the ability to pass a
+                mock Session object for pytest testing.
+
+        Yields:
+            tweet (Dict):
+                Selected fields of each tweet.
+
+        Raises:
+            ValueError:
+                A field is not in TWEET_FIELDS.
+    """
+
+    fields = list(fields)
+
+    for field in fields:
+        if field not in TWEET_FIELDS:
+            raise ValueError(f'Invalid tweet field "{field}"')
+
+    tweets = _filter_hashtag(
+        query=session.query(*(getattr(TweetData, field) for field in fields)),
+        search_tag=search_tag
+    ).order_by(
+        TweetData.created.desc(),
+        TweetData.id.desc()
+    )
+
+    # Use a server-side cursor, and fetch rows in chunks
+    rows = tweets.execution_options(
+        stream_results=True
+    ).yield_per(chunk_size)
+
+    for row in rows:
+        yield dict(zip(fields, row))
+
+
+def _fts_query(
+    query: str,
+    prefix: bool = False
+) -> str:
+    """ Convert a search string to an SQLite FTS5 query.
+
+        Each word is quoted, so FTS5 operators and punctuation in the
+        search string are matched as plain text.
+
+        Args:
+            query (str):
+                Search string.
+
+            prefix (bool, optional):
+                When True, match words that start with each search
+                word.  Default value is False.
+
+        Returns:
+            fts_query (str):
+                FTS5 query that matches all words in the search string.
+    """
+
+    suffix = '*' if prefix is True else ''
+    fts_query = ' '.join(
+        f'"{token}"{suffix}' for token in SEARCH_TOKEN.findall(query.lower())
+    )
+
+    return fts_query
+
+
+def search_tweets(
+    query: str,
+    page: int = 1,
+    page_size: int = SEARCH_PAGE_SIZE,
+    fuzzy: bool = True,
+    session: sqlalchemy.orm.Session = session
+) -> List:
+    """ Search tweet text, ranked by relevance.
+
+        On PostgreSQL, searches the full-text GIN index of tweet text,
+        and with fuzzy matching the pg_trgm index as well, so
+        misspelled words still match.  On SQLite, searches the FTS5
+        index, and with fuzzy matching also matches word prefixes.
+
+        Args:
+            query (str):
+                Search string, such as "cloud security".
+
+            page (int, optional):
+                Page of results, starting at 1.  Default value is 1.
+
+            page_size (int, optional):
+                Number of tweets per page.  Default value is
+                SEARCH_PAGE_SIZE.
+
+            fuzzy (bool, optional):
+                When True, include approximate matches.  Default value
+                is True.
+
+            session (sqlalchemy.orm.Session, optional):
+                By default, uses the session object created by the
+                _create_session function.  Allows the ability to pass a
+                mock Session object for pytest testing.
+
+        Returns:
+            tweets (List):
+                Page of TweetData objects, most relevant first.
+    """
+
+    dialect_name = session.get_bind().dialect.name
+    offset = (max(page, 1) - 1) * page_size
+
+    if not SEARCH_TOKEN.search(query or ''):
+        tweets = []
+
+    elif dialect_name == 'postgresql':
+        # Match the expression of the full-text index, so it is used
+        vector = literal_column(SEARCH_VECTOR)
+        ts_query = func.websearch_to_tsquery(
+            literal_column(f"'{SEARCH_CONFIG}'::regconfig"),
+            query
+        )
+        match = vector.op('@@')(ts_query)
+        rank = func.ts_rank_cd(vector, ts_query)
+
+        # Add trigram word similarity matches, for misspelled words
+        if fuzzy is True:
+            match = or_(
+                match,
+                literal(query).op('<%')(TweetData.tweet_text)
+            )
+            rank = rank + func.word_similarity(query, TweetData.tweet_text)
+
+        tweets = session.query(TweetData).filter(
+            match
+        ).order_by(
+            rank.desc(),
+            TweetData.id.desc()
+        ).offset(offset).limit(page_size).all()
+
+    elif dialect_name == 'sqlite':
+        # Find a page of ranked tweet ids in the FTS5 index
+        tweet_ids = session.execute(
+            text(
+                f'SELECT rowid FROM {SEARCH_FTS_TABLE} '
+                f'WHERE {SEARCH_FTS_TABLE} MATCH :query '
+                'ORDER BY rank LIMIT :limit OFFSET :offset'
+            ),
+            {
+                'query': _fts_query(query=query, prefix=fuzzy),
+                'limit': page_size,
+                'offset': offset
+            }
+        ).scalars().all()
+
+        # Load the tweets, and restore the ranked order
+        tweets = {
+            tweet.id: tweet
+            for tweet in session.query(TweetData).filter(
+                TweetData.id.in_(tweet_ids)
+            ).all()
+        }
+        tweets = [
+            tweets[tweet_id] for tweet_id in tweet_ids if tweet_id in tweets
+        ]
+
+    else:
+        raise ValueError(f'Search is not supported on "{dialect_name}"')
+
+    return tweets
+
+
+def _text_hashtags(
+    tweet
+) -> List[str]:
+    """ Extract the hashtags from the text of a tweet.
+
+        Args:
+            tweet:
+                Tweet with a text attribute.
+
+        Returns:
+            hashtags (List[str]):
+                Lower case hashtag names, without the leading #.
+    """
+
+    hashtags = VALID_HASHTAG.findall(tweet.text.lower())
+
+    return hashtags
+
+
+def add_tweets(
+    tweets: Union[Dict, List, Tuple],
+    screen_name: str = None,
+    extract_hashtags: Callable = _text_hashtags,
+    staging: bool = False,
+    session: sqlalchemy.orm.Session = session
+) -> bool:
+    """ Add tweets to the database, updating tweets that already exist.
+
+        Tweets are upserted on tweet_id, so overlapping or retried
+        fetches refresh the likes and retweets of stored tweets instead
+        of adding duplicate rows.  The hashtags in each tweet are added
+        to the tweet_hashtags table, the hashtags of new tweets are
+        added to the hashtag counts, and the hashtag aggregate tables
+        are updated, in the same transaction as each chunk of tweets.
+
+        Args:
+            tweets (Dict, List, or Tuple):
+                Dictionary object with new tweets.
+
+            screen_name (str, optional):
+                Twitter account the tweets belong to.  Default value is
+                None.
+
+            extract_hashtags (Callable, optional):
+                Function that returns the hashtags in a tweet, such as
+                tweeter.extract_hashtags.  Default value is
+                _text_hashtags, which scans the tweet text.
+
+            staging (bool, optional):
+                When True, write to the staging tables created by
+                create_staging_tables.  Default value is False.
+
+        session (sqlalchemy.orm.Session, optional):
+            By default, uses the session object created by the
+            _create_session function.  Allows the ability to pass a
+            mock Session object for pytest testing.
+
+        Returns:
+           session_active (bool):
+                False if the transaction is complete, True if the
+                transaction is neither committed nor rolled back.
+    """
+
+    # Determine the object type of tweets, and set/reset the value accordingly
+    if isinstance(tweets, list) or isinstance(tweets, tuple):
+        tweets = tweets
+    elif isinstance(tweets, dict):
+        tweets = tweets.items()
+    else:
+        raise ValueError('"tweets" must be of type "list" or "dict"')
+
+    tweets = iter(tweets)
+    session_active = False
+
+    # Write each chunk of tweets, their hashtags, and aggregates together
+    while True:
+        chunk = list(islice(tweets, BULK_CHUNK_SIZE))
+        if not chunk:
+            break
+
+        session_active = _add_tweet_chunk(
+            tweets=chunk,
+            screen_name=screen_name,
+            extract_hashtags=extract_hashtags,
+            staging=staging,
+            session=session
+        )
+
+    return session_active
+
+
+def _table(
+    model: type,
+    staging: bool = False
+) -> sqlalchemy.Table:
+    """ Get the live or staging table of a model.
+
+        Args:
+            model (type):
+                Model class of the table, such as TweetData.
+
+            staging (bool, optional):
+                When True, get the staging table created by
+                create_staging_tables.  Default value is False.
+
+        Returns:
+            table (sqlalchemy.Table):
+                Table of the model, or its staging copy.
+    """
+
+    table = STAGING_TABLES[model] if staging else model.__table__
+
+    return table
+
+
+def _add_tweet_chunk(
+    tweets: List,
+    screen_name: str = None,
+    extract_hashtags: Callable = _text_hashtags,
+    staging: bool = False,
+    session: sqlalchemy.orm.Session = session
+) -> bool:
+    """ Add a chunk of tweets, their hashtags, and aggregates.
+
+        Everything is written in one transaction, so the hashtag counts
+        and aggregates always match the stored tweets, even when a later
+        chunk fails.  Rows are written in the order
+        of their unique keys, so concurrent writers lock shared rows in
+        the same order, and do not deadlock.
+
+        Args:
+            tweets (List):
+                Chunk of tweets, no longer than BULK_CHUNK_SIZE.
+
+            screen_name (str, optional):
+                Twitter account the tweets belong to.  Default value is
+                None.
+
+            extract_hashtags (Callable, optional):
+                Function that returns the hashtags in a tweet.  Default
+                value is _text_hashtags.
+
+            staging (bool, optional):
+                When True, write to the staging tables.  Default value
+                is False.
+
+            session (sqlalchemy.orm.Session, optional):
+                By default, uses the session object created by the
+                _create_session function.  Allows the ability to pass a
+                mock Session object for pytest testing.
+
+        Returns:
+           session_active (bool):
+                False if the transaction is complete, True if the
+                transaction is neither committed nor rolled back.
+    """
+
+    tweets_table = _table(model=TweetData, staging=staging)
+
+    # Keep the last copy of each tweet, as the upsert does, in ID order
+    tweets = sorted(
+        {str(tweet.id): tweet for tweet in tweets}.values(),
+        key=lambda tweet: str(tweet.id)
+    )
+    tweet_hashtags = {
+        str(tweet.id): extract_hashtags(tweet) for tweet in tweets
+    }
+    hashtags = {
+        tweet_id: set(names) for tweet_id, names in tweet_hashtags.items()
+    }
+
+    # Read the engagement of tweets that are already stored
+    stored = {
+        tweet_id: (likes or 0, retweets or 0)
+        for tweet_id, likes, retweets in session.query(
+            tweets_table.c.tweet_id,
+            tweets_table.c.likes,
+            tweets_table.c.retweets
+        ).filter(
+            tweets_table.c.tweet_id.in_(list(hashtags))
+        ).all()
+    }
+
+    # Create a row for each tweet
+    rows = (
+        {
+            'tweet_id': tweet.id,
+            'tweet_text': tweet.text,
+            'created': tweet.created_at,
+            'likes': tweet.favorite_count,
+            'retweets': tweet.retweet_count,
+            'screen_name': screen_name
+        }
+        for tweet in tweets
+    )
+
+    # Write the rows with a bulk upsert, and set the account of tweets
+    # stored without one
+    update_columns = ('likes', 'retweets')
+    if screen_name is not None:
+        update_columns += ('screen_name',)
+
+    bulk_insert(
+        model=tweets_table,
+        rows=rows,
+        conflict_columns=('tweet_id',),
+        update_columns=update_columns,
+        commit=False,
+        session=session
+    )
+
+    # Create a row for each hashtag in each tweet
+    hashtag_rows = (
+        {'tweet_id': tweet_id, 'hashtag': hashtag}
+        for tweet_id, tweet_hashtags in sorted(hashtags.items())
+        for hashtag in sorted(tweet_hashtags)
+    )
+
+    # Write the hashtag rows, skipping rows that already exist
+    bulk_insert(
+        model=_table(model=TweetHashtag, staging=staging),
+        rows=hashtag_rows,
+        conflict_columns=('tweet_id', 'hashtag'),
+        commit=False,
+        session=session
+    )
+
+    # Add the hashtags of new tweets to the hashtag counts
+    hashtag_count = Counter(chain.from_iterable(
+        names for tweet_id, names in tweet_hashtags.items()
+        if tweet_id not in stored
+    ))
+
+    bulk_insert(
+        model=_table(model=Hashtag, staging=staging),
+        rows=(
+            {'name': hashtag, 'count': count}
+            for hashtag, count in sorted(hashtag_count.items())
+        ),
+        conflict_columns=('name',),
+        increment_columns=('count',),
+        commit=False,
+        session=session
+    )
+
+    _add_hashtag_aggregates(
+        tweets=tweets,
+        hashtags=hashtags,
+        stored=stored,
+        staging=staging,
+        session=session
+    )
+
+    # Commit the changes to the database
+    session_active = commit_session(
+        session=session
+    )
+
+    return session_active
+
+
+def _add_hashtag_aggregates(
+    tweets: List,
+    hashtags: Dict,
+    stored: Dict,
+    staging: bool = False,
+    session: sqlalchemy.orm.Session = session
+) -> None:
+    """ Add a chunk of tweets to the hashtag aggregate tables.
+
+        New tweets add to the daily counts and tweet totals of their
+        hashtags.  Tweets that are already stored only add the change
+        in their likes and retweets, so tweets can be loaded again
+        without counting them twice.  The leaderboards of the hashtags
+        are trimmed to LEADERBOARD_SIZE tweets.  Each table's rows are
+        written sorted by their unique key, so pipeline writers that
+        update the same hashtags lock them in the same order.  The
+        changes are left in the session's transaction.
+
+        Args:
+            tweets (List):
+                Chunk of tweets, with unique IDs.
+
+            hashtags (Dict):
+                Mapping of tweet IDs (str) to sets of hashtags.
+
+            stored (Dict):
+                Mapping of the tweet IDs that are already stored to
+                their stored (likes, retweets).
+
+            staging (bool, optional):
+                When True, write to the staging tables.  Default value
+                is False.
+
+            session (sqlalchemy.orm.Session, optional):
+                By default, uses the session object created by the
+                _create_session function.  Allows the ability to pass a
+                mock Session object for pytest testing.
+
+        Returns:
+            None.
+    """
+
+    days = Counter()
+    engagement = {}
+    top_tweets = []
+
+    for tweet in tweets:
+        tweet_id = str(tweet.id)
+        likes = tweet.favorite_count or 0
+        retweets = tweet.retweet_count or 0
+        new_tweet = tweet_id not in stored
+        stored_likes, stored_retweets = stored.get(tweet_id, (0, 0))
+
+        for hashtag in hashtags[tweet_id]:
+            totals = engagement.setdefault(
+                hashtag,
+                {'hashtag': hashtag, 'tweets': 0, 'likes': 0, 'retweets': 0}
+            )
+            totals['tweets'] += int(new_tweet)
+            totals['likes'] += likes - stored_likes
+            totals['retweets'] += retweets - stored_retweets
+
+            if new_tweet and tweet.created_at is not None:
+                days[(hashtag, tweet.created_at.date())] += 1
+
+            top_tweets.append({
+                'hashtag': hashtag,
+                'tweet_id': tweet_id,
+                'score': likes + retweets
+            })
+
+    if not engagement:
+        return None
+
+    bulk_insert(
+        model=_table(model=HashtagDay, staging=staging),
+        rows=(
+            {'hashtag': hashtag, 'day': day, 'count': count}
+            for (hashtag, day), count in sorted(days.items())
+        ),
+        conflict_columns=('hashtag', 'day'),
+        increment_columns=('count',),
+        commit=False,
+        session=session
+    )
+
+    bulk_insert(
+        model=_table(model=HashtagEngagement, staging=staging),
+        rows=(engagement[hashtag] for hashtag in sorted(engagement)),
+        conflict_columns=('hashtag',),
+        increment_columns=('tweets', 'likes', 'retweets'),
+        commit=False,
+        session=session
+    )
+
+    # Add the tweets to the leaderboards, then trim them
+    top_table = _table(model=HashtagTopTweet, staging=staging)
+
+    bulk_insert(
+        model=top_table,
+        rows=sorted(
+            top_tweets,
+            key=lambda row: (row['hashtag'], row['tweet_id'])
+        ),
+        conflict_columns=('hashtag', 'tweet_id'),
+        update_columns=('score',),
+        commit=False,
+        session=session
+    )
+
+    ranked = select(
+        top_table.c.hashtag,
+        top_table.c.tweet_id,
+        func.row_number().over(
+            partition_by=top_table.c.hashtag,
+            order_by=(top_table.c.score.desc(), top_table.c.tweet_id.desc())
+        ).label('rank')
+    ).where(
+        top_table.c.hashtag.in_(list(engagement))
+    ).subquery()
+
+    session.execute(
+        delete(top_table).where(
+            tuple_(top_table.c.hashtag, top_table.c.tweet_id).in_(
+                select(ranked.c.hashtag, ranked.c.tweet_id).where(
+                    ranked.c.rank > LEADERBOARD_SIZE
+                )
+            )
+        )
+    )
+
+    return None
+
+
+def backfill_tweet_hashtags(
+    chunk_size: int = BULK_CHUNK_SIZE,
+    session: sqlalchemy.orm.Session = session
+) -> int:
+    """ Add the hashtags of stored tweets to the tweet_hashtags table.
+
+        Tweets are read in chunks of chunk_size, ordered by id, and the
+        hashtags in the tweet text are upserted, so the backfill can be
+        stopped and run again at any time.
+
+        Args:
+            chunk_size (int, optional):
+                Number of tweets to read and write at a time.  Default
+                value is BULK_CHUNK_SIZE.
+
+            session (sqlalchemy.orm.Session, optional):
+                By default, uses the session object created by the
+                _create_session function.  Allows the ability to pass a
+                mock Session object for pytest testing.
+
+        Returns:
+            tweet_count (int):
+                Number of tweets read.
+    """
+
+    tweet_count = 0
+    last_id = 0
+
+    while True:
+        # Read the next chunk of tweets after the last id
+        tweets = session.query(
+            TweetData.id, TweetData.tweet_id, TweetData.tweet_text
+        ).filter(
+            TweetData.id > last_id
+        ).order_by(
+            TweetData.id.asc()
+        ).limit(chunk_size).all()
+
+        if not tweets:
+            break
+
+        hashtag_rows = (
+            {'tweet_id': str(tweet_id), 'hashtag': hashtag}
+            for _, tweet_id, tweet_text in tweets
+            for hashtag in VALID_HASHTAG.findall((tweet_text or '').lower())
+        )
+
+        bulk_insert(
+            model=TweetHashtag,
+            rows=hashtag_rows,
+            chunk_size=chunk_size,
+            conflict_columns=('tweet_id', 'hashtag'),
+            session=session
+        )
+
+        tweet_count += len(tweets)
+        last_id = tweets[-1][0]
+
+    return tweet_count
+
+
+def rebuild_hashtag_aggregates(
+    session: sqlalchemy.orm.Session = session
+) -> bool:
+    """ Rebuild the hashtag aggregate tables from the stored tweets.
+
+        Ingest keeps the aggregate tables up to date, so this is only
+        needed for tweets stored before the tables existed.  Each table
+        is rebuilt with a single INSERT ... SELECT, in one transaction.
+
+        Args:
+            session (sqlalchemy.orm.Session, optional):
+                By default, uses the session object created by the
+                _create_session function.  Allows the ability to pass a
+                mock Session object for pytest testing.
+
+        Returns:
+            session_active (bool):
+                False if the transaction is complete, True if the
+                transaction is neither committed nor rolled back.
+    """
+
+    _clear_tables(models=HASHTAG_AGGREGATES, session=session)
+
+    tweet_hashtags = select(
+        TweetHashtag.hashtag,
+        TweetData.tweet_id,
+        TweetData.created,
+        func.coalesce(TweetData.likes, 0).label('likes'),
+        func.coalesce(TweetData.retweets, 0).label('retweets')
+    ).join(
+        TweetData, TweetData.tweet_id == TweetHashtag.tweet_id
+    ).subquery()
+
+    day = func.date(tweet_hashtags.c.created)
+    session.execute(insert(HashtagDay).from_select(
+        ['hashtag', 'day', 'count'],
+        select(
+            tweet_hashtags.c.hashtag, day, func.count()
+        ).where(
+            tweet_hashtags.c.created.is_not(None)
+        ).group_by(tweet_hashtags.c.hashtag, day)
+    ))
+
+    session.execute(insert(HashtagEngagement).from_select(
+        ['hashtag', 'tweets', 'likes', 'retweets'],
+        select(
+            tweet_hashtags.c.hashtag,
+            func.count(),
+            func.sum(tweet_hashtags.c.likes),
+            func.sum(tweet_hashtags.c.retweets)
+        ).group_by(tweet_hashtags.c.hashtag)
+    ))
+
+    score = tweet_hashtags.c.likes + tweet_hashtags.c.retweets
+    ranked = select(
+        tweet_hashtags.c.hashtag,
+        tweet_hashtags.c.tweet_id,
+        score.label('score'),
+        func.row_number().over(
+            partition_by=tweet_hashtags.c.hashtag,
+            order_by=(score.desc(), tweet_hashtags.c.tweet_id.desc())
+        ).label('rank')
+    ).subquery()
+    session.execute(insert(HashtagTopTweet).from_select(
+        ['hashtag', 'tweet_id', 'score'],
+        select(
+            ranked.c.hashtag, ranked.c.tweet_id, ranked.c.score
+        ).where(ranked.c.rank <= LEADERBOARD_SIZE)
+    ))
+
+    # Commit the changes to the database
+    session_active = commit_session(
+        session=session
+    )
+
+    return session_active
+
+
+def get_hashtag_days(
+    hashtag: str,
+    session: sqlalchemy.orm.Session = session
+) -> List:
+    """ Get the number of tweets with a hashtag on each day.
+
+        Args:
+            hashtag (str):
+                Hashtag name, with or without the leading #.
+
+            session (sqlalchemy.orm.Session, optional):
+                By default, uses the session object created by the
+                _create_session function.  Allows the ability to pass a
+                mock Session object for pytest testing.
+
+        Returns:
+            hashtag_days (List):
+                HashtagDay objects, oldest day first.
+    """
+
+    hashtag_days = session.query(HashtagDay).filter(
+        HashtagDay.hashtag == hashtag.lstrip('#').lower()
+    ).order_by(
+        HashtagDay.day.asc()
+    ).all()
+
+    return hashtag_days
+
+
+def get_hashtag_engagement(
+    limit: int = None,
+    session: sqlalchemy.orm.Session = session
+) -> List:
+    """ Get the tweet, like, and retweet totals of each hashtag.
+
+        Args:
+            limit (int, optional):
+                Maximum number of hashtags.  Default value is None,
+                and returns every hashtag.
+
+            session (sqlalchemy.orm.Session, optional):
+                By default, uses the session object created by the
+                _create_session function.  Allows the ability to pass a
+                mock Session object for pytest testing.
+
+        Returns:
+            hashtag_engagement (List):
+                HashtagEngagement objects, most tweets first.
+    """
+
+    hashtag_engagement = session.query(HashtagEngagement).order_by(
+        HashtagEngagement.tweets.desc(),
+        HashtagEngagement.hashtag.asc()
+    ).limit(limit).all()
+
+    return hashtag_engagement
+
+
+def get_top_tweets(
+    hashtag: str,
+    limit: int = LEADERBOARD_SIZE,
+    session: sqlalchemy.orm.Session = session
+) -> List:
+    """ Get the leaderboard of top tweets for a hashtag.
+
+        Args:
+            hashtag (str):
+                Hashtag name, with or without the leading #.
+
+            limit (int, optional):
+                Maximum number of tweets.  Default value is
+                LEADERBOARD_SIZE.
+
+            session (sqlalchemy.orm.Session, optional):
+                By default, uses the session object created by the
+                _create_session function.  Allows the ability to pass a
+                mock Session object for pytest testing.
+
+        Returns:
+            top_tweets (List):
+                TweetData objects, highest likes plus retweets first.
+    """
+
+    top_tweets = session.query(TweetData).join(
+        HashtagTopTweet, HashtagTopTweet.tweet_id == TweetData.tweet_id
+    ).filter(
+        HashtagTopTweet.hashtag == hashtag.lstrip('#').lower()
+    ).order_by(
+        HashtagTopTweet.score.desc(),
+        HashtagTopTweet.tweet_id.desc()
+    ).limit(limit).all()
+
+    return top_tweets
+
+
+def _copy_field(
+    value: object
+) -> str:
+    """ Format a value as a PostgreSQL COPY CSV field.
+
+        Args:
+            value (object):
+                Column value.
+
+        Returns:
+            field (str):
+                Unquoted empty field for None (NULL), otherwise the
+                value as a quoted CSV string.
+    """
+
+    if value is None:
+        field = ''
+    else:
+        field = '"' + str(value).replace('"', '""') + '"'
+
+    return field
+
+
+def _copy_rows(
+    table: sqlalchemy.Table,
+    rows: List[Dict],
+    conflict_columns: Iterable[str] = None,
+    update_columns: Iterable[str] = (),
+    increment_columns: Iterable[str] = (),
+    session: sqlalchemy.orm.Session = session
+) -> None:
+    """ Write rows to a table with PostgreSQL COPY FROM STDIN.
+
+        For upserts, rows are copied to a temporary staging table, and
+        moved to the table with INSERT ... ON CONFLICT DO UPDATE.  The
+        staging table is dropped after the move, so a transaction can
+        run several COPY upserts before it commits.
+
+        Args:
+            table (sqlalchemy.Table):
+                Table to write the rows to.
+
+            rows (List[Dict]):
+                Rows to write, as dictionaries with the same keys.
+
+            conflict_columns (Iterable[str], optional):
+                Columns of a unique index to upsert on.  Default value
+                is None, and inserts every row.
+
+            update_columns (Iterable[str], optional):
+                Columns to update when a row already exists.  Default
+                value is an empty tuple.
+
+            increment_columns (Iterable[str], optional):
+                Columns to add the new values to when a row already
+                exists.  Default value is an empty tuple.
+
+            session (sqlalchemy.orm.Session, optional):
+                By default, uses the session object created by the
+                _create_session function.  Must be bound to a
+                PostgreSQL database with a psycopg2 driver.
+
+        Returns:
+            None.
+    """
+
+    columns = list(rows[0])
+
+    # Build the rows as CSV in memory
+    buffer = StringIO()
+    for row in rows:
+        buffer.write(
+            ','.join(_copy_field(value=row[column]) for column in columns)
+        )
+        buffer.write('\n')
+    buffer.seek(0)
+
+    column_list = ', '.join(columns)
+    copy_table = table.name
+    if conflict_columns is not None:
+        copy_table = COPY_STAGING_TABLE
+    copy_sql = (
+        f'COPY {copy_table} ({column_list}) FROM STDIN WITH (FORMAT csv)'
+    )
+
+    # COPY runs on the DBAPI cursor, inside the session's transaction
+    cursor = session.connection().connection.cursor()
+    try:
+        if conflict_columns is not None:
+            cursor.execute(
+                f'CREATE TEMPORARY TABLE {COPY_STAGING_TABLE} '
+                f'ON COMMIT DROP AS SELECT {column_list} '
+                f'FROM {table.name} WITH NO DATA'
+            )
+
+        cursor.copy_expert(sql=copy_sql, file=buffer)
+
+        # Move the staged rows into the table, updating existing rows
+        if conflict_columns is not None:
+            updates = ', '.join(
+                [
+                    f'{column} = EXCLUDED.{column}'
+                    for column in update_columns
+                ] + [
+                    f'{column} = {table.name}.{column} + EXCLUDED.{column}'
+                    for column in increment_columns
+                ]
+            )
+            cursor.execute(
+                f'INSERT INTO {table.name} ({column_list}) '
+                f'SELECT {column_list} FROM {COPY_STAGING_TABLE} '
+                f'ON CONFLICT ({", ".join(conflict_columns)}) '
+                + (f'DO UPDATE SET {updates}' if updates else 'DO NOTHING')
+            )
+            cursor.execute(f'DROP TABLE {COPY_STAGING_TABLE}')
+    finally:
+        cursor.close()
+
+    return None
+
+
+def _upsert_statement(
+    model: Union[type, sqlalchemy.Table],
+    dialect_name: str,
+    conflict_columns: Iterable[str],
+    update_columns: Iterable[str],
+    increment_columns: Iterable[str] = ()
+) -> sqlalchemy.sql.Insert:
+    """ Create an INSERT ... ON CONFLICT DO UPDATE statement.
+
+        Args:
+            model (Union[type, sqlalchemy.Table]):
+                Model class of the table, such as TweetData, or a
+                staging Table.
+
+            dialect_name (str):
+                Database dialect name, such as postgresql or sqlite.
+
+            conflict_columns (Iterable[str]):
+                Columns of a unique index to upsert on.
+
+            update_columns (Iterable[str]):
+                Columns to update when a row already exists.
+
+            increment_columns (Iterable[str], optional):
+                Columns to add the new values to when a row already
+                exists.  Default value is an empty tuple.
+
+        Returns:
+            statement (sqlalchemy.sql.Insert):
+                Dialect insert statement with an ON CONFLICT clause.
+    """
+
+    dialect_insert = UPSERT_INSERTS.get(dialect_name)
+    if dialect_insert is None:
+        raise ValueError(f'Upserts are not supported on "{dialect_name}"')
+
+    statement = dialect_insert(model)
+    updates = {
+        column: statement.excluded[column] for column in update_columns
+    }
+    updates.update({
+        column: statement.table.c[column] + statement.excluded[column]
+        for column in increment_columns
+    })
+
+    if updates:
+        statement = statement.on_conflict_do_update(
+            index_elements=list(conflict_columns),
+            set_=updates
+        )
+    else:
+        statement = statement.on_conflict_do_nothing(
+            index_elements=list(conflict_columns)
+        )
+
+    return statement
+
+
+def bulk_insert(
+    model: Union[type, sqlalchemy.Table],
+    rows: Iterable[Dict],
+    chunk_size: int = BULK_CHUNK_SIZE,
+    conflict_columns: Iterable[str] = None,
+    update_columns: Iterable[str] = (),
+    increment_columns: Iterable[str] = (),
+    commit: bool = True,
+    session: sqlalchemy.orm.Session = session
+) -> bool:
+    """ Write rows to a table in chunked bulk transactions.
+
+        Rows bypass the ORM unit of work and identity map.  Each chunk
+        is written with a single COPY FROM STDIN on PostgreSQL with a
+        psycopg2 driver, or a Core insert executemany otherwise, and
+        is committed as its own transaction.
+
+        With conflict_columns, rows are upserted: rows that match an
+        existing row on those columns update its update_columns.
+
+        Args:
+            model (Union[type, sqlalchemy.Table]):
+                Model class of the table, such as TweetData, or a
+                staging Table.
+
+            rows (Iterable[Dict]):
+                Rows to write, as dictionaries of column values.
+
+            chunk_size (int, optional):
+                Number of rows per transaction.  Default value is
+                BULK_CHUNK_SIZE.
+
+            conflict_columns (Iterable[str], optional):
+                Columns of a unique index to upsert on.  Default value
+                is None, and inserts every row.
+
+            update_columns (Iterable[str], optional):
+                Columns to update when a row already exists.  Default
+                value is an empty tuple, and keeps existing rows as
+                they are.
+
+            increment_columns (Iterable[str], optional):
+                Columns to add the new values to when a row already
+                exists, such as counts.  Default value is an empty
+                tuple.
+
+            commit (bool, optional):
+                When True, commit each chunk as its own transaction.
+                When False, leave the rows in the session's transaction
+                for the caller to commit.  Default value is True.
+
+            session (sqlalchemy.orm.Session, optional):
+                By default, uses the session object created by the
+                _create_session function.  Allows the ability to pass a
+                mock Session object for pytest testing.
+
+        Returns:
+           session_active (bool):
+                False if the transaction is complete, True if the
+                transaction is neither committed nor rolled back.
+    """
+
+    dialect = session.get_bind().dialect
+    use_copy = (
+        dialect.name == 'postgresql' and dialect.driver in COPY_DRIVERS
+    )
+
+    if use_copy or conflict_columns is None:
+        statement = insert(model)
+    else:
+        statement = _upsert_statement(
+            model=model,
+            dialect_name=dialect.name,
+            conflict_columns=conflict_columns,
+            update_columns=update_columns,
+            increment_columns=increment_columns
+        )
+
+    rows = iter(rows)
+    session_active = False
+
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+
+        # A row can only be upserted once per statement, keep the last copy
+        if conflict_columns is not None:
+            chunk = list({
+                tuple(row[column] for column in conflict_columns): row
+                for row in chunk
+            }.values())
+
+        if use_copy:
+            _copy_rows(
+                table=getattr(model, '__table__', model),
+                rows=chunk,
+                conflict_columns=conflict_columns,
+                update_columns=update_columns,
+                increment_columns=increment_columns,
+                session=session
+            )
+        else:
+            session.execute(statement, chunk)
+
+        # Commit each chunk as its own transaction, or leave it to the caller
+        if commit is True:
+            session_active = commit_session(session=session)
+        else:
+            session_active = True
+
+    return session_active
+
+
+def stream_tweet_text(
+    query: sqlalchemy.orm.Query = None,
+    chunk_size: int = STREAM_CHUNK_SIZE,
+    session: sqlalchemy.orm.Session = session
+) -> Iterator[str]:
+    """ Stream tweet text from the database with a server-side cursor.
+
+        Rows are fetched chunk_size at a time, so the whole tweets table
+        is never loaded into memory.
+
+        Args:
+            query (sqlalchemy.orm.Query, optional):
+                Query with the tweet text as its first column, such as
+                a filtered session.query(TweetData.tweet_text).  Default
+                value is None, and streams the text of all tweets.
+
+            chunk_size (int, optional):
+                Number of rows to fetch at a time.  Default value is
+                STREAM_CHUNK_SIZE.
+
+            session (sqlalchemy.orm.Session, optional):
+                By default, uses the session object created by the
+                _create_session function.  Allows the ability to pass a
+                mock Session object for pytest testing.
+
+        Yields:
+            tweet_text (str):
+                Text of each tweet.
+    """
+
+    if query is None:
+        query = session.query(TweetData.tweet_text)
+
+    # Use a server-side cursor, and fetch rows in chunks
+    rows = query.execution_options(
+        stream_results=True
+    ).yield_per(chunk_size)
+
+    for row in rows:
+        yield row[0]
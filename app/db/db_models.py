@@ -3,7 +3,8 @@
 
 # Imports - Python Standard Library
 from sqlalchemy import (
-    Column, DateTime, Integer, String
+    Column, Date, DateTime, DDL, event, Index, Integer, MetaData, String,
+    Table, text
 )
 from sqlalchemy.ext.declarative import declarative_base
 
@@ -13,6 +14,13 @@ from sqlalchemy.ext.declarative import declarative_base
 
 # Constants
 BASE = declarative_base()
+SEARCH_CONFIG = 'english'  # PostgreSQL text search configuration
+SEARCH_FTS_TABLE = 'tweets_fts'  # SQLite FTS5 index of tweet text
+SEARCH_VECTOR = (
+    f"to_tsvector('{SEARCH_CONFIG}'::regconfig, COALESCE(tweet_text, ''))"
+)  # PostgreSQL text search vector, queries must match the index expression
+STAGING_METADATA = MetaData()  # Staging copies of the tables, for refreshes
+STAGING_SUFFIX = '_staging'  # Suffix of staging table and index names
 
 
 class Hashtag(BASE):
@@ -30,7 +38,11 @@ class Hashtag(BASE):
         type_=Integer,
         primary_key=True
     )
-    name = Column(String(40))
+    name = Column(
+        String(40),
+        index=True,
+        unique=True
+    )
     count = Column(Integer)
 
     # Create repr function
@@ -63,16 +75,41 @@ class TweetData(BASE):
     # Assign table name
     __tablename__ = 'tweets'
 
+    # Assign the page order index, and PostgreSQL search indexes
+    __table_args__ = (
+        Index(
+            'ix_tweets_created_id',
+            'created',
+            'id'
+        ),
+        Index(
+            'ix_tweets_tweet_text_tsv',
+            text(SEARCH_VECTOR),
+            postgresql_using='gin'
+        ).ddl_if(dialect='postgresql'),
+        Index(
+            'ix_tweets_tweet_text_trgm',
+            'tweet_text',
+            postgresql_using='gin',
+            postgresql_ops={'tweet_text': 'gin_trgm_ops'}
+        ).ddl_if(dialect='postgresql')
+    )
+
     # Assign table columns
     id = Column(
         type_=Integer,
         primary_key=True
     )
-    tweet_id = Column(String(22))
+    tweet_id = Column(
+        String(22),
+        index=True,
+        unique=True
+    )
     tweet_text = Column(String(300))
     created = Column(DateTime)
     likes = Column(Integer)
     retweets = Column(Integer)
+    screen_name = Column(String(15))
 
     # Create repr function
     def __repr__(self):
@@ -94,3 +131,406 @@ class TweetData(BASE):
         )
 
         return repr_string
+
+
+# Create the pg_trgm extension before the trigram index
+event.listen(
+    BASE.metadata,
+    'before_create',
+    DDL('CREATE EXTENSION IF NOT EXISTS pg_trgm').execute_if(
+        dialect='postgresql'
+    )
+)
+
+
+def create_sqlite_search(
+    connection
+) -> None:
+    """ Create an SQLite FTS5 index of the tweets table.
+
+        The FTS5 table stores no text of its own, and is kept in sync
+        with the tweets table by triggers.  It is built from the rows
+        already in the tweets table.
+
+        Args:
+            connection (sqlalchemy.engine.Connection):
+                Connection to an SQLite database without an FTS5 index.
+
+        Returns:
+            None.
+    """
+
+    statements = (
+        f"CREATE VIRTUAL TABLE {SEARCH_FTS_TABLE} USING fts5("
+        "tweet_text, content='tweets', content_rowid='id', "
+        "tokenize='porter unicode61')",
+        f"CREATE TRIGGER {SEARCH_FTS_TABLE}_insert AFTER INSERT ON tweets "
+        f"BEGIN INSERT INTO {SEARCH_FTS_TABLE}(rowid, tweet_text) "
+        "VALUES (new.id, new.tweet_text); END",
+        f"CREATE TRIGGER {SEARCH_FTS_TABLE}_delete AFTER DELETE ON tweets "
+        f"BEGIN INSERT INTO {SEARCH_FTS_TABLE}"
+        f"({SEARCH_FTS_TABLE}, rowid, tweet_text) "
+        "VALUES ('delete', old.id, old.tweet_text); END",
+        f"CREATE TRIGGER {SEARCH_FTS_TABLE}_update "
+        "AFTER UPDATE OF tweet_text ON tweets "
+        f"BEGIN INSERT INTO {SEARCH_FTS_TABLE}"
+        f"({SEARCH_FTS_TABLE}, rowid, tweet_text) "
+        "VALUES ('delete', old.id, old.tweet_text); "
+        f"INSERT INTO {SEARCH_FTS_TABLE}(rowid, tweet_text) "
+        "VALUES (new.id, new.tweet_text); END",
+        f"INSERT INTO {SEARCH_FTS_TABLE}({SEARCH_FTS_TABLE}) "
+        "VALUES ('rebuild')"
+    )
+
+    for statement in statements:
+        connection.exec_driver_sql(statement)
+
+    return None
+
+
+@event.listens_for(BASE.metadata, 'after_create')
+def _create_sqlite_search(
+    target,
+    connection,
+    **kwargs
+) -> None:
+    """ Create the SQLite FTS5 index of tweet text, if it is missing.
+
+        Args:
+            target (sqlalchemy.MetaData):
+                MetaData object of the created tables.
+
+            connection (sqlalchemy.engine.Connection):
+                Connection the tables were created with.
+
+            kwargs:
+                Additional event arguments.
+
+        Returns:
+            None.
+    """
+
+    if connection.dialect.name != 'sqlite':
+        return None
+
+    exists = connection.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE name = ?",
+        (SEARCH_FTS_TABLE,)
+    ).first()
+
+    if exists is None:
+        create_sqlite_search(connection=connection)
+
+    return None
+
+
+class TweetHashtag(BASE):
+    """ Create table for the hashtags in each tweet.
+
+        Associates each tweet_id with the hashtags in the tweet, so
+        tweets can be filtered by exact hashtag with an index lookup.
+
+        Args:
+            BASE (sqlalchemy.ext.declarative.declarative_base)
+    """
+
+    # Assign table name
+    __tablename__ = 'tweet_hashtags'
+
+    # Assign table columns
+    tweet_id = Column(
+        String(22),
+        primary_key=True
+    )
+    hashtag = Column(
+        String(140),
+        primary_key=True,
+        index=True
+    )
+
+    # Create repr function
+    def __repr__(self):
+        """ Function that returns the tweet ID and hashtag.
+
+            Args:
+                None.
+
+            Returns:
+                repr_string (str):
+                    Returns a string with the tweet ID and hashtag.
+        """
+
+        repr_string = (
+            f'<TweetHashtag(tweet_id={self.tweet_id}, '
+            f'hashtag={self.hashtag})>'
+        )
+
+        return repr_string
+
+
+class HashtagDay(BASE):
+    """ Create table for the number of tweets with each hashtag per day.
+
+        Args:
+            BASE (sqlalchemy.ext.declarative.declarative_base)
+    """
+
+    # Assign table name
+    __tablename__ = 'hashtag_days'
+
+    # Assign table columns
+    hashtag = Column(
+        String(140),
+        primary_key=True
+    )
+    day = Column(
+        Date,
+        primary_key=True
+    )
+    count = Column(Integer)
+
+    # Create repr function
+    def __repr__(self):
+        """ Function that returns the hashtag, day, and count.
+
+            Args:
+                None.
+
+            Returns:
+                repr_string (str):
+                    Returns a string with the hashtag, day, and count.
+        """
+
+        repr_string = (
+            f'<HashtagDay(hashtag={self.hashtag}, day={self.day}, '
+            f'count={self.count})>'
+        )
+
+        return repr_string
+
+
+class HashtagEngagement(BASE):
+    """ Create table for the total engagement of tweets with each hashtag.
+
+        Args:
+            BASE (sqlalchemy.ext.declarative.declarative_base)
+    """
+
+    # Assign table name
+    __tablename__ = 'hashtag_engagement'
+
+    # Assign table columns
+    hashtag = Column(
+        String(140),
+        primary_key=True
+    )
+    tweets = Column(Integer)
+    likes = Column(Integer)
+    retweets = Column(Integer)
+
+    # Create repr function
+    def __repr__(self):
+        """ Function that returns the hashtag and engagement totals.
+
+            Args:
+                None.
+
+            Returns:
+                repr_string (str):
+                    Returns a string with the hashtag, tweet count,
+                    likes, and retweets.
+        """
+
+        repr_string = (
+            f'<HashtagEngagement(hashtag={self.hashtag}, '
+            f'tweets={self.tweets}, likes={self.likes}, '
+            f'retweets={self.retweets})>'
+        )
+
+        return repr_string
+
+
+class HashtagTopTweet(BASE):
+    """ Create table for the leaderboard of top tweets for each hashtag.
+
+        Holds the tweets with the highest score (likes plus retweets)
+        for each hashtag.
+
+        Args:
+            BASE (sqlalchemy.ext.declarative.declarative_base)
+    """
+
+    # Assign table name
+    __tablename__ = 'hashtag_top_tweets'
+
+    # Assign the leaderboard order index
+    __table_args__ = (
+        Index(
+            'ix_hashtag_top_tweets_hashtag_score',
+            'hashtag',
+            'score'
+        ),
+    )
+
+    # Assign table columns
+    hashtag = Column(
+        String(140),
+        primary_key=True
+    )
+    tweet_id = Column(
+        String(22),
+        primary_key=True
+    )
+    score = Column(Integer)
+
+    # Create repr function
+    def __repr__(self):
+        """ Function that returns the hashtag, tweet ID, and score.
+
+            Args:
+                None.
+
+            Returns:
+                repr_string (str):
+                    Returns a string with the hashtag, tweet ID, and
+                    score.
+        """
+
+        repr_string = (
+            f'<HashtagTopTweet(hashtag={self.hashtag}, '
+            f'tweet_id={self.tweet_id}, score={self.score})>'
+        )
+
+        return repr_string
+
+
+class DatasetVersion(BASE):
+    """ Create table for the version of the stored dataset.
+
+        Holds a single row, with a version number that is incremented
+        each time ingest commits new data, so readers can tell when
+        cached query results are out of date.
+
+        Args:
+            BASE (sqlalchemy.ext.declarative.declarative_base)
+    """
+
+    # Assign table name
+    __tablename__ = 'dataset_version'
+
+    # Assign table columns
+    id = Column(
+        type_=Integer,
+        primary_key=True
+    )
+    version = Column(Integer)
+    updated = Column(DateTime)
+
+    # Create repr function
+    def __repr__(self):
+        """ Function that returns the dataset version and update time.
+
+            Args:
+                None.
+
+            Returns:
+                repr_string (str):
+                    Returns a string with the version and update time.
+        """
+
+        repr_string = (
+            f'<DatasetVersion(version={self.version}, '
+            f'updated={self.updated})>'
+        )
+
+        return repr_string
+
+
+class IngestMark(BASE):
+    """ Create table for the high-water mark of each account.
+
+        Holds the newest tweet ID of each account whose ingest finished,
+        so every older tweet of the account is stored, and incremental
+        loads can start from it.
+
+        Args:
+            BASE (sqlalchemy.ext.declarative.declarative_base)
+    """
+
+    # Assign table name
+    __tablename__ = 'ingest_marks'
+
+    # Assign table columns
+    screen_name = Column(
+        String(15),
+        primary_key=True
+    )
+    since_id = Column(String(22))
+    updated = Column(DateTime)
+
+    # Create repr function
+    def __repr__(self):
+        """ Function that returns the account and its high-water mark.
+
+            Args:
+                None.
+
+            Returns:
+                repr_string (str):
+                    Returns a string with the account, tweet ID, and
+                    update time.
+        """
+
+        repr_string = (
+            f'<IngestMark(screen_name={self.screen_name}, '
+            f'since_id={self.since_id}, updated={self.updated})>'
+        )
+
+        return repr_string
+
+
+def _staging_table(
+    model: type
+) -> Table:
+    """ Create a staging copy of the table of a model.
+
+        The copy has the same columns and indexes, with the table name
+        and index names suffixed with STAGING_SUFFIX, so both tables
+        can exist side by side.
+
+        Args:
+            model (type):
+                Model class of the table, such as TweetData.
+
+        Returns:
+            table (sqlalchemy.Table):
+                Staging table in STAGING_METADATA.
+    """
+
+    name = f'{model.__tablename__}{STAGING_SUFFIX}'
+    table = model.__table__.to_metadata(STAGING_METADATA, name=name)
+
+    for index in table.indexes:
+        # Column indexes are renamed by to_metadata, explicit indexes are not
+        if not index.name.startswith(f'ix_{name}_'):
+            index.name = index.name.replace(
+                f'ix_{model.__tablename__}_',
+                f'ix_{name}_',
+                1
+            )
+
+        # Indexes with PostgreSQL index methods are only for PostgreSQL
+        if index.dialect_options['postgresql']['using']:
+            index.ddl_if(dialect='postgresql')
+
+    return table
+
+
+# Staging tables for dataset refreshes, in the order they are swapped
+STAGING_TABLES = {
+    model: _staging_table(model=model)
+    for model in (
+        TweetData, TweetHashtag, Hashtag, HashtagDay, HashtagEngagement,
+        HashtagTopTweet
+    )
+}
@@ -0,0 +1,491 @@
+#!/usr/bin/env python3
+""" Local stand-in for the Twitter API, for ww-tweeter load tests.
+
+    Serves a synthetic statuses/user_timeline endpoint over plain HTTP,
+    with max_id/since_id/count paging, configurable latency, and
+    x-rate-limit-* headers with 429 responses.  Point the tweeter at it
+    with the TWITTER_API_HOST environment variable, for example:
+        python -m app.tweeter.local_api --port 8000 --latency 0.05
+        TWITTER_API_HOST=http://localhost:8000 python -m app.tweeter.tweeter
+"""
+
+# Imports - Python Standard Library
+from argparse import ArgumentParser
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from random import Random
+from threading import Lock, Thread
+from time import sleep, time
+from typing import Dict, Iterable, List
+from urllib.parse import parse_qs, urlsplit
+import json
+
+# Imports - Third-Party
+from requests.adapters import HTTPAdapter
+
+# Imports - Local
+
+# Constants
+LOCAL_API_ACCOUNTS = ['wwt_inc']
+LOCAL_API_DEFAULT_COUNT = 20
+LOCAL_API_HASHTAGS = [
+    'ai', 'brand', 'cloud', 'data', 'devops', 'edge', 'iot', 'network',
+    'python', 'security', 'wwt', '5g'
+]
+LOCAL_API_HOST = '127.0.0.1'
+LOCAL_API_MAX_COUNT = 200
+LOCAL_API_PORT = 8000
+LOCAL_API_RATE_LIMIT = 900  # Requests per window for user_timeline
+LOCAL_API_RATE_LIMIT_WINDOW = 900  # Rate limit window length, in seconds
+LOCAL_API_TWEETS = 3200  # Tweets per account in the synthetic corpus
+TIMELINE_PATH = '/1.1/statuses/user_timeline.json'
+TWITTER_EPOCH = 1288834974657  # Tweet ID (snowflake) epoch, in milliseconds
+
+
+# Classes
+class PlainHTTPAdapter(HTTPAdapter):
+    """ requests adapter that sends https:// requests over plain HTTP.
+
+        tweepy always builds https:// URLs, so this adapter is mounted
+        on a tweepy API session to reach a LocalTwitterAPI server.
+    """
+
+    def send(self, request, **kwargs):
+        """ Rewrite the request URL scheme, and send the request.
+
+            Args:
+                request (requests.PreparedRequest):
+                    Request to send.
+
+                kwargs:
+                    Keyword arguments for HTTPAdapter.send.
+
+            Returns:
+                response (requests.Response):
+                    HTTP response.
+        """
+
+        if request.url.startswith('https://'):
+            request.url = 'http://' + request.url[len('https://'):]
+
+        response = super().send(request, **kwargs)
+
+        return response
+
+
+class _TimelineHandler(BaseHTTPRequestHandler):
+    """ HTTP request handler for a LocalTwitterAPI server. """
+
+    def do_GET(self) -> None:
+        """ Respond to a statuses/user_timeline request.
+
+            Args:
+                None.
+
+            Returns:
+                None.
+        """
+
+        api = self.server.local_api
+        url = urlsplit(self.path)
+        params = {
+            key: values[0] for key, values in parse_qs(url.query).items()
+        }
+
+        if url.path != TIMELINE_PATH:
+            self._send_json(
+                status=404,
+                payload={'errors': [{'code': 34, 'message': 'Not found'}]}
+            )
+            return None
+
+        # Take a request from the rate limit window, or respond with a 429
+        allowed, headers = api.take_request()
+        if not allowed:
+            self._send_json(
+                status=429,
+                payload={
+                    'errors': [{'code': 88, 'message': 'Rate limit exceeded'}]
+                },
+                headers=headers
+            )
+            return None
+
+        if api.latency:
+            sleep(api.latency)
+
+        page = api.timeline(
+            screen_name=params.get('screen_name'),
+            since_id=int(params.get('since_id', 0)),
+            max_id=params.get('max_id'),
+            count=int(params.get('count', LOCAL_API_DEFAULT_COUNT))
+        )
+
+        self._send_json(status=200, payload=page, headers=headers)
+
+        return None
+
+    def _send_json(
+        self,
+        status: int,
+        payload,
+        headers: Dict = None
+    ) -> None:
+        """ Send a JSON response.
+
+            Args:
+                status (int):
+                    HTTP status code.
+
+                payload:
+                    JSON serializable response payload.
+
+                headers (Dict, optional):
+                    Additional response headers.  Default value is
+                    None.
+
+            Returns:
+                None.
+        """
+
+        body = json.dumps(payload).encode('utf-8')
+
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json;charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        for header, value in (headers or {}).items():
+            self.send_header(header, str(value))
+        self.end_headers()
+        self.wfile.write(body)
+
+        return None
+
+    def log_message(self, format, *args) -> None:
+        """ Silence per-request logging, which slows load tests. """
+
+        return None
+
+
+class LocalTwitterAPI:
+    """ Local HTTP server that mimics the statuses/user_timeline endpoint.
+
+        Usable as a context manager, which starts the server in a
+        background thread and stops it on exit.
+    """
+
+    def __init__(
+        self,
+        host: str = LOCAL_API_HOST,
+        port: int = 0,
+        corpus: Dict[str, List[Dict]] = None,
+        latency: float = 0.0,
+        rate_limit: int = LOCAL_API_RATE_LIMIT,
+        window: int = LOCAL_API_RATE_LIMIT_WINDOW
+    ) -> None:
+        """ Class initialization method.
+
+            Args:
+                host (str, optional):
+                    Address to listen on.  Default value is
+                    LOCAL_API_HOST.
+
+                port (int, optional):
+                    Port to listen on.  Default value is 0, and uses a
+                    free port.
+
+                corpus (Dict[str, List[Dict]], optional):
+                    Dictionary of screen names and their tweets, newest
+                    first.  Default value is None, and uses
+                    synthetic_corpus().
+
+                latency (float, optional):
+                    Seconds to wait before each timeline response.
+                    Default value is 0.0.
+
+                rate_limit (int, optional):
+                    Requests allowed per window.  Default value is
+                    LOCAL_API_RATE_LIMIT.
+
+                window (int, optional):
+                    Rate limit window length, in seconds.  Default
+                    value is LOCAL_API_RATE_LIMIT_WINDOW.
+
+            Returns:
+                None.
+        """
+
+        self.corpus = synthetic_corpus() if corpus is None else corpus
+        self.latency = latency
+        self.rate_limit = rate_limit
+        self.window = window
+        self.requests = 0
+        self._remaining = rate_limit
+        self._reset = int(time()) + window
+        self._lock = Lock()
+        self._thread = None
+
+        self.server = ThreadingHTTPServer((host, port), _TimelineHandler)
+        self.server.daemon_threads = True
+        self.server.local_api = self
+
+        return None
+
+    @property
+    def url(self) -> str:
+        """ Base URL of the server, for the TWITTER_API_HOST variable.
+
+            Args:
+                None.
+
+            Returns:
+                url (str):
+                    URL in the format http://host:port.
+        """
+
+        host, port = self.server.server_address[:2]
+        url = f'http://{host}:{port}'
+
+        return url
+
+    def take_request(self) -> tuple:
+        """ Count a request against the rate limit window.
+
+            Args:
+                None.
+
+            Returns:
+                allowed, headers (tuple):
+                    True if the request is within the rate limit, and a
+                    dictionary of x-rate-limit-* headers.
+        """
+
+        with self._lock:
+            self.requests += 1
+
+            # Start a new window when the current window expires
+            now = int(time())
+            if now >= self._reset:
+                self._remaining = self.rate_limit
+                self._reset = now + self.window
+
+            allowed = self._remaining > 0
+            if allowed:
+                self._remaining -= 1
+
+            headers = {
+                'x-rate-limit-limit': self.rate_limit,
+                'x-rate-limit-remaining': self._remaining,
+                'x-rate-limit-reset': self._reset
+            }
+
+        return allowed, headers
+
+    def timeline(
+        self,
+        screen_name: str,
+        since_id: int = 0,
+        max_id: str = None,
+        count: int = LOCAL_API_DEFAULT_COUNT
+    ) -> List[Dict]:
+        """ Get a page of an account's timeline.
+
+            Args:
+                screen_name (str):
+                    Twitter account to get tweets for.
+
+                since_id (int, optional):
+                    Only include tweets with a greater ID.  Default
+                    value is 0.
+
+                max_id (str, optional):
+                    Only include tweets with an ID less than or equal
+                    to this ID.  Default value is None.
+
+                count (int, optional):
+                    Maximum number of tweets, capped at
+                    LOCAL_API_MAX_COUNT.  Default value is
+                    LOCAL_API_DEFAULT_COUNT.
+
+            Returns:
+                page (List[Dict]):
+                    List of tweets, newest first.
+        """
+
+        count = min(count, LOCAL_API_MAX_COUNT)
+        page = []
+
+        for tweet in self.corpus.get(screen_name, []):
+            if max_id is not None and tweet['id'] > int(max_id):
+                continue
+            if tweet['id'] <= since_id or len(page) >= count:
+                break
+            page.append(tweet)
+
+        return page
+
+    def start(self) -> 'LocalTwitterAPI':
+        """ Start serving requests in a background thread.
+
+            Args:
+                None.
+
+            Returns:
+                self (LocalTwitterAPI):
+                    The running server.
+        """
+
+        self._thread = Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+
+        return self
+
+    def stop(self) -> None:
+        """ Stop serving requests, and close the server socket.
+
+            Args:
+                None.
+
+            Returns:
+                None.
+        """
+
+        self.server.shutdown()
+        self.server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+        return None
+
+    def __enter__(self):
+        """ Context manager entry, starts the server. """
+
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        """ Context manager exit, stops the server. """
+
+        self.stop()
+
+        return None
+
+
+# Functions
+def synthetic_corpus(
+    accounts: Iterable[str] = None,
+    tweets: int = LOCAL_API_TWEETS,
+    seed: int = 0
+) -> Dict[str, List[Dict]]:
+    """ Create reproducible timelines of tweets in the Twitter API format.
+
+        Args:
+            accounts (Iterable[str], optional):
+                Screen names to create timelines for.  Default value is
+                None, and uses LOCAL_API_ACCOUNTS.
+
+            tweets (int, optional):
+                Number of tweets per account.  Default value is
+                LOCAL_API_TWEETS.
+
+            seed (int, optional):
+                Random seed for tweet text and engagement.  Default
+                value is 0.
+
+        Returns:
+            corpus (Dict[str, List[Dict]]):
+                Dictionary of screen names and their tweets, newest
+                first.
+    """
+
+    if accounts is None:
+        accounts = LOCAL_API_ACCOUNTS
+
+    random = Random(seed)
+    start = datetime(2022, 1, 1, tzinfo=timezone.utc)
+    corpus = {}
+
+    for user_id, screen_name in enumerate(accounts, start=1):
+        user = {
+            'id': user_id,
+            'id_str': str(user_id),
+            'name': screen_name,
+            'screen_name': screen_name
+        }
+        timeline = []
+
+        for index in range(tweets):
+            created = start + timedelta(hours=index, seconds=user_id)
+            milliseconds = int(created.timestamp() * 1000)
+            tweet_id = ((milliseconds - TWITTER_EPOCH) << 22) + user_id
+            text = f'Synthetic tweet {index} from {screen_name}'
+            entities = []
+
+            # Append hashtags to the text, recording their positions
+            hashtag_total = random.randint(0, 3)
+            for hashtag in random.sample(LOCAL_API_HASHTAGS, k=hashtag_total):
+                start_index = len(text) + 1
+                text = f'{text} #{hashtag}'
+                entities.append({
+                    'text': hashtag,
+                    'indices': [start_index, len(text)]
+                })
+
+            timeline.append({
+                'created_at': format_datetime(created),
+                'id': tweet_id,
+                'id_str': str(tweet_id),
+                'text': text,
+                'entities': {'hashtags': entities},
+                'user': user,
+                'favorite_count': random.randint(0, 500),
+                'retweet_count': random.randint(0, 100)
+            })
+
+        timeline.reverse()
+        corpus[screen_name] = timeline
+
+    return corpus
+
+
+def main() -> None:
+    """ Main program, run a LocalTwitterAPI server until interrupted.
+
+        Args:
+            None.
+
+        Returns:
+            None.
+    """
+
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default=LOCAL_API_HOST)
+    parser.add_argument('--port', type=int, default=LOCAL_API_PORT)
+    parser.add_argument('--accounts', default=','.join(LOCAL_API_ACCOUNTS))
+    parser.add_argument('--tweets', type=int, default=LOCAL_API_TWEETS)
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--rate-limit', type=int, default=LOCAL_API_RATE_LIMIT)
+    args = parser.parse_args()
+
+    local_api = LocalTwitterAPI(
+        host=args.host,
+        port=args.port,
+        corpus=synthetic_corpus(
+            accounts=args.accounts.split(','),
+            tweets=args.tweets
+        ),
+        latency=args.latency,
+        rate_limit=args.rate_limit
+    )
+
+    print(f'Serving the Twitter API stand-in at {local_api.url}')
+
+    try:
+        local_api.server.serve_forever()
+    except KeyboardInterrupt:
+        local_api.server.server_close()
+
+    return None
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+""" Producer/consumer ingest pipeline for ww-tweeter. """
+
+# Imports - Python Standard Library
+from queue import Empty, Full, Queue
+from threading import Event, Lock, Thread
+from time import perf_counter
+from typing import Callable, Dict, Iterable, List
+import logging
+
+# Imports - Third-Party
+
+# Imports - Local
+
+# Constants
+PIPELINE_CHUNK_SIZE = 200  # Number of items in each queued chunk
+PIPELINE_QUEUE_SIZE = 8  # Maximum number of chunks waiting for a writer
+PIPELINE_WRITERS = 2  # Number of writer threads
+PIPELINE_POLL_INTERVAL = 0.1  # Seconds between shutdown checks
+
+_EXHAUSTED = object()  # Marker for the end of the fetch stage items
+
+# Logging
+log = logging.getLogger(__name__)
+
+
+# Classes
+class StageStats:
+    """ Throughput statistics for one pipeline stage. """
+
+    def __init__(
+        self,
+        name: str
+    ) -> None:
+        """ Class initialization method.
+
+            Args:
+                name (str):
+                    Name of the pipeline stage.
+
+            Returns:
+                None.
+        """
+
+        self.name = name
+        self.items = 0
+        self.busy = 0.0  # Seconds spent doing work
+        self.blocked = 0.0  # Seconds spent waiting on the other stage
+        self._lock = Lock()
+
+        return None
+
+    def record(
+        self,
+        items: int,
+        busy: float,
+        blocked: float = 0.0
+    ) -> None:
+        """ Add work done by the stage.
+
+            Args:
+                items (int):
+                    Number of items processed.
+
+                busy (float):
+                    Seconds spent processing the items.
+
+                blocked (float, optional):
+                    Seconds spent waiting on the other stage.  Default
+                    value is 0.0.
+
+            Returns:
+                None.
+        """
+
+        with self._lock:
+            self.items += items
+            self.busy += busy
+            self.blocked += blocked
+
+        return None
+
+    @property
+    def throughput(self) -> float:
+        """ Items processed per busy second.
+
+            Args:
+                None.
+
+            Returns:
+                throughput (float):
+                    Items per second, or 0.0 if no time was recorded.
+        """
+
+        throughput = self.items / self.busy if self.busy else 0.0
+
+        return throughput
+
+    def __repr__(self):
+        """ Function that returns the stage statistics.
+
+            Args:
+                None.
+
+            Returns:
+                repr_string (str):
+                    Returns a string with the stage name, item count,
+                    throughput, and blocked time.
+        """
+
+        repr_string = (
+            f'<StageStats(name={self.name}, items={self.items}, '
+            f'throughput={self.throughput:.1f}/s, '
+            f'blocked={self.blocked:.3f}s)>'
+        )
+
+        return repr_string
+
+
+class IngestPipeline:
+    """ Overlap a fetch stage with one or more writer threads.
+
+        The fetch stage iterates the source in the calling thread and
+        puts chunks on a bounded queue, blocking when the writers fall
+        behind.  Writer threads drain the queue with the writer
+        function.  The first error in either stage stops both stages
+        and is raised from IngestPipeline.run.
+    """
+
+    def __init__(
+        self,
+        writer: Callable[[List], None],
+        writers: int = PIPELINE_WRITERS,
+        chunk_size: int = PIPELINE_CHUNK_SIZE,
+        queue_size: int = PIPELINE_QUEUE_SIZE
+    ) -> None:
+        """ Class initialization method.
+
+            Args:
+                writer (Callable[[List], None]):
+                    Function that writes a chunk of items.  Called from
+                    several threads when writers is greater than 1.
+
+                writers (int, optional):
+                    Number of writer threads.  Default value is
+                    PIPELINE_WRITERS.
+
+                chunk_size (int, optional):
+                    Number of items in each queued chunk.  Default
+                    value is PIPELINE_CHUNK_SIZE.
+
+                queue_size (int, optional):
+                    Maximum number of chunks waiting for a writer.
+                    Default value is PIPELINE_QUEUE_SIZE.
+
+            Returns:
+                None.
+        """
+
+        self.writer = writer
+        self.writers = writers
+        self.chunk_size = chunk_size
+        self.queue_size = queue_size
+        self.stats = {}
+
+        return None
+
+    def _put(
+        self,
+        chunk: List,
+        queue: Queue,
+        stop: Event
+    ) -> bool:
+        """ Put a chunk on the queue, unless the pipeline is stopping.
+
+            Args:
+                chunk (List):
+                    Chunk of items for the writers.
+
+                queue (queue.Queue):
+                    Bounded queue shared with the writers.
+
+                stop (threading.Event):
+                    Event set when a writer fails.
+
+            Returns:
+                queued (bool):
+                    True if the chunk was queued, False if the pipeline
+                    is stopping.
+        """
+
+        while not stop.is_set():
+            try:
+                queue.put(chunk, timeout=PIPELINE_POLL_INTERVAL)
+            except Full:
+                continue
+
+            return True
+
+        return False
+
+    def _write(
+        self,
+        queue: Queue,
+        stop: Event,
+        errors: List
+    ) -> None:
+        """ Writer thread loop, draining chunks until a shutdown marker.
+
+            Args:
+                queue (queue.Queue):
+                    Bounded queue shared with the fetch stage.
+
+                stop (threading.Event):
+                    Event set when either stage fails.
+
+                errors (List):
+                    List that collects writer exceptions.
+
+            Returns:
+                None.
+        """
+
+        stats = self.stats['write']
+
+        while not stop.is_set():
+            start = perf_counter()
+            try:
+                chunk = queue.get(timeout=PIPELINE_POLL_INTERVAL)
+            except Empty:
+                stats.record(items=0, busy=0.0, blocked=perf_counter() - start)
+                continue
+            waited = perf_counter() - start
+
+            # A None chunk is the shutdown marker
+            if chunk is None:
+                break
+
+            try:
+                start = perf_counter()
+                self.writer(chunk)
+                stats.record(
+                    items=len(chunk),
+                    busy=perf_counter() - start,
+                    blocked=waited
+                )
+            except Exception as e:
+                errors.append(e)
+                stop.set()
+
+        return None
+
+    def _fetch(
+        self,
+        items: Iterable,
+        queue: Queue,
+        stop: Event
+    ) -> None:
+        """ Fetch stage loop, chunking items onto the queue.
+
+            Args:
+                items (Iterable):
+                    Iterable object with items to write.
+
+                queue (queue.Queue):
+                    Bounded queue shared with the writers.
+
+                stop (threading.Event):
+                    Event set when a writer fails.
+
+            Returns:
+                None.
+        """
+
+        stats = self.stats['fetch']
+        iterator = iter(items)
+        chunk = []
+
+        while True:
+            start = perf_counter()
+            item = next(iterator, _EXHAUSTED)
+            if item is _EXHAUSTED:
+                break
+            stats.record(items=1, busy=perf_counter() - start)
+            chunk.append(item)
+
+            if len(chunk) >= self.chunk_size:
+                start = perf_counter()
+                if not self._put(chunk=chunk, queue=queue, stop=stop):
+                    return None
+                stats.record(items=0, busy=0.0, blocked=perf_counter() - start)
+                chunk = []
+
+        if chunk:
+            self._put(chunk=chunk, queue=queue, stop=stop)
+
+        return None
+
+    def run(
+        self,
+        items: Iterable
+    ) -> Dict[str, StageStats]:
+        """ Run the pipeline until the items are exhausted.
+
+            Args:
+                items (Iterable):
+                    Iterable object with items to write, such as a
+                    tweepy Cursor.
+
+            Returns:
+                stats (Dict[str, StageStats]):
+                    Statistics for the fetch and write stages.
+        """
+
+        self.stats = {
+            'fetch': StageStats(name='fetch'),
+            'write': StageStats(name='write')
+        }
+        queue = Queue(maxsize=self.queue_size)
+        stop = Event()
+        errors = []
+
+        # Start the writer threads
+        threads = [
+            Thread(
+                target=self._write,
+                kwargs={'queue': queue, 'stop': stop, 'errors': errors},
+                daemon=True
+            )
+            for _ in range(self.writers)
+        ]
+        for thread in threads:
+            thread.start()
+
+        try:
+            self._fetch(items=items, queue=queue, stop=stop)
+        except BaseException:
+            stop.set()
+            raise
+        finally:
+            # Send one shutdown marker per writer, and wait for them to exit
+            for _ in threads:
+                if not self._put(chunk=None, queue=queue, stop=stop):
+                    break
+            for thread in threads:
+                thread.join()
+
+        # Raise the first writer error in the calling thread
+        if errors:
+            raise errors[0]
+
+        for stage in self.stats.values():
+            log.debug(stage)
+
+        return self.stats
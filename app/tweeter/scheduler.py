@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+""" Twitter API rate limit scheduler for ww-tweeter. """
+
+# Imports - Python Standard Library
+from functools import wraps
+from threading import Condition
+from time import time
+from types import MethodType
+from typing import Callable, Dict, Mapping, Union
+
+# Imports - Third-Party
+from tweepy.api import API
+import tweepy
+
+# Imports - Local
+
+# Constants
+RATE_LIMIT_WINDOW = 900  # Twitter rate limit window length, in seconds
+RATE_LIMITS = {
+    # Requests per window for each endpoint, with user authentication
+    'statuses/user_timeline': 900
+}
+RATE_LIMIT_DEFAULT = 15
+
+
+# Classes
+class RateLimiter:
+    """ Thread-safe token bucket scheduler for Twitter API endpoints.
+
+        Each endpoint has a bucket of tokens that refills at the start
+        of each rate limit window.  Callers take a token before each
+        request, and block until the next window when the bucket is
+        empty.  The x-rate-limit-* response headers keep each bucket
+        in sync with the limits Twitter reports.
+    """
+
+    def __init__(
+        self,
+        limits: Mapping = None,
+        window: int = RATE_LIMIT_WINDOW
+    ) -> None:
+        """ Class initialization method.
+
+            Args:
+                limits (Mapping, optional):
+                    Mapping of endpoint names to requests per window.
+                    Default value is None, and uses RATE_LIMITS.
+
+                window (int, optional):
+                    Rate limit window length, in seconds.  Default
+                    value is RATE_LIMIT_WINDOW.
+
+            Returns:
+                None.
+        """
+
+        self.limits = dict(RATE_LIMITS if limits is None else limits)
+        self.window = window
+        self.buckets = {}
+        self._condition = Condition()
+
+        return None
+
+    def _bucket(
+        self,
+        endpoint: str,
+        now: float
+    ) -> Dict:
+        """ Get the bucket for an endpoint, refilling it if required.
+
+            Args:
+                endpoint (str):
+                    Twitter API endpoint name.
+
+                now (float):
+                    Current epoch time, in seconds.
+
+            Returns:
+                bucket (Dict):
+                    Dictionary with limit, remaining, and reset keys.
+        """
+
+        bucket = self.buckets.get(endpoint)
+
+        # Create a bucket, or refill it when the rate limit window resets
+        if bucket is None or now >= bucket['reset']:
+            limit = self.limits.get(endpoint, RATE_LIMIT_DEFAULT)
+            bucket = {
+                'limit': limit,
+                'remaining': limit,
+                'reset': now + self.window
+            }
+            self.buckets[endpoint] = bucket
+
+        return bucket
+
+    def acquire(
+        self,
+        endpoint: str
+    ) -> None:
+        """ Take a token for an endpoint, waiting for one if required.
+
+            Args:
+                endpoint (str):
+                    Twitter API endpoint name.
+
+            Returns:
+                None.
+        """
+
+        with self._condition:
+            while True:
+                now = time()
+                bucket = self._bucket(endpoint=endpoint, now=now)
+
+                if bucket['remaining'] > 0:
+                    bucket['remaining'] -= 1
+                    break
+
+                # Wait for the window to reset, or for a header update
+                self._condition.wait(timeout=bucket['reset'] - now)
+
+        return None
+
+    def update(
+        self,
+        endpoint: str,
+        headers: Mapping
+    ) -> None:
+        """ Synchronize an endpoint bucket with rate limit headers.
+
+            Args:
+                endpoint (str):
+                    Twitter API endpoint name.
+
+                headers (Mapping):
+                    HTTP response headers with x-rate-limit-limit,
+                    x-rate-limit-remaining, and x-rate-limit-reset
+                    values.
+
+            Returns:
+                None.
+        """
+
+        limit = headers.get('x-rate-limit-limit')
+        remaining = headers.get('x-rate-limit-remaining')
+        reset = headers.get('x-rate-limit-reset')
+
+        with self._condition:
+            bucket = self._bucket(endpoint=endpoint, now=time())
+
+            if limit is not None:
+                bucket['limit'] = int(limit)
+                self.limits[endpoint] = int(limit)
+
+            # Requests in flight already hold a token, so keep the lower value
+            if remaining is not None:
+                bucket['remaining'] = min(bucket['remaining'], int(remaining))
+
+            if reset is not None:
+                bucket['reset'] = float(reset)
+
+            self._condition.notify_all()
+
+        return None
+
+
+# Functions
+def rate_limited(
+    method: Callable,
+    endpoint: str,
+    api_object: API,
+    rate_limiter: RateLimiter
+) -> Callable:
+    """ Wrap a tweepy API method with a RateLimiter.
+
+        The wrapped method is bound to api_object and keeps the
+        pagination attributes of the original method, so it can be
+        passed to tweepy.Cursor.
+
+        Args:
+            method (Callable):
+                tweepy API method, such as api_object.user_timeline.
+
+            endpoint (str):
+                Twitter API endpoint name of the method.
+
+            api_object (tweepy.api.API):
+                tweepy API object that owns the method, used to read
+                the last response headers.
+
+            rate_limiter (RateLimiter):
+                RateLimiter shared by all API objects.
+
+        Returns:
+            wrapper (Callable):
+                Rate limited method.
+    """
+
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        while True:
+            rate_limiter.acquire(endpoint=endpoint)
+
+            try:
+                result = method(*args, **kwargs)
+            except tweepy.TooManyRequests as e:
+                # Another client used the quota, wait for the next window
+                rate_limiter.update(
+                    endpoint=endpoint,
+                    headers=_exhausted_headers(headers=e.response.headers)
+                )
+                continue
+
+            last_response = getattr(api_object, 'last_response', None)
+            if last_response is not None:
+                rate_limiter.update(
+                    endpoint=endpoint,
+                    headers=last_response.headers
+                )
+
+            return result
+
+    # Bind the wrapper, since tweepy.Cursor reads the API from __self__
+    wrapper = MethodType(wrapper, api_object)
+
+    return wrapper
+
+
+def _exhausted_headers(
+    headers: Mapping
+) -> Dict[str, Union[int, str]]:
+    """ Create rate limit headers for an exhausted endpoint.
+
+        Args:
+            headers (Mapping):
+                HTTP response headers from a 429 response.
+
+        Returns:
+            exhausted_headers (Dict[str, Union[int, str]]):
+                Rate limit headers with no remaining requests.
+    """
+
+    exhausted_headers = dict(headers)
+    exhausted_headers['x-rate-limit-remaining'] = 0
+
+    return exhausted_headers
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+""" Bounded-memory heavy-hitter sketch for ww-tweeter hashtag counts. """
+
+# Imports - Python Standard Library
+from heapq import heapify, heappop, heappush
+from typing import Dict, Iterable, List, Tuple
+
+# Imports - Third-Party
+
+# Imports - Local
+
+# Constants
+SKETCH_CAPACITY = 1000  # Number of hashtags tracked by a sketch
+
+
+# Classes
+class SpaceSaving:
+    """ Space-Saving sketch of the most frequent items in a stream.
+
+        Tracks at most capacity items.  When a new item arrives and the
+        sketch is full, the item with the lowest count is replaced, and
+        the new item inherits that count as its error.  For every
+        tracked item, the true count is between count - error and
+        count, and any item with a true count above
+        total / capacity is guaranteed to be tracked.
+
+        Sketches serialize with to_dict/from_dict, and merge with
+        merge or the + operator, so counts can be combined across
+        workers and runs.  Has the Counter methods used for hashtag
+        counts: update and most_common.
+    """
+
+    def __init__(
+        self,
+        capacity: int = SKETCH_CAPACITY
+    ) -> None:
+        """ Class initialization method.
+
+            Args:
+                capacity (int, optional):
+                    Maximum number of items to track.  Default value is
+                    SKETCH_CAPACITY.
+
+            Returns:
+                None.
+        """
+
+        self.capacity = capacity
+        self.total = 0
+        self.counts = {}  # item: count
+        self.errors = {}  # item: maximum overestimate of count
+        self._heap = []  # (count, item) entries, some may be outdated
+
+        return None
+
+    def _pop_minimum(self) -> Tuple[int, str]:
+        """ Remove and return the tracked item with the lowest count.
+
+            Heap entries are not updated when counts change, so outdated
+            entries are skipped until one matches its current count.
+
+            Args:
+                None.
+
+            Returns:
+                count, item (Tuple[int, str]):
+                    Lowest count and its item.
+        """
+
+        while True:
+            count, item = heappop(self._heap)
+            if self.counts.get(item) == count:
+                return count, item
+
+    def add(
+        self,
+        item: str,
+        count: int = 1
+    ) -> None:
+        """ Add occurrences of an item to the sketch.
+
+            Args:
+                item (str):
+                    Item to count, such as a hashtag.
+
+                count (int, optional):
+                    Number of occurrences.  Default value is 1.
+
+            Returns:
+                None.
+        """
+
+        self.total += count
+
+        if item in self.counts:
+            self.counts[item] += count
+        elif len(self.counts) < self.capacity:
+            self.counts[item] = count
+            self.errors[item] = 0
+        else:
+            # Replace the lowest count item, inheriting its count as error
+            minimum, evicted = self._pop_minimum()
+            del self.counts[evicted]
+            del self.errors[evicted]
+            self.counts[item] = minimum + count
+            self.errors[item] = minimum
+
+        heappush(self._heap, (self.counts[item], item))
+
+        # Drop outdated heap entries, so memory stays proportional to capacity
+        if len(self._heap) > self.capacity * 4:
+            self._heap = [(count, item) for item, count in self.counts.items()]
+            heapify(self._heap)
+
+        return None
+
+    def update(
+        self,
+        items: Iterable[str]
+    ) -> None:
+        """ Add one occurrence of each item, like Counter.update.
+
+            Args:
+                items (Iterable[str]):
+                    Items to count.
+
+            Returns:
+                None.
+        """
+
+        for item in items:
+            self.add(item=item)
+
+        return None
+
+    def most_common(
+        self,
+        n: int = None
+    ) -> List[Tuple[str, int]]:
+        """ Get the items with the highest counts, like Counter.most_common.
+
+            Args:
+                n (int, optional):
+                    Number of items to return.  Default value is None,
+                    and returns all tracked items.
+
+            Returns:
+                most_common (List[Tuple[str, int]]):
+                    List of (item, count) tuples, highest count first.
+        """
+
+        most_common = sorted(
+            self.counts.items(),
+            key=lambda item_count: item_count[1],
+            reverse=True
+        )[:n]
+
+        return most_common
+
+    def top(
+        self,
+        n: int = None
+    ) -> List[Tuple[str, int, int]]:
+        """ Get the items with the highest counts, and their error bounds.
+
+            Args:
+                n (int, optional):
+                    Number of items to return.  Default value is None,
+                    and returns all tracked items.
+
+            Returns:
+                top (List[Tuple[str, int, int]]):
+                    List of (item, count, error) tuples, highest count
+                    first.  The true count is at least count - error.
+        """
+
+        top = [
+            (item, count, self.errors[item])
+            for item, count in self.most_common(n=n)
+        ]
+
+        return top
+
+    @property
+    def error_bound(self) -> float:
+        """ Maximum overestimate of any count in the sketch.
+
+            Args:
+                None.
+
+            Returns:
+                error_bound (float):
+                    total / capacity.
+        """
+
+        error_bound = self.total / self.capacity
+
+        return error_bound
+
+    def _floor(self) -> int:
+        """ Get the count an untracked item may have.
+
+            Args:
+                None.
+
+            Returns:
+                floor (int):
+                    Lowest tracked count when the sketch is full,
+                    otherwise 0.
+        """
+
+        floor = 0
+        if len(self.counts) >= self.capacity:
+            floor = min(self.counts.values())
+
+        return floor
+
+    def merge(
+        self,
+        other: 'SpaceSaving'
+    ) -> 'SpaceSaving':
+        """ Merge two sketches into a new sketch.
+
+            An item missing from a full sketch may have been evicted,
+            so it is given that sketch's lowest count as both count and
+            error.  The capacity items with the highest combined counts
+            are kept.
+
+            Args:
+                other (SpaceSaving):
+                    Sketch to merge with this sketch.
+
+            Returns:
+                merged (SpaceSaving):
+                    New sketch with the capacity of this sketch.
+        """
+
+        floors = (self._floor(), other._floor())
+        merged = SpaceSaving(capacity=self.capacity)
+        merged.total = self.total + other.total
+        combined = []
+
+        for item in self.counts.keys() | other.counts.keys():
+            count = error = 0
+            for sketch, sketch_floor in zip((self, other), floors):
+                count += sketch.counts.get(item, sketch_floor)
+                error += sketch.errors.get(item, sketch_floor)
+            combined.append((count, error, item))
+
+        combined.sort(reverse=True)
+        for count, error, item in combined[:merged.capacity]:
+            merged.counts[item] = count
+            merged.errors[item] = error
+
+        merged._heap = [(count, item) for item, count in merged.counts.items()]
+        heapify(merged._heap)
+
+        return merged
+
+    def __add__(
+        self,
+        other: 'SpaceSaving'
+    ) -> 'SpaceSaving':
+        """ Merge two sketches with the + operator. """
+
+        return self.merge(other=other)
+
+    def to_dict(self) -> Dict:
+        """ Serialize the sketch to a JSON compatible dictionary.
+
+            Args:
+                None.
+
+            Returns:
+                sketch (Dict):
+                    Dictionary with capacity, total, and items keys.
+        """
+
+        sketch = {
+            'capacity': self.capacity,
+            'total': self.total,
+            'items': [
+                [item, count, self.errors[item]]
+                for item, count in self.counts.items()
+            ]
+        }
+
+        return sketch
+
+    @classmethod
+    def from_dict(
+        cls,
+        sketch: Dict
+    ) -> 'SpaceSaving':
+        """ Create a sketch from a to_dict dictionary.
+
+            Args:
+                sketch (Dict):
+                    Dictionary created by SpaceSaving.to_dict.
+
+            Returns:
+                space_saving (SpaceSaving):
+                    Restored sketch.
+        """
+
+        space_saving = cls(capacity=sketch['capacity'])
+        space_saving.total = sketch['total']
+
+        for item, count, error in sketch['items']:
+            space_saving.counts[item] = count
+            space_saving.errors[item] = error
+
+        space_saving._heap = [
+            (count, item) for item, count in space_saving.counts.items()
+        ]
+        heapify(space_saving._heap)
+
+        return space_saving
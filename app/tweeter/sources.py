@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+""" Tweet sources for ww-tweeter ingest, record, and replay. """
+
+# Imports - Python Standard Library
+from collections import defaultdict
+from itertools import chain
+from os import stat
+from threading import Lock
+from typing import Dict, Iterator, List, Union
+import gzip
+import json
+
+# Imports - Third-Party
+from tweepy.models import Status
+
+# Imports - Local
+from app.tweeter.scheduler import RateLimiter
+
+# Constants
+RECORDING_ENCODING = 'utf-8'
+
+
+# Classes
+class TweetSource:
+    """ Base class for sources of tweets.
+
+        Sources yield pages (lists) of tweepy Status objects for a
+        Twitter account, so ingest code works the same with the live
+        Twitter API, a recording, or a replay.
+    """
+
+    def pages(
+        self,
+        screen_name: str,
+        since_id: Union[int, str, None] = None,
+        rate_limiter: RateLimiter = None
+    ) -> Iterator[List[Status]]:
+        """ Yield pages of tweets for an account.
+
+            Args:
+                screen_name (str):
+                    Twitter account to collect tweets from.
+
+                since_id (Union[int, str, None], optional):
+                    Only collect tweets newer than this tweet ID.
+                    Default value is None.
+
+                rate_limiter (RateLimiter, optional):
+                    Scheduler that paces API requests, for sources that
+                    make them.  Default value is None.
+
+            Yields:
+                page (List[tweepy.models.Status]):
+                    Page of tweets, newest first.
+        """
+
+        raise NotImplementedError
+
+    def tweets(
+        self,
+        screen_name: str,
+        since_id: Union[int, str, None] = None,
+        rate_limiter: RateLimiter = None
+    ) -> Iterator[Status]:
+        """ Yield the tweets for an account, one at a time.
+
+            Args:
+                screen_name (str):
+                    Twitter account to collect tweets from.
+
+                since_id (Union[int, str, None], optional):
+                    Only collect tweets newer than this tweet ID.
+                    Default value is None.
+
+                rate_limiter (RateLimiter, optional):
+                    Scheduler that paces API requests, for sources that
+                    make them.  Default value is None.
+
+            Returns:
+                tweets (Iterator[tweepy.models.Status]):
+                    Iterator of tweets, newest first.
+        """
+
+        tweets = chain.from_iterable(
+            self.pages(
+                screen_name=screen_name,
+                since_id=since_id,
+                rate_limiter=rate_limiter
+            )
+        )
+
+        return tweets
+
+
+class RecordingSource(TweetSource):
+    """ Record the raw page JSON of another source to a gzip JSONL file.
+
+        Each line of the file holds one page, in the format:
+            {"screen_name": "wwt_inc", "tweets": [{...}, {...}]}
+    """
+
+    def __init__(
+        self,
+        source: TweetSource,
+        path: str
+    ) -> None:
+        """ Class initialization method.
+
+            Args:
+                source (TweetSource):
+                    Source to record, such as a LiveSource.
+
+                path (str):
+                    Path of the gzip JSONL recording file.  Pages are
+                    appended to an existing file.
+
+            Returns:
+                None.
+        """
+
+        self.source = source
+        self.path = path
+        self._file = gzip.open(
+            filename=path,
+            mode='at',
+            encoding=RECORDING_ENCODING
+        )
+        self._lock = Lock()
+
+        return None
+
+    def pages(
+        self,
+        screen_name: str,
+        since_id: Union[int, str, None] = None,
+        rate_limiter: RateLimiter = None
+    ) -> Iterator[List[Status]]:
+        """ Yield pages from the recorded source, writing each one.
+
+            Args:
+                screen_name (str):
+                    Twitter account to collect tweets from.
+
+                since_id (Union[int, str, None], optional):
+                    Only collect tweets newer than this tweet ID.
+                    Default value is None.
+
+                rate_limiter (RateLimiter, optional):
+                    Scheduler passed to the recorded source.  Default
+                    value is None.
+
+            Yields:
+                page (List[tweepy.models.Status]):
+                    Page of tweets, newest first.
+        """
+
+        for page in self.source.pages(
+            screen_name=screen_name,
+            since_id=since_id,
+            rate_limiter=rate_limiter
+        ):
+            line = json.dumps({
+                'screen_name': screen_name,
+                'tweets': [tweet._json for tweet in page]
+            })
+
+            # Account workers share the file, so write whole lines
+            with self._lock:
+                self._file.write(line + '\n')
+
+            yield page
+
+    def close(self) -> None:
+        """ Close the recording file.
+
+            Args:
+                None.
+
+            Returns:
+                None.
+        """
+
+        with self._lock:
+            self._file.close()
+
+        return None
+
+    def __enter__(self):
+        """ Context manager entry, returns the RecordingSource. """
+
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """ Context manager exit, closes the recording file. """
+
+        self.close()
+
+        return None
+
+
+class ReplaySource(TweetSource):
+    """ Replay pages from a RecordingSource file, without network access.
+
+        The recording is decompressed and parsed once, into an index of
+        pages by account, which the replays of every account share.  It
+        is read again only when the file changes, such as when a
+        RecordingSource appends to it.
+    """
+
+    def __init__(
+        self,
+        path: str
+    ) -> None:
+        """ Class initialization method.
+
+            Args:
+                path (str):
+                    Path of a gzip JSONL file written by a
+                    RecordingSource.
+
+            Returns:
+                None.
+        """
+
+        self.path = path
+        self._index = {}
+        self._index_key = None
+        self._lock = Lock()
+
+        return None
+
+    def _pages_by_account(self) -> Dict[str, List[List[Dict]]]:
+        """ Get the recorded pages of each account, reading the file once.
+
+            Account workers replay concurrently, so the first one reads
+            the file while the others wait for its index.
+
+            Args:
+                None.
+
+            Returns:
+                index (Dict[str, List[List[Dict]]]):
+                    Pages of tweet JSON for each screen name, in
+                    recorded order.
+        """
+
+        file_stat = stat(self.path)
+        index_key = (file_stat.st_size, file_stat.st_mtime_ns)
+
+        with self._lock:
+            if self._index_key != index_key:
+                index = defaultdict(list)
+
+                with gzip.open(
+                    filename=self.path,
+                    mode='rt',
+                    encoding=RECORDING_ENCODING
+                ) as recording:
+                    for line in recording:
+                        record = json.loads(line)
+                        index[record.get('screen_name')].append(
+                            record.get('tweets')
+                        )
+
+                self._index = dict(index)
+                self._index_key = index_key
+
+            index = self._index
+
+        return index
+
+    def pages(
+        self,
+        screen_name: str,
+        since_id: Union[int, str, None] = None,
+        rate_limiter: RateLimiter = None
+    ) -> Iterator[List[Status]]:
+        """ Yield the recorded pages for an account.
+
+            Args:
+                screen_name (str):
+                    Twitter account to replay tweets for.
+
+                since_id (Union[int, str, None], optional):
+                    Only replay tweets newer than this tweet ID.
+                    Default value is None.
+
+                rate_limiter (RateLimiter, optional):
+                    Unused, replays make no API requests.
+
+            Yields:
+                page (List[tweepy.models.Status]):
+                    Page of tweets, newest first.
+        """
+
+        since_id = int(since_id or 0)
+
+        for tweets in self._pages_by_account().get(screen_name, []):
+            page = [
+                Status.parse(api=None, json=tweet)
+                for tweet in tweets
+                if tweet.get('id') > since_id
+            ]
+
+            if page:
+                yield page
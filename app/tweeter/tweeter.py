@@ -3,11 +3,21 @@
 
 # Imports - Python Standard Library
 from collections import Counter
-from itertools import islice
-from os import getenv
-from typing import Dict, Iterable
+from concurrent.futures import (
+    FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+)
+from functools import partial, reduce
+from itertools import chain, islice
+from operator import add
+from os import cpu_count, getenv
+from urllib.parse import urlsplit
+from typing import (
+    Callable, Dict, Iterable, Iterator, List, Mapping, Tuple, Union
+)
+import logging
 
 # Imports - Third-Party
+from sqlalchemy.orm import Session
 from tweepy.api import API
 from tweepy.cursor import Cursor
 import dotenv
@@ -15,25 +25,60 @@ import tweepy
 
 # Imports - Local
 from app.db import db
+from app.tweeter.local_api import PlainHTTPAdapter
+from app.tweeter.pipeline import (
+    IngestPipeline, PIPELINE_WRITERS, StageStats
+)
+from app.tweeter.scheduler import RateLimiter, rate_limited
+from app.tweeter.sketch import SpaceSaving
+from app.tweeter.sources import TweetSource
 
 # Load environment variables
 dotenv.load_dotenv()
 
+# Logging
+log = logging.getLogger(__name__)
+
 # Constants
+BACKFILL_LOAD = True  # Fetch full histories (no TWEET_SLICE) in parallel
+BACKFILL_RANGES = 8  # Number of max_id ranges to fetch in parallel
+COUNT_CHUNK_SIZE = 10000  # Tweets per parallel hashtag counting task
+COUNT_WORKERS = cpu_count()  # Processes for parallel hashtag counting
+INCREMENTAL_LOAD = True  # Only load tweets newer than the newest stored tweet
+REFRESH_LOAD = True  # Full loads swap in staging tables, instead of upserting
+PIPELINE_INGEST = True  # Overlap Twitter API fetches with database writes
+FETCH_WORKERS = 8  # Maximum number of accounts to fetch concurrently
+HASHTAG_LOG_TOP = 10  # Most common hashtags of each run that are logged
+HASHTAG_SKETCH_CAPACITY = None  # Hashtags kept by approximate counts, or None
 TWITTER_ACCOUNT = 'wwt_inc'
+TWITTER_API_HOST = getenv(key='TWITTER_API_HOST', default='api.twitter.com')
+TWITTER_ACCOUNTS = getenv(
+    key='TWITTER_ACCOUNTS',
+    default=TWITTER_ACCOUNT
+).split(',')
 TWITTER_KEY = getenv('TWITTER_KEY')
 TWITTER_SECRET = getenv('TWITTER_SECRET')
 TWITTER_ACCESS_TOKEN = getenv('TWITTER_ACCESS_TOKEN')
 TWITTER_ACCESS_SECRET = getenv('TWITTER_ACCESS_SECRET')
 TWITTER_TIMEOUT = 30
+TWEET_HISTORY_LIMIT = 3200  # Number of recent tweets user_timeline reaches
+TWEET_PAGE_SIZE = 200  # Maximum number of tweets per user_timeline request
 TWEET_SLICE = 500  # Sets the limit of tweets, set to None for no limit
+TWITTER_EPOCH = 1288834974657  # Tweet ID (snowflake) epoch, in milliseconds
+WRITE_CHUNK_SIZE = 200  # Maximum number of tweets held before a DB write
 
 
-def twitter_api_auth() -> API:
+def twitter_api_auth(
+    host: str = TWITTER_API_HOST
+) -> API:
     """ Create a Twitter API object with access keys/tokens/secrets.
 
         Args:
-            None.
+            host (str, optional):
+                Twitter API host, with an optional http:// or https://
+                scheme.  An http:// host, such as a LocalTwitterAPI
+                server, is reached over plain HTTP.  Default value is
+                TWITTER_API_HOST.
 
         Returns:
             api (tweepy.api.API):
@@ -52,53 +97,984 @@ def twitter_api_auth() -> API:
         secret=TWITTER_ACCESS_SECRET
     )
 
+    # Separate the scheme from the host, tweepy adds https:// itself
+    host_url = urlsplit(host if '//' in host else f'//{host}')
+
     # Authenticate and create a connection to the Twitter API
     api = tweepy.API(
         auth=auth,
+        host=host_url.netloc,
         timeout=TWITTER_TIMEOUT
     )
 
+    # Send requests for a plain HTTP host without TLS
+    if host_url.scheme == 'http':
+        api.session.mount(
+            prefix=f'https://{host_url.netloc}/',
+            adapter=PlainHTTPAdapter()
+        )
+
     return api
 
 
+def _user_timeline(
+    api_object: API,
+    rate_limiter: RateLimiter = None
+) -> Callable:
+    """ Get the user_timeline method, paced by a rate limiter.
+
+        Args:
+            api_object (tweepy.api.API):
+                tweepy API object with credentials.
+
+            rate_limiter (RateLimiter, optional):
+                Scheduler that paces each page request.  Default value
+                is None, and requests are not paced.
+
+        Returns:
+            method (Callable):
+                user_timeline method for api_object.
+    """
+
+    method = api_object.user_timeline
+
+    # Pace each page request with the rate limiter, if one is present
+    if rate_limiter is not None:
+        method = rate_limited(
+            method=method,
+            endpoint='statuses/user_timeline',
+            api_object=api_object,
+            rate_limiter=rate_limiter
+        )
+
+    return method
+
+
+def _timeline_items(
+    api_object: API,
+    screen_name: str,
+    since_id: Union[int, str, None] = None,
+    max_id: Union[int, str, None] = None,
+    rate_limiter: RateLimiter = None
+) -> Iterator:
+    """ Iterate a user timeline with tweepy.Cursor at maximum page size.
+
+        Args:
+            api_object (tweepy.api.API):
+                tweepy API object with credentials.
+
+            screen_name (str):
+                Twitter account to collect tweets from.
+
+            since_id (Union[int, str, None], optional):
+                Only collect tweets newer than this tweet ID.  Default
+                value is None.
+
+            max_id (Union[int, str, None], optional):
+                Only collect tweets with an ID less than or equal to
+                this tweet ID.  Default value is None.
+
+            rate_limiter (RateLimiter, optional):
+                Scheduler that paces each page request.  Default value
+                is None, and requests are not paced.
+
+        Returns:
+            tweets (Iterator):
+                tweepy Cursor items iterator with tweet data.
+    """
+
+    # Use tweepy.Cursor to get tweets from the Twitter API
+    tweets = tweepy.Cursor(
+        method=_user_timeline(
+            api_object=api_object,
+            rate_limiter=rate_limiter
+        ),
+        screen_name=screen_name,
+        exclude_replies=False,
+        include_rts=True,
+        count=TWEET_PAGE_SIZE,
+        since_id=since_id,
+        max_id=max_id
+    ).items()
+
+    return tweets
+
+
 def get_top_n_tweets(
-    api_object: API
+    api_object: API,
+    since_id: Union[int, str, None] = None,
+    screen_name: str = TWITTER_ACCOUNT,
+    rate_limiter: RateLimiter = None
 ) -> Cursor:
     """ Collect tweets using tweepy.Cursor.
 
+        Full loads collect the newest TWEET_SLICE tweets.  Incremental
+        loads, with a since_id, collect every tweet after the since_id,
+        since the next load starts from the newest tweet, and a slice
+        would leave a permanent gap.
+
         Args:
             api_object (tweepy.api.API):
                 tweepy API object with credentials.
 
+            since_id (Union[int, str, None], optional):
+                Only collect tweets newer than this tweet ID.  Default
+                value is None, and collects the entire timeline.
+
+            screen_name (str, optional):
+                Twitter account to collect tweets from.  Default value
+                is TWITTER_ACCOUNT.
+
+            rate_limiter (RateLimiter, optional):
+                Scheduler that paces each page request.  Default value
+                is None, and requests are not paced.
+
         Returns:
             tweets (tweepy.cursor.Cursor):
                 tweepy Cursor iterator object with tweet data
     """
 
-    # Use tweepy.Cursor to get tweets from the Twitter API
-    tweets = tweepy.Cursor(
-        method=api_object.user_timeline,
-        screen_name=TWITTER_ACCOUNT,
-        exclude_replies=False,
-        include_rts=True
-    ).items()
+    tweets = _timeline_items(
+        api_object=api_object,
+        screen_name=screen_name,
+        since_id=since_id,
+        rate_limiter=rate_limiter
+    )
 
-    # If TWEET slice is set, return only a slice of the tweets generator object
-    if TWEET_SLICE is not None:
+    # If TWEET slice is set, return only a slice of a full load
+    if TWEET_SLICE is not None and since_id is None:
         tweets = islice(tweets, TWEET_SLICE)
 
     return tweets
 
 
+def _snowflake_time(
+    tweet_id: Union[int, str]
+) -> int:
+    """ Get the creation time encoded in a tweet ID.
+
+        Args:
+            tweet_id (Union[int, str]):
+                Tweet (snowflake) ID.
+
+        Returns:
+            timestamp (int):
+                Epoch time the ID was created, in milliseconds.
+    """
+
+    timestamp = (int(tweet_id) >> 22) + TWITTER_EPOCH
+
+    return timestamp
+
+
+def _snowflake_id(
+    timestamp: int
+) -> int:
+    """ Get the lowest tweet ID created at a point in time.
+
+        Args:
+            timestamp (int):
+                Epoch time, in milliseconds.
+
+        Returns:
+            tweet_id (int):
+                Lowest tweet (snowflake) ID for the timestamp.
+    """
+
+    tweet_id = max(timestamp - TWITTER_EPOCH, 0) << 22
+
+    return tweet_id
+
+
+def split_id_range(
+    since_id: int,
+    max_id: int,
+    ranges: int = BACKFILL_RANGES
+) -> List[Tuple[int, int]]:
+    """ Split a tweet ID range into ranges of equal time.
+
+        Tweet IDs encode their creation time, so splitting by time
+        gives ranges that hold a similar number of tweets for an
+        account that tweets at a steady rate.
+
+        Args:
+            since_id (int):
+                Lower bound of the range, exclusive.
+
+            max_id (int):
+                Upper bound of the range, inclusive.
+
+            ranges (int, optional):
+                Number of ranges to split into.  Default value is
+                BACKFILL_RANGES.
+
+        Returns:
+            id_ranges (List[Tuple[int, int]]):
+                List of (since_id, max_id) tuples, newest range first,
+                that cover the range without gaps or overlaps.
+    """
+
+    start = _snowflake_time(since_id)
+    end = _snowflake_time(max_id)
+
+    # Find evenly spaced boundaries, keeping the original bounds exact
+    bounds = [since_id]
+    for index in range(1, ranges):
+        bound = _snowflake_id(start + (end - start) * index // ranges)
+        if bounds[-1] < bound < max_id:
+            bounds.append(bound)
+    bounds.append(max_id)
+
+    id_ranges = [
+        (bounds[index], bounds[index + 1])
+        for index in reversed(range(len(bounds) - 1))
+    ]
+
+    return id_ranges
+
+
+def _fetch_id_range(
+    screen_name: str,
+    since_id: Union[int, None],
+    max_id: int,
+    rate_limiter: RateLimiter
+) -> List:
+    """ Collect the tweets in one ID range, in a backfill_tweets worker.
+
+        Args:
+            screen_name (str):
+                Twitter account to collect tweets from.
+
+            since_id (Union[int, None]):
+                Lower bound of the range, exclusive.
+
+            max_id (int):
+                Upper bound of the range, inclusive.
+
+            rate_limiter (RateLimiter):
+                Scheduler shared by all workers.
+
+        Returns:
+            tweets (List):
+                List of tweets in the range, newest first.
+    """
+
+    tweets = list(
+        _timeline_items(
+            api_object=twitter_api_auth(),
+            screen_name=screen_name,
+            since_id=since_id,
+            max_id=max_id,
+            rate_limiter=rate_limiter
+        )
+    )
+
+    return tweets
+
+
+def backfill_tweets(
+    screen_name: str = TWITTER_ACCOUNT,
+    since_id: Union[int, str, None] = None,
+    ranges: int = BACKFILL_RANGES,
+    rate_limiter: RateLimiter = None
+) -> Iterator:
+    """ Collect an account's full history with parallel ID range fetches.
+
+        The newest page sets the tweet rate, which is extrapolated to
+        estimate how far back the TWEET_HISTORY_LIMIT reaches.  That
+        span is split into ID ranges that are fetched in parallel at
+        maximum page size, followed by anything older than the
+        estimate.  Tweets are yielded newest first, as each range is
+        complete.
+
+        Args:
+            screen_name (str, optional):
+                Twitter account to collect tweets from.  Default value
+                is TWITTER_ACCOUNT.
+
+            since_id (Union[int, str, None], optional):
+                Only collect tweets newer than this tweet ID.  Default
+                value is None, and collects the entire timeline.
+
+            ranges (int, optional):
+                Number of ID ranges to fetch in parallel.  Default
+                value is BACKFILL_RANGES.
+
+            rate_limiter (RateLimiter, optional):
+                Scheduler shared by all workers.  Default value is
+                None, and creates a new RateLimiter.
+
+        Yields:
+            tweet (tweepy.models.Status):
+                Each tweet, newest first.
+    """
+
+    if rate_limiter is None:
+        rate_limiter = RateLimiter()
+
+    # Fetch the newest page to find where the history starts
+    user_timeline = _user_timeline(
+        api_object=twitter_api_auth(),
+        rate_limiter=rate_limiter
+    )
+    first_page = user_timeline(
+        screen_name=screen_name,
+        exclude_replies=False,
+        include_rts=True,
+        count=TWEET_PAGE_SIZE,
+        since_id=since_id
+    )
+
+    yield from first_page
+
+    if len(first_page) == 0:
+        return None
+
+    # Estimate the oldest reachable tweet ID from the first page's tweet rate
+    floor_id = int(since_id or 0)
+    oldest_id = first_page[-1].id
+    page_span = _snowflake_time(first_page[0].id) - _snowflake_time(oldest_id)
+    history_pages = TWEET_HISTORY_LIMIT // TWEET_PAGE_SIZE
+    estimate_id = max(
+        floor_id,
+        _snowflake_id(_snowflake_time(oldest_id) - page_span * history_pages)
+    )
+
+    # Split the estimated span, and add a final range for older tweets
+    id_ranges = []
+    if estimate_id < oldest_id - 1:
+        id_ranges = split_id_range(
+            since_id=estimate_id,
+            max_id=oldest_id - 1,
+            ranges=ranges
+        )
+    if estimate_id > floor_id:
+        id_ranges.append((since_id, min(estimate_id, oldest_id - 1)))
+
+    # Fetch the ranges in parallel, and yield them in order
+    with ThreadPoolExecutor(max_workers=ranges + 1) as executor:
+        futures = [
+            executor.submit(
+                _fetch_id_range,
+                screen_name=screen_name,
+                since_id=range_since_id or None,
+                max_id=range_max_id,
+                rate_limiter=rate_limiter
+            )
+            for range_since_id, range_max_id in id_ranges
+        ]
+
+        for future in futures:
+            yield from future.result()
+
+    return None
+
+
+class LiveSource(TweetSource):
+    """ Collect tweets from the live Twitter API.
+
+        Full histories are collected with backfill_tweets when
+        BACKFILL_LOAD is True and TWEET_SLICE is None, otherwise with
+        get_top_n_tweets.
+    """
+
+    def pages(
+        self,
+        screen_name: str,
+        since_id: Union[int, str, None] = None,
+        rate_limiter: RateLimiter = None
+    ) -> Iterator[List]:
+        """ Yield pages of tweets for an account from the Twitter API.
+
+            Args:
+                screen_name (str):
+                    Twitter account to collect tweets from.
+
+                since_id (Union[int, str, None], optional):
+                    Only collect tweets newer than this tweet ID.
+                    Default value is None.
+
+                rate_limiter (RateLimiter, optional):
+                    Scheduler that paces each page request.  Default
+                    value is None.
+
+            Yields:
+                page (List[tweepy.models.Status]):
+                    Page of up to TWEET_PAGE_SIZE tweets, newest first.
+        """
+
+        # Backfill full histories in parallel ranges, or page the Cursor
+        if since_id is None and TWEET_SLICE is None and BACKFILL_LOAD is True:
+            tweets = backfill_tweets(
+                screen_name=screen_name,
+                rate_limiter=rate_limiter
+            )
+        else:
+            tweets = get_top_n_tweets(
+                api_object=twitter_api_auth(),
+                since_id=since_id,
+                screen_name=screen_name,
+                rate_limiter=rate_limiter
+            )
+
+        # Group the tweets into pages, as they arrive
+        tweets = iter(tweets)
+        page = list(islice(tweets, TWEET_PAGE_SIZE))
+
+        while page:
+            yield page
+            page = list(islice(tweets, TWEET_PAGE_SIZE))
+
+
+def _map_accounts(
+    worker: Callable,
+    accounts: Iterable[str],
+    since_ids: Mapping = None,
+    rate_limiter: RateLimiter = None,
+    max_workers: int = FETCH_WORKERS
+) -> Dict:
+    """ Run a worker function for multiple accounts concurrently.
+
+        Args:
+            worker (Callable):
+                Function called with screen_name, since_id, and
+                rate_limiter keyword arguments for each account.
+
+            accounts (Iterable[str]):
+                Twitter accounts to collect tweets from.
+
+            since_ids (Mapping, optional):
+                Mapping of accounts to the tweet ID to collect tweets
+                after.  Default value is None, and collects the entire
+                timeline of each account.
+
+            rate_limiter (RateLimiter, optional):
+                Scheduler shared by all workers.  Default value is
+                None, and creates a new RateLimiter.
+
+            max_workers (int, optional):
+                Maximum number of accounts to process concurrently.
+                Default value is FETCH_WORKERS.
+
+        Returns:
+            account_results (Dict):
+                Dictionary of accounts and their worker results.
+    """
+
+    if since_ids is None:
+        since_ids = {}
+
+    if rate_limiter is None:
+        rate_limiter = RateLimiter()
+
+    # Submit one worker per account, and collect the results in order
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            account: executor.submit(
+                worker,
+                screen_name=account,
+                since_id=since_ids.get(account),
+                rate_limiter=rate_limiter
+            )
+            for account in accounts
+        }
+
+        account_results = {
+            account: future.result() for account, future in futures.items()
+        }
+
+    return account_results
+
+
+def extract_hashtags(
+    tweet
+) -> List[str]:
+    """ Extract the hashtags from a single tweet.
+
+        Uses the hashtag entities already parsed by Twitter when the
+        tweet has them, and only scans the tweet text with
+        db.VALID_HASHTAG otherwise.  Entity hashtags are normalized with
+        the same rules as VALID_HASHTAG, so both paths count the same
+        names.
+
+        Args:
+            tweet (tweepy.models.Status):
+                Tweet with a text attribute, and optionally an
+                entities attribute.
+
+        Returns:
+            hashtags (List[str]):
+                Lower case hashtag names, without the leading #.
+    """
+
+    entities = getattr(tweet, 'entities', None)
+
+    # Scan the text when Twitter did not parse the hashtags
+    if not isinstance(entities, dict) or 'hashtags' not in entities:
+        hashtags = db.VALID_HASHTAG.findall(tweet.text.lower())
+
+        return hashtags
+
+    hashtags = []
+    for entity in entities['hashtags']:
+        hashtag = entity['text'].lower()
+
+        # Most hashtags are plain ASCII letters and digits, skip the regex
+        if hashtag.isascii() and hashtag.isalnum():
+            if len(hashtag) >= 3:
+                hashtags.append(hashtag)
+            continue
+
+        valid_hashtag = db.VALID_HASHTAG.match(f'#{hashtag}')
+        if valid_hashtag is not None:
+            hashtags.append(valid_hashtag.group(1))
+
+    return hashtags
+
+
+def _new_hashtag_count(
+    capacity: int = None
+) -> Union[Counter, SpaceSaving]:
+    """ Create an empty hashtag count, exact or approximate.
+
+        Args:
+            capacity (int, optional):
+                Number of hashtags tracked by an approximate count.
+                Default value is None, and uses HASHTAG_SKETCH_CAPACITY.
+
+        Returns:
+            hashtag_count (Union[collections.Counter, SpaceSaving]):
+                Counter object for exact counts, or a SpaceSaving
+                sketch when a capacity is set.
+    """
+
+    if capacity is None:
+        capacity = HASHTAG_SKETCH_CAPACITY
+
+    if capacity is None:
+        hashtag_count = Counter()
+    else:
+        hashtag_count = SpaceSaving(capacity=capacity)
+
+    return hashtag_count
+
+
+def _count_hashtags(
+    tweets: Iterable,
+    hashtag_count: Union[Counter, SpaceSaving]
+) -> Iterator:
+    """ Count the hashtags in each tweet as it passes through.
+
+        Args:
+            tweets (Iterable):
+                Iterable object with tweets.
+
+            hashtag_count (Union[collections.Counter, SpaceSaving]):
+                Counter object or SpaceSaving sketch updated with the
+                hashtags in each tweet.
+
+        Yields:
+            tweet:
+                Each tweet, after its hashtags are counted.
+    """
+
+    for tweet in tweets:
+        hashtag_count.update(extract_hashtags(tweet=tweet))
+
+        yield tweet
+
+
+def ingest_tweets(
+    tweets: Iterable,
+    screen_name: str = None,
+    chunk_size: int = WRITE_CHUNK_SIZE,
+    staging: bool = False,
+    session: Session = db.session
+) -> Union[Counter, SpaceSaving]:
+    """ Stream tweets into the database and count their hashtags.
+
+        Tweets are consumed one at a time, so hashtags are counted as
+        Cursor pages arrive and no more than chunk_size tweets are held
+        in memory before they are written to the database.
+
+        Args:
+            tweets (Iterable):
+                Iterable object with tweets, such as a tweepy Cursor.
+
+            screen_name (str, optional):
+                Twitter account the tweets belong to.  Default value is
+                None.
+
+            chunk_size (int, optional):
+                Number of tweets to write to the database at a time.
+                Default value is WRITE_CHUNK_SIZE.
+
+            staging (bool, optional):
+                When True, write to the staging tables created by
+                db.create_staging_tables.  Default value is False.
+
+            session (sqlalchemy.orm.Session, optional):
+                By default, uses the session object created by the
+                db._create_session function.
+
+        Returns:
+            hashtag_count (Union[collections.Counter, SpaceSaving]):
+                Counter object of hashtags in the tweets, or a
+                SpaceSaving sketch when HASHTAG_SKETCH_CAPACITY is set.
+    """
+
+    hashtag_count = _new_hashtag_count()
+    chunk = []
+
+    for tweet in _count_hashtags(tweets=tweets, hashtag_count=hashtag_count):
+        chunk.append(tweet)
+
+        # Write a full chunk of tweets to the database
+        if len(chunk) >= chunk_size:
+            db.add_tweets(
+                tweets=chunk,
+                screen_name=screen_name,
+                extract_hashtags=extract_hashtags,
+                staging=staging,
+                session=session
+            )
+            chunk = []
+
+    # Write the remaining tweets to the database
+    if chunk:
+        db.add_tweets(
+            tweets=chunk,
+            screen_name=screen_name,
+            extract_hashtags=extract_hashtags,
+            staging=staging,
+            session=session
+        )
+
+    return hashtag_count
+
+
+def _write_tweets(
+    tweets: List,
+    screen_name: str = None,
+    staging: bool = False
+) -> None:
+    """ Write a chunk of tweets with the session of the current thread.
+
+        Used as the IngestPipeline writer, which calls it from several
+        threads.  The thread's session is removed after each chunk, so
+        its connection returns to the pool.
+
+        Args:
+            tweets (List):
+                Chunk of tweets to write.
+
+            screen_name (str, optional):
+                Twitter account the tweets belong to.  Default value is
+                None.
+
+            staging (bool, optional):
+                When True, write to the staging tables created by
+                db.create_staging_tables.  Default value is False.
+
+        Returns:
+            None.
+    """
+
+    try:
+        db.add_tweets(
+            tweets=tweets,
+            screen_name=screen_name,
+            extract_hashtags=extract_hashtags,
+            staging=staging,
+            session=db.session
+        )
+    finally:
+        db.remove_session()
+
+    return None
+
+
+def pipeline_ingest_tweets(
+    tweets: Iterable,
+    screen_name: str = None,
+    chunk_size: int = WRITE_CHUNK_SIZE,
+    writers: int = PIPELINE_WRITERS,
+    staging: bool = False
+) -> Tuple[Union[Counter, SpaceSaving], Dict[str, StageStats]]:
+    """ Stream tweets into the database with overlapping fetch and writes.
+
+        The Cursor is read, and hashtags are counted, in the calling
+        thread, while writer threads insert earlier chunks.
+
+        Args:
+            tweets (Iterable):
+                Iterable object with tweets, such as a tweepy Cursor.
+
+            screen_name (str, optional):
+                Twitter account the tweets belong to.  Default value is
+                None.
+
+            chunk_size (int, optional):
+                Number of tweets to write to the database at a time.
+                Default value is WRITE_CHUNK_SIZE.
+
+            writers (int, optional):
+                Number of writer threads.  Default value is
+                PIPELINE_WRITERS.
+
+            staging (bool, optional):
+                When True, write to the staging tables created by
+                db.create_staging_tables.  Default value is False.
+
+        Returns:
+            hashtag_count, stats (Tuple[Union[collections.Counter,
+            SpaceSaving], Dict[str, StageStats]]):
+                Counter object of hashtags in the tweets, or a
+                SpaceSaving sketch when HASHTAG_SKETCH_CAPACITY is set,
+                and the fetch and write throughput of the pipeline.
+    """
+
+    hashtag_count = _new_hashtag_count()
+
+    pipeline = IngestPipeline(
+        writer=partial(
+            _write_tweets,
+            screen_name=screen_name,
+            staging=staging
+        ),
+        writers=writers,
+        chunk_size=chunk_size
+    )
+    stats = pipeline.run(
+        items=_count_hashtags(tweets=tweets, hashtag_count=hashtag_count)
+    )
+
+    return hashtag_count, stats
+
+
+def _ingest_account(
+    screen_name: str,
+    since_id: Union[int, str, None],
+    rate_limiter: RateLimiter,
+    source: TweetSource = None,
+    staging: bool = False
+) -> Tuple[Union[Counter, SpaceSaving], Dict[str, StageStats]]:
+    """ Stream tweets for one account, in an ingest_accounts worker.
+
+        Each worker uses its own tweepy API object and its own database
+        session, since neither is safe to share between threads.  When
+        PIPELINE_INGEST is True, writes are handed to an IngestPipeline
+        instead.  After every tweet is written to the live tables, the
+        account's high-water mark is recorded, so a failed ingest is
+        fetched again by the next incremental load.
+
+        Args:
+            screen_name (str):
+                Twitter account to collect tweets from.
+
+            since_id (Union[int, str, None]):
+                Only collect tweets newer than this tweet ID.
+
+            rate_limiter (RateLimiter):
+                Scheduler shared by all workers.
+
+            source (TweetSource, optional):
+                Source of tweets.  Default value is None, and uses a
+                LiveSource.
+
+            staging (bool, optional):
+                When True, write to the staging tables created by
+                db.create_staging_tables.  Default value is False.
+
+        Returns:
+            hashtag_count, stats (Tuple[Union[collections.Counter,
+            SpaceSaving], Dict[str, StageStats]]):
+                Counter object or SpaceSaving sketch of hashtags in
+                the account's tweets, and the pipeline throughput, or
+                an empty dict when PIPELINE_INGEST is False.
+    """
+
+    if source is None:
+        source = LiveSource()
+
+    tweets = source.tweets(
+        screen_name=screen_name,
+        since_id=since_id,
+        rate_limiter=rate_limiter
+    )
+
+    try:
+        # Overlap fetches and writes, or write in the worker thread
+        if PIPELINE_INGEST is True:
+            hashtag_count, stats = pipeline_ingest_tweets(
+                tweets=tweets,
+                screen_name=screen_name,
+                staging=staging
+            )
+        else:
+            hashtag_count = ingest_tweets(
+                tweets=tweets,
+                screen_name=screen_name,
+                staging=staging,
+                session=db.session
+            )
+            stats = {}
+
+        # Staging tables are marked after they are swapped in
+        if staging is False:
+            db.record_since_id(screen_name=screen_name, session=db.session)
+    finally:
+        db.remove_session()
+
+    return hashtag_count, stats
+
+
+def ingest_accounts(
+    accounts: Iterable[str],
+    since_ids: Mapping = None,
+    rate_limiter: RateLimiter = None,
+    max_workers: int = FETCH_WORKERS,
+    source: TweetSource = None,
+    staging: bool = False
+) -> Tuple[Union[Counter, SpaceSaving], Dict[str, Dict[str, StageStats]]]:
+    """ Stream tweets for multiple accounts into the database.
+
+        Args:
+            accounts (Iterable[str]):
+                Twitter accounts to collect tweets from.
+
+            since_ids (Mapping, optional):
+                Mapping of accounts to the tweet ID to collect tweets
+                after.  Default value is None, and collects the entire
+                timeline of each account.
+
+            rate_limiter (RateLimiter, optional):
+                Scheduler shared by all workers.  Default value is
+                None, and creates a new RateLimiter.
+
+            max_workers (int, optional):
+                Maximum number of accounts to ingest concurrently.
+                Default value is FETCH_WORKERS.
+
+            source (TweetSource, optional):
+                Source of tweets, such as a RecordingSource or a
+                ReplaySource.  Default value is None, and uses a
+                LiveSource.
+
+            staging (bool, optional):
+                When True, write to the staging tables created by
+                db.create_staging_tables.  Default value is False.
+
+        Returns:
+            hashtag_count, account_stats (Tuple[Union[
+            collections.Counter, SpaceSaving], Dict]):
+                Counter object of hashtags in all accounts' tweets, or
+                the merged SpaceSaving sketches of all accounts, and
+                the pipeline throughput of each account.
+    """
+
+    account_results = _map_accounts(
+        worker=partial(_ingest_account, source=source, staging=staging),
+        accounts=accounts,
+        since_ids=since_ids,
+        rate_limiter=rate_limiter,
+        max_workers=max_workers
+    )
+
+    # Merge the hashtag counts (or sketches) of all accounts
+    hashtag_count = reduce(
+        add,
+        (count for count, _ in account_results.values()),
+        _new_hashtag_count()
+    )
+    account_stats = {
+        account: stats for account, (_, stats) in account_results.items()
+    }
+
+    return hashtag_count, account_stats
+
+
+def log_ingest_stats(
+    account_stats: Mapping[str, Dict[str, StageStats]]
+) -> None:
+    """ Log the fetch and write throughput of each account's ingest.
+
+        Args:
+            account_stats (Mapping[str, Dict[str, StageStats]]):
+                Pipeline statistics of each account, from
+                ingest_accounts.
+
+        Returns:
+            None.
+    """
+
+    for account, stats in account_stats.items():
+        for stage in stats.values():
+            log.info(
+                '%s %s: %d tweets, %.1f tweets/s, %.3fs blocked',
+                account,
+                stage.name,
+                stage.items,
+                stage.throughput,
+                stage.blocked
+            )
+
+    return None
+
+
+def log_top_hashtags(
+    hashtag_count: Union[Counter, SpaceSaving],
+    n: int = HASHTAG_LOG_TOP
+) -> None:
+    """ Log the most common hashtags of an ingest run.
+
+        A run's counts only cover the tweets it fetched, and a sketch's
+        counts are approximate, so they are logged for display only.
+        The hashtags table keeps exact counts of all stored tweets.
+
+        Args:
+            hashtag_count (Union[collections.Counter, SpaceSaving]):
+                Counter object or SpaceSaving sketch from
+                ingest_accounts.
+
+            n (int, optional):
+                Number of hashtags to log.  Default value is
+                HASHTAG_LOG_TOP.
+
+        Returns:
+            None.
+    """
+
+    if isinstance(hashtag_count, SpaceSaving):
+        top = hashtag_count.top(n=n)
+    else:
+        top = [(hashtag, count, 0) for hashtag, count in
+               hashtag_count.most_common(n)]
+
+    for hashtag, count, error in top:
+        log.info('#%s: %d tweets (+/- %d)', hashtag, count, error)
+
+    return None
+
+
 def hashtag_counter(
-    tweets: Iterable
+    tweets: Iterable,
+    capacity: int = None
 ) -> Dict:
     """ Counts and sorts hashtags in a list of tweets.
 
+        Tweets are counted one at a time with extract_hashtags, so the
+        tweets can be a stream and no corpus-sized string is built.
+
         Args:
             tweets (Iterable):
                 Iterable object with tweets.
 
+            capacity (int, optional):
+                When set, count approximately in fixed memory with a
+                SpaceSaving sketch of this many hashtags.  Default
+                value is None, and uses HASHTAG_SKETCH_CAPACITY.
+
         Returns:
             hashtag_count (Dict):
                 Counter object of hashtags converted to a list when
@@ -106,13 +1082,14 @@ def hashtag_counter(
                 to a Dict before returning.
     """
 
-    # Create a space-separated sting of all words in all tweets
-    tweet_text = ' '.join(tweet.text.lower() for tweet in tweets)
+    # Create a Counter object (or sketch) of hashtags, updated tweet by tweet
+    hashtag_count = _new_hashtag_count(capacity=capacity)
+    hashtag_count.update(
+        chain.from_iterable(map(extract_hashtags, tweets))
+    )
 
-    # Create a sorted Counter object of hashtags from tweet_text
-    hashtag_count = Counter(
-        db.VALID_HASHTAG.findall(tweet_text)
-    ).most_common()
+    # Sort the Counter object by count
+    hashtag_count = hashtag_count.most_common()
 
     # Convert hashtag_count to a dictionary
     hashtag_count = dict(hashtag_count)
@@ -120,41 +1097,181 @@ def hashtag_counter(
     return hashtag_count
 
 
-def main() -> None:
+def _count_text_chunk(
+    texts: List[str]
+) -> Counter:
+    """ Count the hashtags in a chunk of tweet text, in a worker process.
+
+        Args:
+            texts (List[str]):
+                List of tweet text.
+
+        Returns:
+            hashtag_count (collections.Counter):
+                Counter object of hashtags in the chunk.
+    """
+
+    hashtag_count = Counter()
+    for text in texts:
+        hashtag_count.update(db.VALID_HASHTAG.findall(text.lower()))
+
+    return hashtag_count
+
+
+def parallel_hashtag_counter(
+    tweets: Iterable,
+    workers: int = COUNT_WORKERS,
+    chunk_size: int = COUNT_CHUNK_SIZE
+) -> Dict:
+    """ Count and sort hashtags across CPU cores with a process pool.
+
+        Tweet text is split into chunks that are counted in worker
+        processes, and the per-chunk Counters are merged as they
+        complete.  Only the text is sent to the workers, and no more
+        than two chunks per worker are in flight, so memory stays
+        bounded for streamed input.
+
+        Args:
+            tweets (Iterable):
+                Iterable object with tweets, or with tweet text such as
+                db.stream_tweet_text() for a recount of the tweets
+                table.
+
+            workers (int, optional):
+                Number of worker processes.  Default value is
+                COUNT_WORKERS.
+
+            chunk_size (int, optional):
+                Number of tweets per worker task.  Default value is
+                COUNT_CHUNK_SIZE.
+
+        Returns:
+            hashtag_count (Dict):
+                Dictionary of hashtags and counts, sorted by count.
+    """
+
+    workers = workers or 1
+    texts = (
+        tweet if isinstance(tweet, str) else tweet.text for tweet in tweets
+    )
+    hashtag_count = Counter()
+    pending = set()
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        chunk = list(islice(texts, chunk_size))
+
+        while chunk or pending:
+            # Submit chunks until every worker has a chunk queued
+            while chunk and len(pending) < workers * 2:
+                pending.add(executor.submit(_count_text_chunk, chunk))
+                chunk = list(islice(texts, chunk_size))
+
+            # Merge the counts of completed chunks
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                hashtag_count.update(future.result())
+
+    # Sort the Counter object by count, and convert it to a dictionary
+    hashtag_count = dict(hashtag_count.most_common())
+
+    return hashtag_count
+
+
+def main(
+    incremental: bool = INCREMENTAL_LOAD,
+    accounts: Iterable[str] = None,
+    source: TweetSource = None,
+    refresh: bool = REFRESH_LOAD
+) -> None:
     """ Main program.
 
         Args:
-            None.
+            incremental (bool, optional):
+                When True, only collect tweets newer than the
+                high-water mark of each account, recorded when its last
+                ingest finished.  The hashtags of new tweets are added
+                to the existing counts as each chunk is written.  When
+                False, reload each entire timeline, as set by refresh.
+                Default value is INCREMENTAL_LOAD.
+
+            accounts (Iterable[str], optional):
+                Twitter accounts to collect tweets from.  Default value
+                is None, and uses TWITTER_ACCOUNTS.
+
+            source (TweetSource, optional):
+                Source of tweets, such as a RecordingSource to capture
+                an ingest run, or a ReplaySource to repeat one without
+                network access.  Default value is None, and uses a
+                LiveSource.
+
+            refresh (bool, optional):
+                For full loads.  When True, write the tweets and their
+                hashtag counts to staging tables, and swap them in for
+                the live tables in one transaction, so readers always
+                see a complete dataset.  When False, upsert tweets that
+                are already stored, and recount the hashtags of all
+                stored tweets.  Default value is REFRESH_LOAD.
 
         Returns:
             None.
     """
 
-    # Clear the database tables
-    db.truncate_tables()
+    if accounts is None:
+        accounts = TWITTER_ACCOUNTS
 
-    # Create a twitter API authentication object
-    api = twitter_api_auth()
+    # Get the high-water marks, or reload entire timelines for a full load
+    if incremental is True:
+        since_ids = {
+            account: db.get_since_id(screen_name=account)
+            for account in accounts
+        }
+    else:
+        since_ids = None
 
-    # Collet tweets from the Twitter API
-    tweets = get_top_n_tweets(
-        api_object=api
-    )
+    # Load a full refresh into staging tables, then swap them in
+    if incremental is False and refresh is True:
+        db.create_staging_tables()
 
-    # Convert tweets to from an islice to a list
-    tweets = list(tweets)
+        hashtag_count, account_stats = ingest_accounts(
+            accounts=accounts,
+            source=source,
+            staging=True
+        )
+        log_ingest_stats(account_stats=account_stats)
+        log_top_hashtags(hashtag_count=hashtag_count)
 
-    # Add tweets to the database
-    db.add_tweets(tweets=tweets)
+        # Swap the tables in, and increment the dataset version
+        db.swap_staging_tables()
 
-    # Collect a count of hashtags
-    hashtag_count = hashtag_counter(tweets=tweets)
+        # Every account is loaded, record the high-water marks
+        for account in accounts:
+            db.record_since_id(screen_name=account)
 
-    # Add hashtags to the database
-    db.add_hashtags(hashtags=hashtag_count)
+        return None
+
+    # Stream tweets for every account from the Twitter API to the database
+    hashtag_count, account_stats = ingest_accounts(
+        accounts=accounts,
+        since_ids=since_ids,
+        source=source
+    )
+    log_ingest_stats(account_stats=account_stats)
+    log_top_hashtags(hashtag_count=hashtag_count)
+
+    # Recount all stored tweets for full loads, incremental loads already
+    # added the hashtags of new tweets with each chunk
+    if incremental is False:
+        db.recount_hashtags(counter=parallel_hashtag_counter)
+
+    # Invalidate cached query results
+    db.bump_dataset_version()
 
     return None
 
 
 if __name__ == '__main__':
+    logging.basicConfig(
+        format='%(asctime)s %(levelname)s %(name)s: %(message)s',
+        level=logging.INFO
+    )
     main()
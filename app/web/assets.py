@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+""" Static asset build and response compression for ww-tweeter.
+
+    The build copies each file in the static directory to a
+    fingerprinted name, with a hash of its content in the name, so the
+    file can be cached by browsers forever, and writes gzip and brotli
+    compressed copies beside it.  A manifest maps each file to its
+    fingerprinted name.  Brotli is used when the brotli package is
+    installed.
+
+    Usage:
+        python -m app.web.assets
+"""
+
+# Imports - Python Standard Library
+from hashlib import sha256
+from os.path import dirname
+from pathlib import Path
+from shutil import rmtree
+from typing import Dict, Iterator
+import gzip
+import json
+import zlib
+
+# Imports - Third-Party
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Imports - Local
+
+# Constants
+ASSETS_BUILD_DIR = 'build'  # Fingerprinted assets, in the static directory
+ASSETS_COMPRESS_SUFFIXES = (
+    '.css', '.html', '.js', '.json', '.svg', '.txt'
+)  # Text assets, which are precompressed
+ASSETS_HASH_LENGTH = 12  # Hex digits of the content hash in file names
+ASSETS_MANIFEST = 'manifest.json'
+ASSETS_STATIC_PATH = Path(dirname(__file__)) / 'static'
+BUILD_LEVELS = {'br': 11, 'gzip': 9}  # Slowest, smallest, for the build
+COMPRESS_LEVELS = {'br': 5, 'gzip': 6}  # Fast, for responses
+ENCODING_SUFFIXES = {'br': '.br', 'gzip': '.gz'}
+ENCODINGS = (
+    ('br', 'gzip') if brotli is not None else ('gzip',)
+)  # Supported Content-Encodings, most preferred first
+
+
+# Functions
+def compress(
+    content: bytes,
+    encoding: str,
+    levels: Dict[str, int] = COMPRESS_LEVELS
+) -> bytes:
+    """ Compress content with a Content-Encoding.
+
+        Args:
+            content (bytes):
+                Content to compress.
+
+            encoding (str):
+                'gzip', or 'br' if the brotli package is installed.
+
+            levels (Dict[str, int], optional):
+                Compression level of each encoding.  Default value is
+                COMPRESS_LEVELS.
+
+        Returns:
+            compressed_content (bytes):
+                Compressed content.
+    """
+
+    if encoding == 'br':
+        compressed_content = brotli.compress(
+            content,
+            quality=levels['br']
+        )
+    else:
+        # A fixed mtime makes builds of the same content identical
+        compressed_content = gzip.compress(
+            content,
+            compresslevel=levels['gzip'],
+            mtime=0
+        )
+
+    return compressed_content
+
+
+def compress_stream(
+    chunks: Iterator[bytes],
+    level: int = COMPRESS_LEVELS['gzip']
+) -> Iterator[bytes]:
+    """ Compress a stream of chunks with gzip, one chunk at a time.
+
+        Each chunk is flushed, so the client can decompress every chunk
+        as it arrives.
+
+        Args:
+            chunks (Iterator[bytes]):
+                Chunks to compress, such as a streamed response body.
+
+            level (int, optional):
+                gzip compression level.  Default value is
+                COMPRESS_LEVELS['gzip'].
+
+        Yields:
+            compressed_chunk (bytes):
+                gzip compressed chunks.
+    """
+
+    # wbits of 31 writes a gzip header and trailer
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    try:
+        for chunk in chunks:
+            yield compressor.compress(chunk) + compressor.flush(
+                zlib.Z_SYNC_FLUSH
+            )
+
+        yield compressor.flush()
+    finally:
+        # Close the stream, so it can clean up if the client disconnects
+        close = getattr(chunks, 'close', None)
+        if close is not None:
+            close()
+
+
+def fingerprint(
+    name: str,
+    content: bytes
+) -> str:
+    """ Add a hash of a file's content to its name.
+
+        Args:
+            name (str):
+                File path in the static directory, such as
+                'css/style.css'.
+
+            content (bytes):
+                File content.
+
+        Returns:
+            fingerprinted_name (str):
+                File path with the content hash before the suffix, such
+                as 'css/style.0123456789ab.css'.
+    """
+
+    path = Path(name)
+    digest = sha256(content).hexdigest()[:ASSETS_HASH_LENGTH]
+    fingerprinted_name = path.with_name(
+        f'{path.stem}.{digest}{path.suffix}'
+    ).as_posix()
+
+    return fingerprinted_name
+
+
+def build(
+    static_path: Path = ASSETS_STATIC_PATH
+) -> Dict[str, str]:
+    """ Build fingerprinted and precompressed copies of static files.
+
+        The build directory is replaced, so old fingerprinted files are
+        removed.
+
+        Args:
+            static_path (pathlib.Path, optional):
+                Static directory.  Default value is ASSETS_STATIC_PATH.
+
+        Returns:
+            manifest (Dict[str, str]):
+                Fingerprinted path of each file, relative to the static
+                directory.
+    """
+
+    build_path = static_path / ASSETS_BUILD_DIR
+    rmtree(build_path, ignore_errors=True)
+
+    manifest = {}
+
+    for path in sorted(static_path.rglob('*')):
+        if not path.is_file() or build_path in path.parents:
+            continue
+
+        name = path.relative_to(static_path).as_posix()
+        content = path.read_bytes()
+        build_name = f'{ASSETS_BUILD_DIR}/{fingerprint(name, content)}'
+
+        build_file = static_path / build_name
+        build_file.parent.mkdir(parents=True, exist_ok=True)
+        build_file.write_bytes(content)
+
+        # Keep compressed copies that are smaller than the file
+        if path.suffix in ASSETS_COMPRESS_SUFFIXES:
+            for encoding in ENCODINGS:
+                compressed_content = compress(
+                    content=content,
+                    encoding=encoding,
+                    levels=BUILD_LEVELS
+                )
+
+                if len(compressed_content) < len(content):
+                    build_file.with_name(
+                        build_file.name + ENCODING_SUFFIXES[encoding]
+                    ).write_bytes(compressed_content)
+
+        manifest[name] = build_name
+
+    (build_path / ASSETS_MANIFEST).write_text(
+        json.dumps(manifest, indent=2, sort_keys=True)
+    )
+
+    return manifest
+
+
+def load_manifest(
+    static_path: Path = ASSETS_STATIC_PATH
+) -> Dict[str, str]:
+    """ Load the manifest of the last build.
+
+        Args:
+            static_path (pathlib.Path, optional):
+                Static directory.  Default value is ASSETS_STATIC_PATH.
+
+        Returns:
+            manifest (Dict[str, str]):
+                Fingerprinted path of each file, or an empty dict if
+                the assets have not been built.
+    """
+
+    manifest_path = static_path / ASSETS_BUILD_DIR / ASSETS_MANIFEST
+
+    try:
+        manifest = json.loads(manifest_path.read_text())
+    except FileNotFoundError:
+        manifest = {}
+
+    return manifest
+
+
+def main() -> None:
+    """ Main program, build the static assets.
+
+        Args:
+            None.
+
+        Returns:
+            None.
+    """
+
+    manifest = build()
+
+    for name, build_name in manifest.items():
+        print(f'{name} -> {build_name}')
+
+    return None
+
+
+if __name__ == '__main__':
+    main()
@@ -5,7 +5,7 @@
     <meta http-equiv="X-UA-Compatible" content="IE=edge">
     <meta name="viewport" content="width=device-width, initial-scale=1">
     <link href="//cdn.muicss.com/mui-0.9.28/css/mui.min.css" rel="stylesheet" type="text/css" />
-    <link href="static/css/style.css" rel="stylesheet" type="text/css" />
+    <link href="{{ static_url('css/style.css') }}" rel="stylesheet" type="text/css" />
     <script src="//cdn.muicss.com/mui-0.9.28/js/mui.min.js"></script>
     <title>Daily Python Tip</title>
   </head>
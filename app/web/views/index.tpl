@@ -8,21 +8,28 @@
 			<div class="mui--text-dark-secondary mui--text-body2">
 				<h1>
           % if filter:
-					WWT Tweets {{ filter }} ({{ len(tweets) }})
+					WWT Tweets {{ filter }}
 						<small>&nbsp;(<a href="/">show all</a>)</small>
           % else:
-            WWT Tweets ({{ len(tweets) }})
+            WWT Tweets
 					% end
 				</h1>
 			</div>
 			<div class="mui-divider"></div>
-			% for tweet in tweets:
-				<div class='tweet'>
-					<pre>{{ !tweet.tweet_text }}</pre>
-					<div class="mui--text-dark-secondary"><strong>{{ tweet.likes }}</strong> Likes / <strong>{{ tweet.retweets }}</strong> RTs / {{ tweet.created }} / <a href="https://twitter.com/wwt_inc/status/{{ tweet.tweet_id }}" target="_blank">Share</a></div>
-				</div>
+			% for tweet_html in tweets_html:
+				{{ !tweet_html }}
 			% end
 
+			<div class="mui-divider"></div>
+			<div class="pages">
+			% if prev_url:
+				<a class="mui-btn" href="{{ prev_url }}">&laquo; Newer</a>
+			% end
+			% if next_url:
+				<a class="mui-btn" href="{{ next_url }}">Older &raquo;</a>
+			% end
+			</div>
+
 		</div>
 	</div>
 
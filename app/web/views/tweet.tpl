@@ -0,0 +1,4 @@
+<div class='tweet'>
+					<pre>{{ !tweet.tweet_text }}</pre>
+					<div class="mui--text-dark-secondary"><strong>{{ tweet.likes }}</strong> Likes / <strong>{{ tweet.retweets }}</strong> RTs / {{ tweet.created }} / <a href="https://twitter.com/{{ screen_name }}/status/{{ tweet.tweet_id }}" target="_blank">Share</a></div>
+				</div>
@@ -2,26 +2,76 @@
 """ Twitter analyzer web view for #100DaysofCode Days 59+60. """
 
 # Imports - Python Standard Library
-from os.path import dirname, join
+from datetime import datetime
+from functools import wraps
+from itertools import islice
+from mimetypes import guess_type
+from os import cpu_count, getenv
+from os.path import dirname, isfile, join
 from pathlib import Path
-from typing import Dict, Union
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple, Union
+from urllib.parse import urlencode
+import json
 
 # Imports - Third-Party
 from bottle import (
-    Bottle, HTTPError, HTTPResponse, request, run, static_file,
-    TEMPLATE_PATH, view
+    Bottle, http_date, HTTPError, HTTPResponse, parse_date, request,
+    response, run, SimpleTemplate, static_file, template, TEMPLATE_PATH
 )
 
 # Imports - Local
-from app.db import db
+from app.db import cache, db
 from app.tweeter import tweeter
+from app.web import assets
 
 # Constants
+API_CONTENT_TYPE = 'application/x-ndjson'  # Newline delimited JSON
+API_HASHTAG_FIELDS = ('name', 'count')  # Public Hashtag columns
+API_MAX_LIMIT = 1000  # Largest page of API results
+API_PAGE_SIZE = 50  # API results per page, when only a cursor is sent
+API_STREAM_CHUNK_SIZE = 1000  # Rows per chunk of a streamed API response
+APP_CACHE_CONTROL = getenv(
+    key='APP_CACHE_CONTROL',
+    default='public, no-cache'
+)  # Cache-Control of pages, no-cache has caches revalidate with the ETag
+APP_COMPRESS_MIN_SIZE = int(
+    getenv(key='APP_COMPRESS_MIN_SIZE', default='1024')
+)  # Smallest response body, in bytes, that is compressed
+APP_DB_CONNECTIONS = int(
+    getenv(key='APP_DB_CONNECTIONS', default='50')
+)  # Database connections shared by all workers, below max_connections
 APP_DEBUG = True
+APP_FRAGMENT_CACHE_SIZE = int(
+    getenv(key='APP_FRAGMENT_CACHE_SIZE', default='4096')
+)  # Rendered tweet fragments, shared by every page
+APP_GRACEFUL_TIMEOUT = int(
+    getenv(key='APP_GRACEFUL_TIMEOUT', default='30')
+)  # Seconds workers have to finish requests when reloaded or stopped
 APP_HOST = 'web'
+APP_MODE = getenv(key='APP_MODE', default='development')
+APP_PAGE_CACHE_SIZE = int(
+    getenv(key='APP_PAGE_CACHE_SIZE', default='64')
+)  # Rendered pages, per filter and page cursor
+APP_PAGE_SIZE = 50  # Tweets per page
 APP_PATH = Path(dirname(__file__))
 APP_PORT = 8080
+APP_RELEASED = datetime.utcnow().replace(microsecond=0)
+APP_RELEASE = getenv(
+    key='APP_RELEASE',
+    default=APP_RELEASED.strftime('%Y%m%d%H%M%S')
+)  # Application release in ETags, set the same value on every host
 APP_RELOADER = True
+APP_SERVER = 'gunicorn'  # Production WSGI server, a pre-fork server
+APP_THREADS = int(getenv(key='APP_THREADS', default='4'))  # Per worker
+APP_WORKERS = int(
+    getenv(
+        key='APP_WORKERS',
+        default=str(
+            max(1, min(cpu_count() * 2 + 1, APP_DB_CONNECTIONS // APP_THREADS))
+        )
+    )
+)  # Worker processes in production mode, one connection per thread
+APP_STATIC_CACHE_CONTROL = 'public, max-age=31536000, immutable'
 APP_STATIC_DIR = 'static'
 APP_STATIC_PATH = join(APP_PATH, APP_STATIC_DIR)
 APP_VIEW_DIR = 'views'
@@ -35,6 +85,273 @@ if RELOAD_TWEETS is True:
 # Create a bottle object
 app = Bottle()
 
+# Keep Last-Modified on 304 responses, which bottle removes by default,
+# so caches can refresh the date of their stored copy (RFC 9110, 15.4.5)
+response.bad_headers = {
+    **response.bad_headers,
+    304: response.bad_headers[304] - {'Last-Modified'}
+}
+
+# Create caches of rendered pages, which follow the dataset version of
+# the query cache, and of rendered tweets, which are keyed by the tweet
+# counts that change between versions, so they outlive a version
+page_cache = cache.QueryCache(
+    get_version=lambda: cache.query_cache.version(),
+    maxsize=APP_PAGE_CACHE_SIZE,
+    version_ttl=0
+)
+fragment_cache = cache.QueryCache(
+    get_version=lambda: APP_RELEASE,
+    maxsize=APP_FRAGMENT_CACHE_SIZE
+)
+
+
+@app.hook('after_request')
+def remove_db_session() -> None:
+    """ Return the database session of the request thread to the pool.
+
+        Args:
+            None.
+
+        Returns:
+            None.
+    """
+
+    db.remove_session()
+
+    return None
+
+
+def _validators() -> Dict:
+    """ Create the cache validator headers for the current dataset.
+
+        The ETag and Last-Modified headers change when ingest writes a
+        new dataset version, or when the application is released.  The
+        dataset version is read through the query cache, which reads
+        it from the database on every request, unless
+        cache.CACHE_VERSION_TTL is set.
+
+        The ETag is weak, so it is shared by the compressed and
+        uncompressed responses.
+
+        Args:
+            None.
+
+        Returns:
+            headers (Dict):
+                Cache-Control, ETag, Last-Modified, and Vary headers.
+    """
+
+    version, updated = cache.query_cache.version()
+    last_modified = max(updated or APP_RELEASED, APP_RELEASED)
+
+    headers = {
+        'Cache-Control': APP_CACHE_CONTROL,
+        'ETag': f'W/"{version}-{APP_RELEASE}"',
+        'Last-Modified': http_date(last_modified),
+        'Vary': 'Accept-Encoding'
+    }
+
+    return headers
+
+
+def _not_modified(
+    headers: Dict
+) -> bool:
+    """ Check the request's conditional headers against the validators.
+
+        If-None-Match takes precedence over If-Modified-Since.
+
+        Args:
+            headers (Dict):
+                Validator headers, from _validators.
+
+        Returns:
+            not_modified (bool):
+                True if the client's copy is current, and a 304
+                response can be sent.
+    """
+
+    if_none_match = request.get_header('If-None-Match')
+    if_modified_since = request.get_header('If-Modified-Since')
+
+    if if_none_match is not None:
+        etags = [etag.strip() for etag in if_none_match.split(',')]
+        # Weak comparison, ignoring the W/ prefix
+        etag = headers['ETag'].removeprefix('W/')
+        not_modified = '*' in etags or any(
+            tag.removeprefix('W/') == etag for tag in etags
+        )
+    elif if_modified_since is not None:
+        since = parse_date(if_modified_since)
+        not_modified = since is not None and (
+            since >= parse_date(headers['Last-Modified'])
+        )
+    else:
+        not_modified = False
+
+    return not_modified
+
+
+def conditional(
+    callback: Callable
+) -> Callable:
+    """ Route decorator for conditional GET responses.
+
+        Adds ETag, Last-Modified, and Cache-Control headers to the
+        response.  When the client's copy is current, a 304 response is
+        sent before the route runs, without database queries or
+        template rendering.
+
+        Args:
+            callback (Callable):
+                Route function.
+
+        Returns:
+            wrapper (Callable):
+                Route function with conditional responses.
+    """
+
+    @wraps(callback)
+    def wrapper(*args, **kwargs) -> object:
+        headers = _validators()
+
+        if request.method in ('GET', 'HEAD') and _not_modified(headers):
+            raise HTTPResponse(status=304, headers=headers)
+
+        for name, value in headers.items():
+            response.set_header(name, value)
+
+        return callback(*args, **kwargs)
+
+    return wrapper
+
+
+def _accepted_encoding(
+    encodings: Tuple[str] = None
+) -> Union[str, None]:
+    """ Choose a Content-Encoding from the request's Accept-Encoding.
+
+        Args:
+            encodings (Tuple[str], optional):
+                Supported encodings, most preferred first.  Default
+                value is None, and uses assets.ENCODINGS.
+
+        Returns:
+            encoding (Union[str, None]):
+                Most preferred encoding the client accepts, or None.
+    """
+
+    if encodings is None:
+        encodings = assets.ENCODINGS
+
+    accepted = {}
+
+    for item in request.get_header('Accept-Encoding', '').split(','):
+        coding, _, params = item.partition(';')
+        quality = 1.0
+
+        if params.strip().startswith('q='):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+
+        accepted[coding.strip().lower()] = quality
+
+    encoding = next(
+        (
+            encoding for encoding in encodings
+            if accepted.get(encoding, accepted.get('*', 0.0)) > 0
+        ),
+        None
+    )
+
+    return encoding
+
+
+def compressed(
+    callback: Callable
+) -> Callable:
+    """ Route decorator for compressed responses.
+
+        Response bodies of APP_COMPRESS_MIN_SIZE bytes or more are
+        compressed with the most preferred encoding the client accepts.
+        Compressed bodies are cached in the page cache until the
+        dataset version changes, so apply it below @conditional, to
+        routes whose response only depends on the request path, query,
+        and dataset.  Streamed bodies are compressed with gzip, one
+        chunk at a time.
+
+        Args:
+            callback (Callable):
+                Route function, that returns bytes or an iterator of
+                bytes.
+
+        Returns:
+            wrapper (Callable):
+                Route function with compressed responses.
+    """
+
+    @wraps(callback)
+    def wrapper(*args, **kwargs) -> object:
+        body = callback(*args, **kwargs)
+        response.set_header('Vary', 'Accept-Encoding')
+
+        if not isinstance(body, bytes):
+            encoding = _accepted_encoding(encodings=('gzip',))
+
+            if encoding is not None:
+                body = assets.compress_stream(chunks=body)
+                response.set_header('Content-Encoding', encoding)
+
+            return body
+
+        encoding = _accepted_encoding()
+
+        if encoding is None or len(body) < APP_COMPRESS_MIN_SIZE:
+            return body
+
+        key = ('compressed', request.path, request.query_string, encoding)
+        version = page_cache.version()
+        compressed_body = page_cache.get(key=key)
+
+        if compressed_body is cache.CACHE_MISSING:
+            compressed_body = assets.compress(content=body, encoding=encoding)
+            page_cache.set(key=key, result=compressed_body, version=version)
+
+        response.set_header('Content-Encoding', encoding)
+
+        return compressed_body
+
+    return wrapper
+
+
+def static_url(
+    filename: str
+) -> str:
+    """ Create the URL of a static file.
+
+        Args:
+            filename (str):
+                Static file name, such as 'css/style.css'.
+
+        Returns:
+            url (str):
+                URL of the fingerprinted file from the asset build, or
+                of the file itself if the assets are not built.
+    """
+
+    url = f'/{APP_STATIC_DIR}/{static_manifest.get(filename, filename)}'
+
+    return url
+
+
+# Load the static asset build, and make static_url available to templates
+static_manifest = assets.load_manifest()
+static_fingerprints = set(static_manifest.values())
+SimpleTemplate.defaults['static_url'] = static_url
+
 
 # Setup path to static files
 # Reference: https://bottlepy.org/docs/dev/tutorial.html#static-files
@@ -44,6 +361,10 @@ def send_static(
 ) -> Union[HTTPError, HTTPResponse]:
     """ WW-Tweeter static file route.
 
+        Fingerprinted files from the asset build never change, so they
+        are sent with an immutable Cache-Control header, and their
+        precompressed copy is sent to clients that accept it.
+
         Args:
             filename (str):
                 Static file name to load.
@@ -53,11 +374,44 @@ def send_static(
                 HTTP Response or HTTP error object.
     """
 
-    static_file_path = static_file(
-        filename=filename,
-        root=APP_STATIC_PATH
+    if filename not in static_fingerprints:
+        static_file_path = static_file(
+            filename=filename,
+            root=APP_STATIC_PATH
+        )
+
+        return static_file_path
+
+    # Send the precompressed copy, with the type of the original file
+    encoding = next(
+        (
+            encoding for encoding in assets.ENCODINGS
+            if _accepted_encoding(encodings=(encoding,)) is not None
+            and isfile(join(
+                APP_STATIC_PATH,
+                filename + assets.ENCODING_SUFFIXES[encoding]
+            ))
+        ),
+        None
     )
 
+    if encoding is not None:
+        static_file_path = static_file(
+            filename=filename + assets.ENCODING_SUFFIXES[encoding],
+            root=APP_STATIC_PATH,
+            mimetype=guess_type(filename)[0] or 'application/octet-stream'
+        )
+        static_file_path.set_header('Content-Encoding', encoding)
+    else:
+        static_file_path = static_file(
+            filename=filename,
+            root=APP_STATIC_PATH
+        )
+
+    if static_file_path.status_code < 400:
+        static_file_path.set_header('Cache-Control', APP_STATIC_CACHE_CONTROL)
+        static_file_path.set_header('Vary', 'Accept-Encoding')
+
     return static_file_path
 
 
@@ -65,23 +419,145 @@ def send_static(
 TEMPLATE_PATH.insert(0, APP_VIEW_PATH)
 
 
+def _page_url(
+    cursor: str = None
+) -> Union[str, None]:
+    """ Create a link to another page of the current request.
+
+        Args:
+            cursor (str, optional):
+                Page cursor from db.get_tweets.  Default value is None.
+
+        Returns:
+            page_url (Union[str, None]):
+                Request path and query string with the page cursor, or
+                None if there is no cursor.
+    """
+
+    if cursor is None:
+        return None
+
+    # Keep the other query parameters, such as the hashtag search
+    query = {
+        key: value for key, value in request.query.decode().items()
+        if key != 'cursor'
+    }
+    query['cursor'] = cursor
+
+    page_url = f'{request.path}?{urlencode(query)}'
+
+    return page_url
+
+
+def _render_tweets(
+    tweets: List
+) -> List[str]:
+    """ Render the tweet.tpl fragment of each tweet, or get it cached.
+
+        Fragments are keyed by the tweet, its account, and its like and
+        retweet counts, so pages that share a tweet share its markup,
+        and only tweets with new counts are rendered again after an
+        ingest.  Tweets stored without an account link to
+        tweeter.TWITTER_ACCOUNT.
+
+        Args:
+            tweets (List):
+                List of TweetData objects.
+
+        Returns:
+            tweets_html (List[str]):
+                Rendered HTML of each tweet.
+    """
+
+    version = fragment_cache.version()
+    tweets_html = []
+
+    for tweet in tweets:
+        screen_name = tweet.screen_name or tweeter.TWITTER_ACCOUNT
+        key = (tweet.tweet_id, screen_name, tweet.likes, tweet.retweets)
+        tweet_html = fragment_cache.get(key=key)
+
+        if tweet_html is cache.CACHE_MISSING:
+            tweet_html = template(
+                'tweet',
+                tweet=tweet,
+                screen_name=screen_name
+            )
+            fragment_cache.set(key=key, result=tweet_html, version=version)
+
+        tweets_html.append(tweet_html)
+
+    return tweets_html
+
+
+def _render_index(
+    filter: str = None,
+    cursor: str = None
+) -> bytes:
+    """ Render a page of the index.tpl view.
+
+        Args:
+            filter (str, optional):
+                Hashtag search.  Default value is None.
+
+            cursor (str, optional):
+                Page cursor from db.get_tweets.  Default value is None.
+
+        Returns:
+            page (bytes):
+                UTF-8 encoded HTML page.
+    """
+
+    # Get one page of tweets, at the position of the page cursor, cached
+    # until the dataset version changes
+    try:
+        tweets = cache.get_tweets(
+            search_tag=filter,
+            limit=APP_PAGE_SIZE,
+            cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPError(status=400, body=str(e))
+
+    # Get hashtags from the database, or the cache
+    hashtags = cache.get_hashtags()
+
+    page = template(
+        'index',
+        filter=filter,
+        tweets=tweets,
+        tweets_html=_render_tweets(tweets=tweets),
+        hashtags=hashtags,
+        next_url=_page_url(cursor=tweets.next_cursor),
+        prev_url=_page_url(cursor=tweets.prev_cursor)
+    ).encode()
+
+    return page
+
+
 # Function for HTTP request routing
 @app.get(path='/')
 @app.get(path='/<filter>')
 @app.get(path='/<filter>/')
-@view(tpl_name='index')
+@conditional
+@compressed
 def index(
     filter: str = None
-) -> Dict:
+) -> bytes:
     """ WW-Tweeter web view route.
 
+        Rendered pages are cached by request path and query string,
+        which hold the filter and page cursor, until the dataset
+        version changes, so hot pages are sent without queries or
+        template rendering.
+
         Args:
             filter (str, optional):
                 Keyword filter for search.
 
         Returns:
-            tweets_hashtags (Dict):
-                Dict of tweet and hashtag data.
+            page (bytes):
+                UTF-8 encoded HTML page.
     """
 
     # Get tweets from the database, use a filter if present
@@ -90,47 +566,407 @@ def index(
     else:
         filter = request.query.get('hashtag') or None
 
-    tweets = db.get_tweets(
-        search_tag=filter
-    )
+    # Page links keep the request path and query, so both are the key
+    key = (request.path, request.query_string)
+    version = page_cache.version()
+    page = page_cache.get(key=key)
 
-    # Get hashtags from the database
-    hashtags = db.get_hashtags()
+    if page is cache.CACHE_MISSING:
+        page = _render_index(
+            filter=filter,
+            cursor=request.query.get('cursor') or None
+        )
+        page_cache.set(key=key, result=page, version=version)
 
-    # Create response dictionary object
-    tweets_hashtags = {
-        'filter': filter,
-        'tweets': tweets,
-        'hashtags': hashtags
-    }
+    response.content_type = 'text/html; charset=UTF-8'
 
-    # Temporary return string value for testing
-    # tweets_hashtags = str(
-    #     f"Tweet count: {len(tweets_hashtags.get('tweets'))}"
-    # )
+    return page
 
-    return tweets_hashtags
 
+def _json_default(
+    value: object
+) -> str:
+    """ Serialize values the json module does not support.
 
-def main() -> None:
-    """ Main program.
+        Args:
+            value (object):
+                Value to serialize.
+
+        Returns:
+            serialized_value (str):
+                ISO 8601 string of a datetime value.
+
+        Raises:
+            TypeError:
+                The value can not be serialized.
+    """
+
+    if not isinstance(value, datetime):
+        raise TypeError(f'{type(value).__name__} is not JSON serializable')
+
+    serialized_value = value.isoformat()
+
+    return serialized_value
+
+
+def _ndjson(
+    rows: Iterable[Dict]
+) -> bytes:
+    """ Serialize rows as newline delimited JSON.
+
+        Args:
+            rows (Iterable[Dict]):
+                Rows to serialize.
+
+        Returns:
+            ndjson (bytes):
+                UTF-8 encoded JSON object of each row, one per line.
+    """
+
+    ndjson = ''.join(
+        json.dumps(row, default=_json_default, separators=(',', ':')) + '\n'
+        for row in rows
+    ).encode()
+
+    return ndjson
+
+
+def _api_fields(
+    fields: Tuple[str]
+) -> List[str]:
+    """ Get the fields selected by the fields query parameter.
+
+        Args:
+            fields (Tuple[str]):
+                Fields the endpoint can return.
+
+        Returns:
+            selected_fields (List[str]):
+                Fields in the comma separated fields query parameter,
+                or all fields if it is not set.
+    """
+
+    query_fields = request.query.get('fields')
+
+    if not query_fields:
+        return list(fields)
+
+    selected_fields = [
+        field.strip() for field in query_fields.split(',') if field.strip()
+    ]
+
+    for field in selected_fields:
+        if field not in fields:
+            raise HTTPError(
+                status=400,
+                body=f'Invalid field "{field}", choose from '
+                     f'{", ".join(fields)}'
+            )
+
+    return selected_fields
+
+
+def _api_hashtag() -> Union[str, None]:
+    """ Get the hashtag search from the hashtag query parameter.
 
         Args:
             None.
 
         Returns:
+            search_tag (Union[str, None]):
+                Hashtag search string, such as '#wwt', or None if the
+                hashtag query parameter is not set.
+    """
+
+    query_hashtag = request.query.get('hashtag')
+
+    if not query_hashtag:
+        return None
+
+    # Invalid hashtags would match every tweet, instead of none
+    search_tag = f'#{query_hashtag.lstrip("#")}'
+
+    if db.VALID_HASHTAG.fullmatch(search_tag.lower()) is None:
+        raise HTTPError(
+            status=400,
+            body=f'Invalid hashtag "{query_hashtag}", use 3 or more letters '
+                 'and digits'
+        )
+
+    return search_tag
+
+
+def _api_limit() -> Union[int, None]:
+    """ Get the page size from the limit query parameter.
+
+        Args:
             None.
+
+        Returns:
+            limit (Union[int, None]):
+                Page size from 1 to API_MAX_LIMIT, or None if the limit
+                query parameter is not set.
     """
 
-    # Run the bottle service
-    run(
-        app=app,
-        host=APP_HOST,
-        port=APP_PORT,
-        debug=APP_DEBUG,
-        reloader=APP_RELOADER
+    query_limit = request.query.get('limit')
+
+    if not query_limit:
+        return None
+
+    try:
+        limit = int(query_limit)
+    except ValueError:
+        limit = 0
+
+    if not 1 <= limit <= API_MAX_LIMIT:
+        raise HTTPError(
+            status=400,
+            body=f'Invalid limit "{query_limit}", choose 1 to {API_MAX_LIMIT}'
+        )
+
+    return limit
+
+
+def _set_links(
+    next_url: str = None,
+    prev_url: str = None
+) -> None:
+    """ Set a Link header with the URLs of the adjacent API pages.
+
+        Args:
+            next_url (str, optional):
+                URL of the next page.  Default value is None.
+
+            prev_url (str, optional):
+                URL of the previous page.  Default value is None.
+
+        Returns:
+            None.
+    """
+
+    links = [
+        f'<{url}>; rel="{rel}"'
+        for rel, url in (('next', next_url), ('prev', prev_url))
+        if url is not None
+    ]
+
+    if links:
+        response.set_header('Link', ', '.join(links))
+
+    return None
+
+
+def _stream_tweets(
+    search_tag: str = None,
+    fields: List[str] = db.TWEET_FIELDS
+) -> Iterator[bytes]:
+    """ Stream tweets as chunks of newline delimited JSON.
+
+        The WSGI server sends the chunks as they are read from the
+        database server-side cursor, after the after_request hook has
+        run, so the session of the request thread is removed again
+        when the stream ends or the client disconnects.
+
+        Args:
+            search_tag (str, optional):
+                Hashtag search string.  Default value is None.
+
+            fields (List[str], optional):
+                Tweet fields to send.  Default value is db.TWEET_FIELDS.
+
+        Yields:
+            chunk (bytes):
+                Up to API_STREAM_CHUNK_SIZE tweets, one JSON object per
+                line.
+    """
+
+    try:
+        tweets = db.stream_tweets(search_tag=search_tag, fields=fields)
+
+        while True:
+            rows = list(islice(tweets, API_STREAM_CHUNK_SIZE))
+            if not rows:
+                break
+
+            yield _ndjson(rows=rows)
+    finally:
+        db.remove_session()
+
+
+@app.get(path='/api/tweets')
+@conditional
+@compressed
+def api_tweets() -> Union[bytes, Iterator[bytes]]:
+    """ WW-Tweeter tweets API route.
+
+        Query parameters:
+            hashtag: Hashtag filter, with or without the leading #.
+            fields: Comma separated fields, from db.TWEET_FIELDS.
+            limit: Tweets per page, up to API_MAX_LIMIT.
+            cursor: Page cursor, from a Link header.
+
+        Without limit or cursor, every matching tweet is streamed from
+        the database.  With them, one page is sent, and the adjacent
+        pages are in the Link header.
+
+        Args:
+            None.
+
+        Returns:
+            tweets (Union[bytes, Iterator[bytes]]):
+                Newline delimited JSON, one tweet per line, newest first.
+    """
+
+    search_tag = _api_hashtag()
+    fields = _api_fields(fields=db.TWEET_FIELDS)
+    limit = _api_limit()
+    cursor = request.query.get('cursor') or None
+
+    response.content_type = API_CONTENT_TYPE
+
+    # Stream large results, instead of building them in memory
+    if limit is None and cursor is None:
+        tweets = _stream_tweets(search_tag=search_tag, fields=fields)
+
+        return tweets
+
+    try:
+        page = cache.get_tweets(
+            search_tag=search_tag,
+            limit=limit or API_PAGE_SIZE,
+            cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPError(status=400, body=str(e))
+
+    _set_links(
+        next_url=_page_url(cursor=page.next_cursor),
+        prev_url=_page_url(cursor=page.prev_cursor)
+    )
+
+    tweets = _ndjson(
+        rows=({field: getattr(tweet, field) for field in fields}
+              for tweet in page)
     )
 
+    return tweets
+
+
+@app.get(path='/api/hashtags')
+@conditional
+@compressed
+def api_hashtags() -> bytes:
+    """ WW-Tweeter hashtags API route.
+
+        Query parameters:
+            hashtag: Hashtag name prefix, with or without the leading #.
+            fields: Comma separated fields, from API_HASHTAG_FIELDS.
+            limit: Hashtags per page, up to API_MAX_LIMIT.
+            cursor: Page cursor, from a Link header.
+
+        Args:
+            None.
+
+        Returns:
+            hashtags (bytes):
+                Newline delimited JSON, one hashtag per line, by name.
+    """
+
+    prefix = (request.query.get('hashtag') or '').lstrip('#').lower()
+    fields = _api_fields(fields=API_HASHTAG_FIELDS)
+    limit = _api_limit()
+    cursor = request.query.get('cursor') or None
+
+    # Hashtags are sorted by name, so the cursor is the last name sent
+    page = [
+        hashtag for hashtag in cache.get_hashtags()
+        if hashtag.name.startswith(prefix)
+        and (cursor is None or hashtag.name > cursor)
+    ]
+
+    if limit is not None and len(page) > limit:
+        page = page[:limit]
+        _set_links(next_url=_page_url(cursor=page[-1].name))
+
+    response.content_type = API_CONTENT_TYPE
+
+    hashtags = _ndjson(
+        rows=({field: getattr(hashtag, field) for field in fields}
+              for hashtag in page)
+    )
+
+    return hashtags
+
+
+def main(
+    mode: str = APP_MODE
+) -> None:
+    """ Main program.
+
+        Development mode runs the bottle development server, with the
+        debugger and reloader.  Production mode runs APP_WORKERS
+        pre-forked gunicorn worker processes, each with APP_THREADS
+        threads, and with the debugger and reloader off.  Each worker
+        has a database connection per thread, and the workers together
+        may not use more than APP_DB_CONNECTIONS connections.  Send the
+        gunicorn master process SIGHUP to gracefully replace the
+        workers, for example after a deployment.
+
+        Args:
+            mode (str, optional):
+                'development' or 'production'.  Default value is
+                APP_MODE.
+
+        Returns:
+            None.
+
+        Raises:
+            ValueError:
+                The mode is not valid, or the production workers need
+                more than APP_DB_CONNECTIONS database connections.
+    """
+
+    if mode == 'production':
+        # Keep the connections of all workers within the database budget
+        if APP_WORKERS * APP_THREADS > APP_DB_CONNECTIONS:
+            raise ValueError(
+                f'{APP_WORKERS} workers with {APP_THREADS} threads each need '
+                f'{APP_WORKERS * APP_THREADS} database connections, more '
+                f'than APP_DB_CONNECTIONS ({APP_DB_CONNECTIONS})'
+            )
+
+        # Each worker process creates its own pool, a connection per thread
+        db.set_pool_size(pool_size=APP_THREADS, max_overflow=0)
+
+        # Run the bottle app with multi-process, multi-thread workers
+        run(
+            app=app,
+            server=APP_SERVER,
+            host=APP_HOST,
+            port=APP_PORT,
+            debug=False,
+            reloader=False,
+            workers=APP_WORKERS,
+            threads=APP_THREADS,
+            worker_class='gthread',
+            graceful_timeout=APP_GRACEFUL_TIMEOUT
+        )
+    elif mode == 'development':
+        # Run the bottle service
+        run(
+            app=app,
+            host=APP_HOST,
+            port=APP_PORT,
+            debug=APP_DEBUG,
+            reloader=APP_RELOADER
+        )
+    else:
+        raise ValueError(
+            f'APP_MODE must be "development" or "production", not "{mode}"'
+        )
+
+    return None
+
 
-if __name__ == 'main':
+if __name__ == '__main__':
     main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env pytest
+""" Tests for web/assets.py. """
+
+# Imports - Python Standard Library
+from pathlib import Path
+import gzip
+
+# Imports - Third-Party
+
+# Imports - Local
+from app.web import assets
+
+# Constants
+CSS = b'body { color: black; }\n' * 100
+
+
+# Test functions
+def test_build(
+    tmp_path: Path
+) -> None:
+    """ Test the build of fingerprinted and precompressed assets.
+
+        Args:
+            tmp_path (pathlib.Path):
+                pytest temporary directory, used as the static directory.
+
+        Returns:
+            None.
+    """
+
+    (tmp_path / 'css').mkdir()
+    (tmp_path / 'css' / 'style.css').write_bytes(CSS)
+
+    manifest = assets.build(static_path=tmp_path)
+    build_name = manifest['css/style.css']
+
+    assert build_name == f"build/{assets.fingerprint('css/style.css', CSS)}"
+    assert (tmp_path / build_name).read_bytes() == CSS
+    assert gzip.decompress(
+        (tmp_path / f'{build_name}.gz').read_bytes()
+    ) == CSS
+    assert assets.load_manifest(static_path=tmp_path) == manifest
+
+    # A rebuild does not fingerprint the built files again
+    assert assets.build(static_path=tmp_path) == manifest
+
+    # New content gets a new name
+    (tmp_path / 'css' / 'style.css').write_bytes(CSS + CSS)
+
+    assert assets.build(static_path=tmp_path)['css/style.css'] != build_name
+    assert not (tmp_path / build_name).exists()
+
+    return None
+
+
+def test_compress() -> None:
+    """ Test whole and streamed gzip compression.
+
+        Args:
+            None.
+
+        Returns:
+            None.
+    """
+
+    assert gzip.decompress(assets.compress(CSS, encoding='gzip')) == CSS
+
+    chunks = list(assets.compress_stream(chunks=iter([CSS, CSS])))
+
+    # Every chunk is flushed, and the stream is one gzip member
+    assert len(chunks) == 3
+    assert gzip.decompress(b''.join(chunks)) == CSS + CSS
+
+    return None
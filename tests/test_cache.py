@@ -0,0 +1,123 @@
+#!/usr/bin/env pytest
+""" Tests for db/cache.py. """
+
+# Imports - Python Standard Library
+from typing import List
+
+# Imports - Third-Party
+import sqlalchemy
+
+# Imports - Local
+from app.db.cache import QueryCache
+from app.db.db import add_hashtags, get_hashtags
+from app.db.db_models import BASE
+
+# Constants
+CACHE_TEST_SIZE = 2
+
+
+# Test functions
+def test_query_cache_lru() -> None:
+    """ Test QueryCache hits, misses, and least recently used eviction.
+
+        Args:
+            None.
+
+        Returns:
+            None.
+    """
+
+    calls = []
+
+    def query(name: str, session: object = None) -> List[str]:
+        calls.append(name)
+        return [name]
+
+    query_cache = QueryCache(get_version=lambda: 1, maxsize=CACHE_TEST_SIZE)
+    cached_query = query_cache.cached(function=query)
+
+    # The session is not part of the key, so every session shares a result
+    assert cached_query(name='one', session='first') == ['one']
+    assert cached_query(name='one', session='second') == ['one']
+    assert calls == ['one']
+
+    # Filling the cache evicts the least recently used result
+    cached_query(name='two')
+    cached_query(name='one')
+    cached_query(name='three')
+    cached_query(name='one')
+    cached_query(name='two')
+
+    assert calls == ['one', 'two', 'three', 'two']
+    assert query_cache.hits == 3
+    assert query_cache.misses == 4
+
+    return None
+
+
+def test_query_cache_version() -> None:
+    """ Test QueryCache results are refreshed when the version changes.
+
+        Args:
+            None.
+
+        Returns:
+            None.
+    """
+
+    versions = [1]
+    results = iter(range(10))
+
+    query_cache = QueryCache(get_version=lambda: versions[0], version_ttl=0)
+    cached_query = query_cache.cached(function=lambda: next(results))
+
+    assert cached_query() == cached_query() == 0
+
+    # A new dataset version invalidates every cached result
+    versions[0] = 2
+
+    assert cached_query() == cached_query() == 1
+
+    # By default, a new version is seen by the next lookup
+    query_cache = QueryCache(get_version=lambda: versions[0])
+    cached_query = query_cache.cached(function=lambda: next(results))
+
+    assert cached_query() == 2
+
+    versions[0] = 3
+
+    assert cached_query() == 3
+
+    return None
+
+
+def test_query_cache_detach() -> None:
+    """ Test cached ORM instances outlive the session that loaded them.
+
+        Args:
+            None.
+
+        Returns:
+            None.
+    """
+
+    engine = sqlalchemy.create_engine('sqlite://')
+    BASE.metadata.create_all(engine)
+    session = sqlalchemy.orm.Session(bind=engine)
+    add_hashtags(hashtags={'cloud': 2, 'wwt': 1}, session=session)
+
+    query_cache = QueryCache(get_version=lambda: 1)
+    cached_get_hashtags = query_cache.cached(function=get_hashtags)
+    hashtags = cached_get_hashtags(session=session)
+
+    # A commit would expire instances that are still in the session
+    session.commit()
+    session.close()
+
+    assert cached_get_hashtags(session=session) is hashtags
+    assert [(tag.name, tag.count) for tag in hashtags] == [
+        ('cloud', 2),
+        ('wwt', 1)
+    ]
+
+    return None
@@ -0,0 +1,159 @@
+#!/usr/bin/env pytest
+""" Tests for db/commands.py. """
+
+# Imports - Python Standard Library
+from unittest.mock import MagicMock, patch
+
+# Imports - Third-Party
+
+# Imports - Local
+from app.db import commands, db
+
+
+# Test functions
+@patch.object(
+    target=db,
+    attribute='bump_dataset_version'
+)
+@patch.object(
+    target=db,
+    attribute='backfill_tweet_hashtags',
+    return_value=3
+)
+def test_backfill_hashtags(
+    mock_backfill: MagicMock,
+    mock_bump: MagicMock,
+    capsys
+) -> None:
+    """ Test the backfill-hashtags command.
+
+        Args:
+            mock_backfill (unittest.mock.MagicMock):
+                Mock of the db.backfill_tweet_hashtags function.
+
+            mock_bump (unittest.mock.MagicMock):
+                Mock of the db.bump_dataset_version function.
+
+            capsys (pytest.CaptureFixture):
+                pytest fixture to capture printed output.
+
+        Returns:
+            None.
+    """
+
+    commands.main(argv=['backfill-hashtags', '--chunk-size', '100'])
+
+    assert mock_backfill.call_args.kwargs['chunk_size'] == 100
+    assert mock_bump.call_count == 1
+    assert 'Backfilled hashtags for 3 tweets' in capsys.readouterr().out
+
+    return None
+
+
+@patch.object(
+    target=db,
+    attribute='backfill_screen_names',
+    return_value=5
+)
+def test_backfill_screen_names(
+    mock_backfill: MagicMock,
+    capsys
+) -> None:
+    """ Test the backfill-screen-names command.
+
+        Args:
+            mock_backfill (unittest.mock.MagicMock):
+                Mock of the db.backfill_screen_names function.
+
+            capsys (pytest.CaptureFixture):
+                pytest fixture to capture printed output.
+
+        Returns:
+            None.
+    """
+
+    commands.main(argv=['backfill-screen-names', 'wwt_inc'])
+
+    assert mock_backfill.call_args.kwargs['screen_name'] == 'wwt_inc'
+    assert 'Set the account of 5 tweets to wwt_inc' in (
+        capsys.readouterr().out
+    )
+
+    return None
+
+
+@patch.object(
+    target=db,
+    attribute='bump_dataset_version'
+)
+@patch.object(
+    target=db,
+    attribute='rebuild_hashtag_aggregates'
+)
+def test_rebuild_aggregates(
+    mock_rebuild: MagicMock,
+    mock_bump: MagicMock,
+    capsys
+) -> None:
+    """ Test the rebuild-aggregates command.
+
+        Args:
+            mock_rebuild (unittest.mock.MagicMock):
+                Mock of the db.rebuild_hashtag_aggregates function.
+
+            mock_bump (unittest.mock.MagicMock):
+                Mock of the db.bump_dataset_version function.
+
+            capsys (pytest.CaptureFixture):
+                pytest fixture to capture printed output.
+
+        Returns:
+            None.
+    """
+
+    commands.main(argv=['rebuild-aggregates'])
+
+    assert mock_rebuild.call_count == 1
+    assert mock_bump.call_count == 1
+    assert 'Rebuilt hashtag aggregates' in capsys.readouterr().out
+
+    return None
+
+
+@patch.object(
+    target=db,
+    attribute='bump_dataset_version'
+)
+@patch.object(
+    target=db,
+    attribute='recount_hashtags',
+    return_value=5
+)
+def test_recount_hashtags(
+    mock_recount: MagicMock,
+    mock_bump: MagicMock,
+    capsys
+) -> None:
+    """ Test the recount-hashtags command.
+
+        Args:
+            mock_recount (unittest.mock.MagicMock):
+                Mock of the db.recount_hashtags function.
+
+            mock_bump (unittest.mock.MagicMock):
+                Mock of the db.bump_dataset_version function.
+
+            capsys (pytest.CaptureFixture):
+                pytest fixture to capture printed output.
+
+        Returns:
+            None.
+    """
+
+    commands.main(argv=['recount-hashtags'])
+
+    assert mock_recount.call_count == 1
+    assert mock_bump.call_count == 1
+    assert 'Recounted 5 hashtags' in capsys.readouterr().out
+
+    return None
@@ -3,18 +3,30 @@
 
 # Imports - Python Standard Library
 from collections import namedtuple
-from typing import Callable, List
+from datetime import datetime, timedelta
+from threading import Thread
+from typing import Callable, Iterator, List
 from unittest.mock import MagicMock, patch
 
 # Imports - Third-Party
-from pytest import fixture
+from pytest import fixture, raises
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Query
 import sqlalchemy
 
 # Imports - Local
+from app.db import db
 from app.db.db import (
     commit_session, truncate_tables, get_hashtags,
-    add_hashtags, get_tweets, add_tweets
+    add_hashtags, get_latest_tweet_id, get_since_id, record_since_id,
+    get_tweets, add_tweets, backfill_tweet_hashtags, bulk_insert,
+    decode_cursor, search_tweets, stream_tweet_text, stream_tweets,
+    create_staging_tables, swap_staging_tables, bump_dataset_version,
+    get_dataset_version, get_hashtag_days, get_hashtag_engagement,
+    get_top_tweets, rebuild_hashtag_aggregates, recount_hashtags,
+    backfill_screen_names, upgrade_schema
 )
+from app.db.db_models import BASE, Hashtag, HashtagEngagement, TweetData
 
 # namedtuple objects
 NewTweet = namedtuple(
@@ -29,15 +41,36 @@ NewTweet = namedtuple(
 )
 
 # Constants
+BULK_TEST_CHUNK_SIZE = 2
+DB_TEST_DIALECT = namedtuple('DialectMock', ['name', 'driver'])(
+    name='sqlite',
+    driver='pysqlite'
+)
 DB_TEST_SESSION_NAME = 'postgresql'
 DB_TEST_SESSION_BINDING = 'postgresql://root:***@db:5432/ww_tweeter_test'
 GET_DB_DATA_RESPONSE = [1, 'test_data', 10]
+GET_DB_SCALAR_RESPONSE = 1484248219051827202
 NEW_HASHTAGS = {
     'hashtag_1': 10,
     'hashtag_2': 20,
     'hashtag_3': 30,
 }
 GET_TWEETS_SEARCH_STRING = 'Hashtag'
+GET_TWEETS_SEARCH_TAG = '#Hashtag'
+SEARCH_TWEETS = [
+    NewTweet(
+        id=str(index),
+        text=text,
+        created_at=None,
+        favorite_count=0,
+        retweet_count=0
+    )
+    for index, text in enumerate([
+        'Cloud security for everyone #cloud',
+        'Securing the network edge',
+        'Cloud, cloud, and more "cloud" OR (edge)'
+    ], start=1)
+]
 NEW_TWEETS = [
     NewTweet(
         id='Tweet #1',
@@ -110,6 +143,23 @@ class QueryMock:
 
         return None
 
+    def execution_options(
+        self,
+        **kwargs
+    ) -> 'QueryMock':
+        """ Mock of the execution_options method.
+
+            Args:
+                kwargs:
+                    Mock execution options, such as stream_results.
+
+            Returns:
+                self (QueryMock):
+                    The same QueryMock object.
+        """
+
+        return self
+
     def filter(
         self,
         criterion
@@ -133,16 +183,57 @@ class QueryMock:
 
         return filtered_query
 
+    def join(
+        self,
+        target,
+        onclause
+    ) -> 'QueryMock':
+        """ Mock of the join method.
+
+            Args:
+                target:
+                    Mock database table class to join.
+
+                onclause:
+                    Mock join condition.
+
+            Returns:
+                joined_query (QueryMock):
+                    Mock joined query.
+        """
+
+        joined_query = QueryMock(
+            instance=self.instance)
+
+        return joined_query
+
+    def limit(
+        self,
+        count: int
+    ) -> 'QueryMock':
+        """ Mock of the limit method.
+
+            Args:
+                count (int):
+                    Mock maximum number of rows.
+
+            Returns:
+                self (QueryMock):
+                    The same QueryMock object.
+        """
+
+        return self
+
     def order_by(
         self,
-        criterion
+        *criteria
     ) -> List:
         """ Mock of the order_by method.
 
             Args:
-                criterion:
-                    Mock criterion to order results by, in the form of
-                    a database class attribute (Hashtag.name.asc()).
+                criteria:
+                    Mock criteria to order results by, in the form of
+                    database class attributes (Hashtag.name.asc()).
 
             Returns:
                 ordered_query (List):
@@ -155,6 +246,39 @@ class QueryMock:
 
         return ordered_query
 
+    def yield_per(
+        self,
+        count: int
+    ) -> Iterator:
+        """ Mock of the yield_per method.
+
+            Args:
+                count (int):
+                    Mock number of rows to fetch at a time.
+
+            Returns:
+                rows (Iterator):
+                    Iterator of single column rows from the query
+                    result.
+        """
+
+        rows = iter([(item,) for item in self.query_result])
+
+        return rows
+
+    def scalar(self) -> int:
+        """ Mock of the scalar method.
+
+            Args:
+                None.
+
+            Returns:
+                GET_DB_SCALAR_RESPONSE (int):
+                    Mock of the first column of the first query result.
+        """
+
+        return GET_DB_SCALAR_RESPONSE
+
 
 # Define a SessionMock class for the test methods
 class SessionMock(QueryMock):
@@ -166,6 +290,10 @@ class SessionMock(QueryMock):
         # Initialize an empty list for database transactions
         self.transactions = []
 
+        # Initialize empty lists of executed statements and rows
+        self.statements = []
+        self.executed = []
+
     def add(
         self,
         instance: str
@@ -200,6 +328,31 @@ class SessionMock(QueryMock):
 
         return None
 
+    def execute(
+        self,
+        statement,
+        params: List = None
+    ) -> None:
+        """ Mock of the execute method.
+
+            Args:
+                statement:
+                    Mock SQL statement, such as insert(TweetData).
+
+                params (List, optional):
+                    Mock list of row dictionaries for executemany.
+
+            Returns:
+                None.
+        """
+
+        # Add a mock transaction, and record the executed rows
+        self.transactions.append(statement)
+        self.statements.append(statement)
+        self.executed.append(params)
+
+        return None
+
     def get_bind(self) -> Callable:
         """ get_bind method mock.
 
@@ -213,6 +366,7 @@ class SessionMock(QueryMock):
 
         return self.get_bind
 
+    get_bind.dialect = DB_TEST_DIALECT
     get_bind.name = DB_TEST_SESSION_NAME
     get_bind.url = SessionBindURLMock()
 
@@ -240,7 +394,8 @@ class SessionMock(QueryMock):
 
     def query(
         self,
-        instance: str
+        instance: str,
+        *columns
     ) -> QueryMock:
         """ Mock of the query method.
 
@@ -248,6 +403,9 @@ class SessionMock(QueryMock):
                 instance (str):
                     Database table class definition.
 
+                columns:
+                    Additional mock columns to query.
+
             Return:
                 query_mock (class):
                     Placeholder/mock for database table class.
@@ -345,6 +503,76 @@ def test_create_session(
     return None
 
 
+@patch.object(
+    target=db,
+    attribute='DB_TEST_URL',
+    new='postgresql://root:***@db:5432/ww_tweeter_test'
+)
+@patch.object(
+    target=db,
+    attribute='_engine',
+    new=None
+)
+@patch.object(
+    target=db,
+    attribute='create_engine',
+    side_effect=lambda url, **kwargs: sqlalchemy.create_engine('sqlite://')
+)
+def test_get_engine(
+    mock_create_engine: MagicMock
+) -> None:
+    """ Test the get_engine function creates one pooled engine lazily.
+
+        Args:
+            mock_create_engine (unittest.mock.MagicMock):
+                Mock of sqlalchemy.create_engine, which returns an
+                in-memory SQLite engine.
+
+        Returns:
+            None.
+    """
+
+    # Processes can set their share of the connections before first use
+    with patch.object(target=db, attribute='DB_POOL_SIZE'), \
+            patch.object(target=db, attribute='DB_MAX_OVERFLOW'):
+        db.set_pool_size(pool_size=4)
+        engine = db.get_engine()
+
+    # The engine is created once, with the pool options
+    assert db.get_engine() is engine
+    assert mock_create_engine.call_count == 1
+    assert mock_create_engine.call_args.kwargs == {
+        'echo': db.DB_LOGGING,
+        'pool_pre_ping': db.DB_POOL_PRE_PING,
+        'pool_size': 4,
+        'max_overflow': 0
+    }
+
+    # The pool size of an existing engine can not change
+    with raises(RuntimeError):
+        db.set_pool_size(pool_size=8)
+    assert 'tweets' in sqlalchemy.inspect(engine).get_table_names()
+
+    # Each thread has its own session, until it is removed
+    sessions = []
+    thread = Thread(target=lambda: sessions.append(db.session()))
+    thread.start()
+    thread.join()
+
+    assert db.session() is db.session()
+    assert db.session() is not sessions[0]
+    assert db.session.get_bind() is engine
+
+    session = db.session()
+    db.remove_session()
+    assert db.session() is not session
+
+    db.remove_session()
+    engine.dispose()
+
+    return None
+
+
 @patch.object(
     target=sqlalchemy.orm,
     attribute='Session'
@@ -444,6 +672,29 @@ def test_add_hashtags(
     return None
 
 
+def test_get_latest_tweet_id(
+    session_mock: SessionMock
+) -> None:
+    """ Test the get_latest_tweet_id function.
+
+        Args:
+            session_mock (SessionMock):
+                Mock sqlalchemy.orm.Session object.
+
+        Returns:
+            None.
+    """
+
+    # Call get_latest_tweet_id and pass the mock Session object
+    latest_tweet_id = get_latest_tweet_id(
+        session=session_mock
+    )
+
+    assert latest_tweet_id == str(GET_DB_SCALAR_RESPONSE)
+
+    return None
+
+
 @patch.object(
     target=sqlalchemy.orm,
     attribute='Session'
@@ -473,15 +724,29 @@ def test_get_tweets(
 
     assert tweets == GET_DB_DATA_RESPONSE
 
+    # Call get_tweets with a hashtag, filtered through tweet_hashtags
+    tweets = get_tweets(
+        search_tag=GET_TWEETS_SEARCH_TAG,
+        session=session_mock
+    )
+
+    assert tweets == GET_DB_DATA_RESPONSE
+
     return None
 
 
+@patch.object(
+    target=QueryMock,
+    attribute='all',
+    return_value=[]
+)
 @patch.object(
     target=sqlalchemy.orm,
     attribute='Session'
 )
 def test_add_tweets(
     mock_session: MagicMock,
+    mock_all: MagicMock,
     session_mock: SessionMock
 ) -> None:
     """ Test the add_tweets function.
@@ -490,6 +755,10 @@ def test_add_tweets(
             mock_session (unittest.mock.MagicMock):
                 unittest MagicMock object.
 
+            mock_all (unittest.mock.MagicMock):
+                Mock of the QueryMock.all method, with no stored
+                tweets.
+
             session_mock (SessionMock):
                 Mock sqlalchemy.orm.Session object.
 
@@ -506,3 +775,918 @@ def test_add_tweets(
     assert session_in_transaction is False
 
     return None
+
+
+def test_bulk_insert(
+    session_mock: SessionMock
+) -> None:
+    """ Test the bulk_insert function with a Core insert executemany.
+
+        Args:
+            session_mock (SessionMock):
+                Mock sqlalchemy.orm.Session object.
+
+        Returns:
+            None.
+    """
+
+    rows = [{'name': name, 'count': count} for name, count in
+            NEW_HASHTAGS.items()]
+
+    # Call bulk_insert with a generator, and pass the mock Session object
+    session_in_transaction = bulk_insert(
+        model=Hashtag,
+        rows=iter(rows),
+        chunk_size=BULK_TEST_CHUNK_SIZE,
+        session=session_mock
+    )
+
+    # Rows are written in chunks, each with one execute call
+    assert session_in_transaction is False
+    assert session_mock.executed == [rows[:2], rows[2:]]
+
+    return None
+
+
+def test_bulk_insert_upsert(
+    session_mock: SessionMock
+) -> None:
+    """ Test the bulk_insert function with an upsert on tweet_id.
+
+        Args:
+            session_mock (SessionMock):
+                Mock sqlalchemy.orm.Session object.
+
+        Returns:
+            None.
+    """
+
+    rows = [
+        {'tweet_id': '1', 'likes': 1, 'retweets': 1},
+        {'tweet_id': '2', 'likes': 1, 'retweets': 1},
+        {'tweet_id': '1', 'likes': 5, 'retweets': 2}
+    ]
+
+    # Call bulk_insert and pass the mock Session object
+    session_in_transaction = bulk_insert(
+        model=TweetData,
+        rows=rows,
+        conflict_columns=('tweet_id',),
+        update_columns=('likes', 'retweets'),
+        session=session_mock
+    )
+
+    # Duplicate tweets in a chunk are written once, with the newest counts
+    assert session_in_transaction is False
+    assert session_mock.executed == [[rows[2], rows[1]]]
+
+    # Existing tweets have their likes and retweets updated
+    statement = str(session_mock.statements[0].compile(
+        dialect=sqlalchemy.dialects.sqlite.dialect()
+    ))
+    assert 'ON CONFLICT (tweet_id) DO UPDATE SET likes = excluded.likes, ' \
+        'retweets = excluded.retweets' in statement
+
+    return None
+
+
+def test_bulk_insert_copy(
+    session_mock: SessionMock
+) -> None:
+    """ Test the bulk_insert function with PostgreSQL COPY FROM STDIN.
+
+        Args:
+            session_mock (SessionMock):
+                Mock sqlalchemy.orm.Session object.
+
+        Returns:
+            None.
+    """
+
+    copied = []
+    connection = MagicMock()
+    cursor = connection.connection.cursor.return_value
+    cursor.copy_expert.side_effect = (
+        lambda sql, file: copied.append((sql, file.read()))
+    )
+    rows = [
+        {'tweet_id': '1', 'tweet_text': 'Say "hi", #brand',
+         'screen_name': None},
+        {'tweet_id': '2', 'tweet_text': '', 'screen_name': 'wwt_inc'}
+    ]
+
+    # Bind the mock Session object to a psycopg2 dialect
+    with patch.object(
+        target=SessionMock.get_bind,
+        attribute='dialect',
+        new=DB_TEST_DIALECT._replace(name='postgresql', driver='psycopg2')
+    ), patch.object(
+        target=SessionMock,
+        attribute='connection',
+        create=True,
+        return_value=connection
+    ):
+        session_in_transaction = bulk_insert(
+            model=TweetData,
+            rows=rows,
+            session=session_mock
+        )
+
+    # NULL is an unquoted empty field, and empty strings are quoted
+    assert session_in_transaction is False
+    assert copied == [(
+        'COPY tweets (tweet_id, tweet_text, screen_name) '
+        'FROM STDIN WITH (FORMAT csv)',
+        '"1","Say ""hi"", #brand",\n"2","","wwt_inc"\n'
+    )]
+    assert cursor.close.called
+
+    return None
+
+
+def test_bulk_insert_copy_transaction(
+    session_mock: SessionMock
+) -> None:
+    """ Test several COPY upserts in one transaction.
+
+        Args:
+            session_mock (SessionMock):
+                Mock sqlalchemy.orm.Session object.
+
+        Returns:
+            None.
+    """
+
+    connection = MagicMock()
+    cursor = connection.connection.cursor.return_value
+    statements = []
+    cursor.execute.side_effect = statements.append
+    cursor.copy_expert.side_effect = (
+        lambda sql, file: statements.append(sql)
+    )
+
+    with patch.object(
+        target=SessionMock.get_bind,
+        attribute='dialect',
+        new=DB_TEST_DIALECT._replace(name='postgresql', driver='psycopg2')
+    ), patch.object(
+        target=SessionMock,
+        attribute='connection',
+        create=True,
+        return_value=connection
+    ), patch.object(
+        target=SessionMock,
+        attribute='commit'
+    ) as mock_commit:
+        for model, rows, conflict_columns in (
+            (TweetData, [{'tweet_id': '1'}, {'tweet_id': '2'}], ['tweet_id']),
+            (Hashtag, [{'name': 'wwt', 'count': 1}], ['name'])
+        ):
+            bulk_insert(
+                model=model,
+                rows=rows,
+                chunk_size=1,
+                conflict_columns=conflict_columns,
+                commit=False,
+                session=session_mock
+            )
+
+    # Each staging table is dropped before the next one is created
+    operations = [statement.split(' ')[0] for statement in statements]
+
+    assert operations == ['CREATE', 'COPY', 'INSERT', 'DROP'] * 3
+    assert not mock_commit.called
+
+    return None
+
+
+@patch.object(
+    target=QueryMock,
+    attribute='all',
+    side_effect=[
+        [(1, '10', 'Tweet #Brand #AIOps'), (2, '20', None)],
+        [(3, '30', '#brand')],
+        []
+    ]
+)
+def test_backfill_tweet_hashtags(
+    mock_all: MagicMock,
+    session_mock: SessionMock
+) -> None:
+    """ Test the backfill_tweet_hashtags function.
+
+        Args:
+            mock_all (unittest.mock.MagicMock):
+                Mock of the QueryMock.all method, returning chunks of
+                (id, tweet_id, tweet_text) rows.
+
+            session_mock (SessionMock):
+                Mock sqlalchemy.orm.Session object.
+
+        Returns:
+            None.
+    """
+
+    # Call backfill_tweet_hashtags and pass the mock Session object
+    tweet_count = backfill_tweet_hashtags(
+        chunk_size=2,
+        session=session_mock
+    )
+
+    assert tweet_count == 3
+    assert session_mock.executed == [
+        [
+            {'tweet_id': '10', 'hashtag': 'brand'},
+            {'tweet_id': '10', 'hashtag': 'aiops'}
+        ],
+        [{'tweet_id': '30', 'hashtag': 'brand'}]
+    ]
+
+    return None
+
+
+def test_get_tweets_pages() -> None:
+    """ Test the get_tweets function with keyset pagination.
+
+        Args:
+            None.
+
+        Returns:
+            None.
+    """
+
+    # Create an in-memory SQLite database, to page through real rows
+    engine = sqlalchemy.create_engine('sqlite://')
+    BASE.metadata.create_all(engine)
+    session = sqlalchemy.orm.Session(bind=engine)
+
+    # Add tweets where several share a creation time, to test the id order
+    created = datetime(2022, 3, 1)
+    add_tweets(
+        tweets=[
+            NewTweet(
+                id=str(index),
+                text=f'Tweet {index}',
+                created_at=created + timedelta(hours=index // 2),
+                favorite_count=0,
+                retweet_count=0
+            )
+            for index in range(7)
+        ] + [
+            # A tweet without a creation time is left out of pages
+            NewTweet(
+                id='7',
+                text='Tweet 7',
+                created_at=None,
+                favorite_count=0,
+                retweet_count=0
+            )
+        ],
+        session=session
+    )
+
+    def page_ids(page: List) -> List[str]:
+        return [tweet.tweet_id for tweet in page]
+
+    # Page forward from the newest tweet to the oldest
+    first = get_tweets(limit=3, session=session)
+    second = get_tweets(limit=3, cursor=first.next_cursor, session=session)
+    third = get_tweets(limit=3, cursor=second.next_cursor, session=session)
+
+    assert page_ids(first) == ['6', '5', '4']
+    assert page_ids(second) == ['3', '2', '1']
+    assert page_ids(third) == ['0']
+    assert first.prev_cursor is None
+    assert third.next_cursor is None
+
+    # Page back to the newest tweet
+    back = get_tweets(limit=3, cursor=third.prev_cursor, session=session)
+    newest = get_tweets(limit=3, cursor=back.prev_cursor, session=session)
+
+    assert page_ids(back) == page_ids(second)
+    assert page_ids(newest) == page_ids(first)
+    assert newest.prev_cursor is None
+    assert newest.next_cursor == first.next_cursor
+
+    # A page of every tweet has no tweet without a creation time
+    assert page_ids(get_tweets(limit=10, session=session)) == [
+        '6', '5', '4', '3', '2', '1', '0'
+    ]
+
+    # Cursors are opaque, and invalid cursors are rejected
+    assert decode_cursor(cursor=first.next_cursor)[2] == 'next'
+    with raises(ValueError):
+        get_tweets(limit=3, cursor='not-a-cursor', session=session)
+
+    session.close()
+
+    return None
+
+
+def test_search_tweets_sqlite() -> None:
+    """ Test the search_tweets function with an SQLite FTS5 index.
+
+        Args:
+            None.
+
+        Returns:
+            None.
+    """
+
+    # Create an in-memory SQLite database, since FTS5 cannot be mocked
+    engine = sqlalchemy.create_engine('sqlite://')
+    BASE.metadata.create_all(engine)
+    session = sqlalchemy.orm.Session(bind=engine)
+
+    add_tweets(tweets=SEARCH_TWEETS, session=session)
+
+    def search(query: str, **kwargs) -> List[str]:
+        tweets = search_tweets(query=query, session=session, **kwargs)
+        return [tweet.tweet_id for tweet in tweets]
+
+    # Results are ranked, stemmed, paged, and safe from FTS5 syntax
+    assert search('cloud') == ['3', '1']
+    assert search('security') == ['2', '1']
+    assert search('cloud security') == ['1']
+    assert search('secu', fuzzy=False) == []
+    assert search('secu') == ['2', '1']
+    assert search('"cloud" OR (') == ['3']
+    assert search('cloud', page=2, page_size=1) == ['1']
+    assert search('') == []
+
+    session.close()
+
+    return None
+
+
+def test_search_tweets_postgresql() -> None:
+    """ Test the search_tweets function query on PostgreSQL.
+
+        Args:
+            None.
+
+        Returns:
+            None.
+    """
+
+    queries = []
+    session = sqlalchemy.orm.Session()
+    bind = MagicMock()
+    bind.dialect.name = 'postgresql'
+
+    # Capture the query instead of running it
+    with patch.object(
+        target=session,
+        attribute='get_bind',
+        return_value=bind
+    ), patch.object(
+        target=Query,
+        attribute='all',
+        autospec=True,
+        side_effect=lambda query: queries.append(query) or []
+    ):
+        tweets = search_tweets(query='cloud', page=3, session=session)
+
+    compiled = queries[0].statement.compile(dialect=postgresql.dialect())
+    sql = str(compiled)
+
+    # The query matches the GIN index expressions, and pages the results
+    assert tweets == []
+    assert "to_tsvector('english'::regconfig, COALESCE(tweet_text, '')) " \
+        "@@ websearch_to_tsquery('english'::regconfig" in sql
+    assert '<%% tweets.tweet_text' in sql
+    assert 'ORDER BY ts_rank_cd(' in sql
+    assert {20, 40} <= set(compiled.params.values())
+
+    return None
+
+
+def test_recount_hashtags_sqlite() -> None:
+    """ Test the recount_hashtags function with the streamed Python count.
+
+        Args:
+            None.
+
+        Returns:
+            None.
+    """
+
+    engine = sqlalchemy.create_engine('sqlite://')
+    BASE.metadata.create_all(engine)
+    session = sqlalchemy.orm.Session(bind=engine)
+
+    add_tweets(tweets=SEARCH_TWEETS, session=session)
+    add_tweets(
+        tweets=[NewTweet('4', '#Cloud #edge #cloud', None, 0, 0)],
+        session=session
+    )
+    add_hashtags(hashtags={'stale': 1}, session=session)
+
+    # Every occurrence is counted, as tweeter.hashtag_counter counts them
+    hashtag_count = recount_hashtags(session=session)
+    hashtags = [
+        (hashtag.name, hashtag.count)
+        for hashtag in session.query(Hashtag).order_by(Hashtag.id)
+    ]
+
+    assert hashtag_count == 2
+    assert hashtags == [('cloud', 3), ('edge', 1)]
+
+    # A counter function, such as parallel_hashtag_counter, can be used
+    recount_hashtags(
+        counter=lambda tweets: {'counted': len(list(tweets))},
+        session=session
+    )
+
+    assert [hashtag.name for hashtag in get_hashtags(session=session)] == [
+        'counted'
+    ]
+
+    session.close()
+
+    return None
+
+
+def test_recount_hashtags_postgresql() -> None:
+    """ Test the recount_hashtags function query on PostgreSQL.
+
+        Args:
+            None.
+
+        Returns:
+            None.
+    """
+
+    session = MagicMock()
+    session.get_bind.return_value.dialect.name = 'postgresql'
+
+    recount_hashtags(session=session)
+
+    # The hashtags table is truncated, then recounted in the database
+    statements = [
+        str(call.args[0].compile(dialect=postgresql.dialect()))
+        for call in session.execute.call_args_list
+    ]
+
+    assert statements[0] == 'TRUNCATE TABLE hashtags'
+    assert 'INSERT INTO hashtags (name, count) SELECT' in statements[1]
+    assert '(regexp_matches(lower(tweets.tweet_text)' in statements[1]
+    assert 'GROUP BY anon_1.name' in statements[1]
+    assert session.commit.call_count == 1
+
+    return None
+
+
+def test_hashtag_aggregates() -> None:
+    """ Test the hashtag aggregate tables are maintained by add_tweets.
+
+        Args:
+            None.
+
+        Returns:
+            None.
+    """
+
+    engine = sqlalchemy.create_engine('sqlite://')
+    BASE.metadata.create_all(engine)
+    session = sqlalchemy.orm.Session(bind=engine)
+
+    tweets = [
+        NewTweet(
+            id=str(index),
+            text=f'Tweet {index} #cloud' + (' #wwt' if index % 2 else ''),
+            created_at=datetime(2022, 3, 1) + timedelta(hours=index * 12),
+            favorite_count=index,
+            retweet_count=1
+        )
+        for index in range(1, 13)
+    ]
+
+    # Load overlapping batches, then a batch with more likes
+    add_tweets(tweets=tweets[:8], session=session)
+    add_tweets(tweets=tweets[4:], session=session)
+    add_tweets(
+        tweets=[tweet._replace(favorite_count=100) for tweet in tweets[:1]],
+        session=session
+    )
+
+    def engagement() -> List[tuple]:
+        return [
+            (row.hashtag, row.tweets, row.likes, row.retweets)
+            for row in get_hashtag_engagement(session=session)
+        ]
+
+    # Tweets are counted once, with their latest likes
+    assert engagement() == [('cloud', 12, 177, 12), ('wwt', 6, 135, 6)]
+    assert [
+        (hashtag.name, hashtag.count) for hashtag in get_hashtags(
+            session=session
+        )
+    ] == [('cloud', 12), ('wwt', 6)]
+    assert [(str(row.day), row.count) for row in get_hashtag_days(
+        hashtag='#cloud',
+        session=session
+    )][:2] == [('2022-03-01', 1), ('2022-03-02', 2)]
+
+    # Leaderboards keep the LEADERBOARD_SIZE highest scoring tweets
+    top_tweets = get_top_tweets(hashtag='cloud', session=session)
+
+    assert len(top_tweets) == db.LEADERBOARD_SIZE
+    assert [tweet.tweet_id for tweet in top_tweets[:3]] == ['1', '12', '11']
+
+    # A rebuild from the stored tweets gives the same aggregates
+    aggregates = engagement()
+    rebuild_hashtag_aggregates(session=session)
+
+    assert engagement() == aggregates
+    assert session.query(HashtagEngagement).count() == 2
+
+    session.close()
+
+    return None
+
+
+def test_dataset_version() -> None:
+    """ Test the get_dataset_version and bump_dataset_version functions.
+
+        Args:
+            None.
+
+        Returns:
+            None.
+    """
+
+    engine = sqlalchemy.create_engine('sqlite://')
+    BASE.metadata.create_all(engine)
+    session = sqlalchemy.orm.Session(bind=engine)
+
+    assert get_dataset_version(session=session) == (0, None)
+
+    # The first bump creates the version row, later bumps increment it
+    for _ in range(2):
+        session_in_transaction = bump_dataset_version(session=session)
+
+    version, updated = get_dataset_version(session=session)
+
+    assert session_in_transaction is False
+    assert version == 2
+    assert isinstance(updated, datetime)
+
+    session.close()
+
+    return None
+
+
+def test_swap_staging_tables() -> None:
+    """ Test a dataset refresh with staging tables on SQLite.
+
+        Args:
+            None.
+
+        Returns:
+            None.
+    """
+
+    # Create an in-memory SQLite database, since table renames are DDL
+    engine = sqlalchemy.create_engine('sqlite://')
+    BASE.metadata.create_all(engine)
+    session = sqlalchemy.orm.Session(bind=engine)
+
+    add_tweets(
+        tweets=SEARCH_TWEETS[:1],
+        screen_name='wwt_inc',
+        session=session
+    )
+    add_hashtags(hashtags={'old': 1}, session=session)
+    record_since_id(screen_name='wwt_inc', session=session)
+
+    # Load the new dataset, while the old dataset is still live
+    create_staging_tables(session=session)
+    add_tweets(tweets=SEARCH_TWEETS[1:], staging=True, session=session)
+    add_hashtags(hashtags=NEW_HASHTAGS, staging=True, session=session)
+
+    assert session.query(TweetData).count() == 1
+
+    session_in_transaction = swap_staging_tables(session=session)
+
+    # The new dataset is live, with the live index names and search index
+    tweet_ids = [tweet.tweet_id for tweet in session.query(TweetData)]
+    hashtags = [hashtag.name for hashtag in get_hashtags(session=session)]
+    index_names = sqlalchemy.inspect(engine).get_indexes('tweets')
+
+    assert session_in_transaction is False
+    assert get_dataset_version(session=session)[0] == 1
+    assert tweet_ids == ['2', '3']
+    assert hashtags == list(NEW_HASHTAGS)
+    assert {index['name'] for index in index_names} == {
+        'ix_tweets_created_id',
+        'ix_tweets_tweet_id'
+    }
+    assert [tweet.tweet_id for tweet in search_tweets(
+        query='cloud',
+        session=session
+    )] == ['3']
+
+    # The high-water marks of the replaced tweets are removed
+    assert get_since_id(screen_name='wwt_inc', session=session) is None
+
+    session.close()
+
+    return None
+
+
+def test_stream_tweet_text(
+    session_mock: SessionMock
+) -> None:
+    """ Test the stream_tweet_text function.
+
+        Args:
+            session_mock (SessionMock):
+                Mock sqlalchemy.orm.Session object.
+
+        Returns:
+            None.
+    """
+
+    # Call stream_tweet_text and pass the mock Session object
+    tweet_text = stream_tweet_text(
+        chunk_size=2,
+        session=session_mock
+    )
+
+    assert list(tweet_text) == GET_DB_DATA_RESPONSE
+
+    return None
+
+
+def test_stream_tweets() -> None:
+    """ Test the stream_tweets function with field selection and filters.
+
+        Args:
+            None.
+
+        Returns:
+            None.
+    """
+
+    engine = sqlalchemy.create_engine('sqlite://')
+    BASE.metadata.create_all(engine)
+    session = sqlalchemy.orm.Session(bind=engine)
+
+    add_tweets(
+        tweets=[
+            NewTweet(
+                id=str(index),
+                text=f'Tweet {index} #wwt' if index % 2 else f'Tweet {index}',
+                created_at=datetime(2022, 3, 1) + timedelta(hours=index),
+                favorite_count=index,
+                retweet_count=0
+            )
+            for index in range(5)
+        ],
+        session=session
+    )
+
+    # Tweets are streamed newest first, in chunks
+    tweets = list(stream_tweets(chunk_size=2, session=session))
+
+    assert [tweet['tweet_id'] for tweet in tweets] == ['4', '3', '2', '1', '0']
+    assert tweets[0] == {
+        'tweet_id': '4',
+        'tweet_text': 'Tweet 4',
+        'created': datetime(2022, 3, 1, 4),
+        'likes': 4,
+        'retweets': 0
+    }
+
+    # Only the selected fields of the filtered tweets are read
+    tweets = list(stream_tweets(
+        search_tag='#WWT',
+        fields=['tweet_id', 'likes'],
+        session=session
+    ))
+
+    assert tweets == [
+        {'tweet_id': '3', 'likes': 3},
+        {'tweet_id': '1', 'likes': 1}
+    ]
+
+    with raises(ValueError):
+        list(stream_tweets(fields=['id'], session=session))
+
+    session.close()
+
+    return None
+
+
+def test_add_tweets_lock_order() -> None:
+    """ Test add_tweets writes rows in the order of their unique keys.
+
+        Args:
+            None.
+
+        Returns:
+            None.
+    """
+
+    engine = sqlalchemy.create_engine('sqlite://')
+    BASE.metadata.create_all(engine)
+    session = sqlalchemy.orm.Session(bind=engine)
+    written = {}
+
+    def record_rows(model, rows, conflict_columns=None, **kwargs):
+        rows = list(rows)
+        written[getattr(model, 'name', None)] = [
+            tuple(str(row[column]) for column in conflict_columns)
+            for row in rows
+        ]
+        return bulk_insert(
+            model=model,
+            rows=rows,
+            conflict_columns=conflict_columns,
+            **kwargs
+        )
+
+    with patch.object(target=db, attribute='bulk_insert', new=record_rows):
+        add_tweets(
+            tweets=[
+                NewTweet(
+                    id=str(tweet_id),
+                    text='#zeta #alpha #mid',
+                    created_at=datetime(2022, 3, tweet_id),
+                    favorite_count=tweet_id,
+                    retweet_count=0
+                )
+                for tweet_id in (3, 1, 2, 1)
+            ],
+            session=session
+        )
+
+    # Concurrent writers lock shared rows in the same order
+    assert set(written) == {
+        'tweets', 'tweet_hashtags', 'hashtags', 'hashtag_days',
+        'hashtag_engagement', 'hashtag_top_tweets'
+    }
+    for keys in written.values():
+        assert keys == sorted(keys)
+
+    assert written['tweets'] == [('1',), ('2',), ('3',)]
+
+    session.close()
+
+    return None
+
+
+def test_upgrade_schema() -> None:
+    """ Test upgrade_schema upgrades a legacy tweets table.
+
+        Args:
+            None.
+
+        Returns:
+            None.
+    """
+
+    engine = sqlalchemy.create_engine(
+        'sqlite://',
+        poolclass=sqlalchemy.pool.StaticPool
+    )
+
+    # Create the tweets table of the first release, without screen_name
+    with engine.begin() as connection:
+        connection.exec_driver_sql(
+            'CREATE TABLE tweets (id INTEGER PRIMARY KEY, '
+            'tweet_id VARCHAR(22), tweet_text VARCHAR(300), '
+            'created DATETIME, likes INTEGER, retweets INTEGER)'
+        )
+        # The first release could store a tweet more than once
+        for likes in (1, 2, 3):
+            connection.exec_driver_sql(
+                "INSERT INTO tweets (tweet_id, tweet_text, likes, retweets) "
+                f"VALUES ('10', 'Old tweet', {likes}, 0)"
+            )
+
+        # Concurrent merges could store a hashtag more than once
+        connection.exec_driver_sql(
+            'CREATE TABLE hashtags (id INTEGER PRIMARY KEY, '
+            'name VARCHAR(40), count INTEGER)'
+        )
+        connection.exec_driver_sql(
+            "INSERT INTO hashtags (name, count) "
+            "VALUES ('cloud', 2), ('wwt', 1), ('cloud', 3)"
+        )
+
+    assert upgrade_schema(engine=engine) == ['tweets.screen_name']
+    assert upgrade_schema(engine=engine) == []
+
+    session = sqlalchemy.orm.Session(bind=engine)
+
+    # Only the newest copy is kept, and tweet_id is unique
+    assert session.query(TweetData.likes).all() == [(3,)]
+    assert any(
+        index['unique']
+        for index in sqlalchemy.inspect(engine).get_indexes('tweets')
+        if index['column_names'] == ['tweet_id']
+    )
+
+    # Hashtag counts are merged, and hashtag names are unique
+    assert [
+        (hashtag.name, hashtag.count)
+        for hashtag in get_hashtags(session=session)
+    ] == [('cloud', 5), ('wwt', 1)]
+    assert any(
+        index['unique']
+        for index in sqlalchemy.inspect(engine).get_indexes('hashtags')
+        if index['column_names'] == ['name']
+    )
+
+    # Legacy tweets have no account, until they are backfilled
+    assert get_latest_tweet_id(screen_name='wwt_inc', session=session) is None
+    assert backfill_screen_names(screen_name='wwt_inc', session=session) == 1
+    assert get_latest_tweet_id(screen_name='wwt_inc', session=session) == '10'
+
+    session.close()
+
+    return None
+
+
+def test_add_tweets_screen_name() -> None:
+    """ Test add_tweets sets the account of stored tweets without one.
+
+        Args:
+            None.
+
+        Returns:
+            None.
+    """
+
+    engine = sqlalchemy.create_engine('sqlite://')
+    BASE.metadata.create_all(engine)
+    session = sqlalchemy.orm.Session(bind=engine)
+    tweets = [
+        NewTweet(
+            id='20',
+            text='Tweet',
+            created_at=datetime(2022, 3, 1),
+            favorite_count=0,
+            retweet_count=0
+        )
+    ]
+
+    add_tweets(tweets=tweets, session=session)
+
+    assert get_latest_tweet_id(screen_name='wwt_inc', session=session) is None
+
+    # Loading the tweet for an account sets its account
+    add_tweets(tweets=tweets, screen_name='wwt_inc', session=session)
+
+    assert get_latest_tweet_id(screen_name='wwt_inc', session=session) == '20'
+
+    # Loading it without an account keeps the account
+    add_tweets(tweets=tweets, session=session)
+
+    assert get_latest_tweet_id(screen_name='wwt_inc', session=session) == '20'
+
+    session.close()
+
+    return None
+
+
+def test_since_id() -> None:
+    """ Test the get_since_id and record_since_id functions.
+
+        Args:
+            None.
+
+        Returns:
+            None.
+    """
+
+    engine = sqlalchemy.create_engine('sqlite://')
+    BASE.metadata.create_all(engine)
+    session = sqlalchemy.orm.Session(bind=engine)
+
+    # No mark is recorded for an account without tweets
+    assert record_since_id(screen_name='wwt_inc', session=session) is None
+    assert get_since_id(screen_name='wwt_inc', session=session) is None
+
+    # The mark is the newest tweet stored when it is recorded
+    add_tweets(tweets=SEARCH_TWEETS, screen_name='wwt_inc', session=session)
+
+    assert get_since_id(screen_name='wwt_inc', session=session) is None
+    assert record_since_id(screen_name='wwt_inc', session=session) == '3'
+
+    add_tweets(
+        tweets=[NewTweet('10', 'Newer tweet', None, 0, 0)],
+        screen_name='wwt_inc',
+        session=session
+    )
+
+    assert get_since_id(screen_name='wwt_inc', session=session) == '3'
+    assert record_since_id(screen_name='wwt_inc', session=session) == '10'
+    assert get_since_id(screen_name='wwt_inc', session=session) == '10'
+    assert get_since_id(screen_name='another', session=session) is None
+
+    session.close()
+
+    return None
@@ -7,7 +7,8 @@
 
 # Imports - Local
 from app.db.db_models import (
-    Hashtag, TweetData
+    DatasetVersion, Hashtag, HashtagDay, HashtagEngagement, HashtagTopTweet,
+    IngestMark, TweetData, TweetHashtag
 )
 
 # Constants
@@ -44,3 +45,99 @@ def test_instantiate_tweet_data() -> None:
     assert tweet_data_instance.__tablename__ == 'tweets'
 
     return None
+
+
+def test_instantiate_tweet_hashtag() -> None:
+    """ Create instance of the TweetHashtag class.
+
+        Args:
+            None.
+
+        Returns:
+            None.
+    """
+
+    tweet_hashtag_instance = TweetHashtag()
+    assert tweet_hashtag_instance.__tablename__ == 'tweet_hashtags'
+
+    return None
+
+
+def test_instantiate_dataset_version() -> None:
+    """ Create instance of the DatasetVersion class.
+
+        Args:
+            None.
+
+        Returns:
+            None.
+    """
+
+    dataset_version_instance = DatasetVersion()
+    assert dataset_version_instance.__tablename__ == 'dataset_version'
+
+    return None
+
+
+def test_instantiate_hashtag_day() -> None:
+    """ Create instance of the HashtagDay class.
+
+        Args:
+            None.
+
+        Returns:
+            None.
+    """
+
+    hashtag_day_instance = HashtagDay()
+    assert hashtag_day_instance.__tablename__ == 'hashtag_days'
+
+    return None
+
+
+def test_instantiate_hashtag_engagement() -> None:
+    """ Create instance of the HashtagEngagement class.
+
+        Args:
+            None.
+
+        Returns:
+            None.
+    """
+
+    hashtag_engagement_instance = HashtagEngagement()
+    assert hashtag_engagement_instance.__tablename__ == 'hashtag_engagement'
+
+    return None
+
+
+def test_instantiate_hashtag_top_tweet() -> None:
+    """ Create instance of the HashtagTopTweet class.
+
+        Args:
+            None.
+
+        Returns:
+            None.
+    """
+
+    hashtag_top_tweet_instance = HashtagTopTweet()
+    assert hashtag_top_tweet_instance.__tablename__ == 'hashtag_top_tweets'
+
+    return None
+
+
+def test_instantiate_ingest_mark() -> None:
+    """ Create instance of the IngestMark class.
+
+        Args:
+            None.
+
+        Returns:
+            None.
+    """
+
+    ingest_mark_instance = IngestMark()
+    assert ingest_mark_instance.__tablename__ == 'ingest_marks'
+
+    return None
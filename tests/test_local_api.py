@@ -0,0 +1,88 @@
+#!/usr/bin/env pytest
+""" Tests for tweeter/local_api.py. """
+
+# Imports - Python Standard Library
+
+# Imports - Third-Party
+from pytest import raises
+import tweepy
+
+# Imports - Local
+from app.tweeter.local_api import LocalTwitterAPI, synthetic_corpus
+from app.tweeter.tweeter import get_top_n_tweets, twitter_api_auth
+
+# Constants
+SCREEN_NAME = 'wwt_inc'
+CORPUS = synthetic_corpus(accounts=[SCREEN_NAME], tweets=450)
+CORPUS_IDS = [tweet['id'] for tweet in CORPUS[SCREEN_NAME]]
+
+
+# Test functions
+def test_synthetic_corpus() -> None:
+    """ Test the synthetic_corpus function.
+
+        Args:
+            None.
+
+        Returns:
+            None.
+    """
+
+    # Assert the timeline is newest first, and hashtag entities match text
+    assert CORPUS_IDS == sorted(CORPUS_IDS, reverse=True)
+    for tweet in CORPUS[SCREEN_NAME]:
+        for hashtag in tweet['entities']['hashtags']:
+            start, end = hashtag['indices']
+            assert tweet['text'][start:end] == f"#{hashtag['text']}"
+
+    return None
+
+
+def test_local_api_timeline() -> None:
+    """ Test the tweeter fetch path end to end against LocalTwitterAPI.
+
+        Args:
+            None.
+
+        Returns:
+            None.
+    """
+
+    with LocalTwitterAPI(corpus=CORPUS) as local_api:
+        api = twitter_api_auth(host=local_api.url)
+
+        # Page through the whole timeline, and the tweets after a since_id
+        tweets = list(get_top_n_tweets(api_object=api))
+        newer_tweets = list(
+            get_top_n_tweets(api_object=api, since_id=CORPUS_IDS[10])
+        )
+
+    assert [tweet.id for tweet in tweets] == CORPUS_IDS
+    assert [tweet.id for tweet in newer_tweets] == CORPUS_IDS[:10]
+
+    # Each Cursor stops after an empty page: 3 + 1 requests, then 1 + 1
+    assert local_api.requests == 6
+
+    return None
+
+
+def test_local_api_rate_limit() -> None:
+    """ Test LocalTwitterAPI responds with 429 when over the rate limit.
+
+        Args:
+            None.
+
+        Returns:
+            None.
+    """
+
+    with LocalTwitterAPI(corpus=CORPUS, rate_limit=1) as local_api:
+        api = twitter_api_auth(host=local_api.url)
+
+        api.user_timeline(screen_name=SCREEN_NAME)
+        assert api.last_response.headers['x-rate-limit-remaining'] == '0'
+
+        with raises(tweepy.TooManyRequests):
+            api.user_timeline(screen_name=SCREEN_NAME)
+
+    return None
@@ -0,0 +1,107 @@
+#!/usr/bin/env pytest
+""" Tests for tweeter/pipeline.py. """
+
+# Imports - Python Standard Library
+from typing import Iterator, List
+
+# Imports - Third-Party
+from pytest import raises
+
+# Imports - Local
+from app.tweeter.pipeline import IngestPipeline
+
+# Constants
+PIPELINE_ITEMS = list(range(25))
+PIPELINE_CHUNK_SIZE = 4
+
+
+# Test functions
+def failing_items() -> Iterator[int]:
+    """ Yield a few items, then fail like a broken network fetch.
+
+        Args:
+            None.
+
+        Yields:
+            item (int):
+                Integer items.
+    """
+
+    yield from range(3)
+
+    raise ConnectionError('fetch failed')
+
+
+def test_ingest_pipeline_run() -> None:
+    """ Test the IngestPipeline.run method.
+
+        Args:
+            None.
+
+        Returns:
+            None.
+    """
+
+    written = []
+
+    def writer(chunk: List) -> None:
+        written.extend(chunk)
+
+    # Run the pipeline with two writer threads
+    pipeline = IngestPipeline(
+        writer=writer,
+        writers=2,
+        chunk_size=PIPELINE_CHUNK_SIZE
+    )
+    stats = pipeline.run(items=PIPELINE_ITEMS)
+
+    assert sorted(written) == PIPELINE_ITEMS
+    assert stats['fetch'].items == len(PIPELINE_ITEMS)
+    assert stats['write'].items == len(PIPELINE_ITEMS)
+
+    return None
+
+
+def test_ingest_pipeline_writer_error() -> None:
+    """ Test IngestPipeline.run raises writer errors.
+
+        Args:
+            None.
+
+        Returns:
+            None.
+    """
+
+    def writer(chunk: List) -> None:
+        raise ValueError('write failed')
+
+    pipeline = IngestPipeline(
+        writer=writer,
+        chunk_size=PIPELINE_CHUNK_SIZE
+    )
+
+    with raises(ValueError):
+        pipeline.run(items=PIPELINE_ITEMS)
+
+    return None
+
+
+def test_ingest_pipeline_fetch_error() -> None:
+    """ Test IngestPipeline.run raises fetch errors.
+
+        Args:
+            None.
+
+        Returns:
+            None.
+    """
+
+    pipeline = IngestPipeline(
+        writer=lambda chunk: None,
+        chunk_size=PIPELINE_CHUNK_SIZE
+    )
+
+    with raises(ConnectionError):
+        pipeline.run(items=failing_items())
+
+    return None
@@ -0,0 +1,141 @@
+#!/usr/bin/env pytest
+""" Tests for tweeter/scheduler.py. """
+
+# Imports - Python Standard Library
+from time import time
+from types import SimpleNamespace
+
+# Imports - Third-Party
+from pytest import fixture
+
+# Imports - Local
+from app.tweeter.scheduler import RateLimiter, rate_limited
+
+# Constants
+ENDPOINT = 'statuses/user_timeline'
+RATE_LIMIT = 3
+RATE_LIMIT_HEADERS = {
+    'x-rate-limit-limit': '900',
+    'x-rate-limit-remaining': '1',
+    'x-rate-limit-reset': str(int(time()) + 900)
+}
+
+
+# Test classes
+class APIMock:
+    """ Mock a tweepy.api.API object with a last_response attribute. """
+
+    def __init__(self) -> None:
+        """ Class initialization method. """
+
+        self.last_response = SimpleNamespace(headers=RATE_LIMIT_HEADERS)
+
+        return None
+
+    def user_timeline(self) -> str:
+        """ Mock of the user_timeline method. """
+
+        return 'page'
+
+    user_timeline.pagination_mode = 'id'
+
+
+# pytest fixtures
+@fixture
+def rate_limiter() -> RateLimiter:
+    """ A pytest fixture to create a RateLimiter object.
+
+        Args:
+            None.
+
+        Returns:
+            rate_limiter (RateLimiter):
+                RateLimiter with a small limit for ENDPOINT.
+    """
+
+    rate_limiter = RateLimiter(
+        limits={ENDPOINT: RATE_LIMIT}
+    )
+
+    return rate_limiter
+
+
+# Test functions
+def test_rate_limiter_acquire(
+    rate_limiter: RateLimiter
+) -> None:
+    """ Test the RateLimiter.acquire method.
+
+        Args:
+            rate_limiter (RateLimiter):
+                RateLimiter pytest fixture.
+
+        Returns:
+            None.
+    """
+
+    # Take a token from the bucket
+    rate_limiter.acquire(endpoint=ENDPOINT)
+
+    assert rate_limiter.buckets[ENDPOINT]['remaining'] == RATE_LIMIT - 1
+
+    return None
+
+
+def test_rate_limiter_update(
+    rate_limiter: RateLimiter
+) -> None:
+    """ Test the RateLimiter.update method.
+
+        Args:
+            rate_limiter (RateLimiter):
+                RateLimiter pytest fixture.
+
+        Returns:
+            None.
+    """
+
+    # Synchronize the bucket with rate limit headers
+    rate_limiter.update(
+        endpoint=ENDPOINT,
+        headers=RATE_LIMIT_HEADERS
+    )
+
+    bucket = rate_limiter.buckets[ENDPOINT]
+
+    assert bucket['limit'] == 900
+    assert bucket['remaining'] == 1
+    assert bucket['reset'] == float(RATE_LIMIT_HEADERS['x-rate-limit-reset'])
+
+    return None
+
+
+def test_rate_limited(
+    rate_limiter: RateLimiter
+) -> None:
+    """ Test the rate_limited function.
+
+        Args:
+            rate_limiter (RateLimiter):
+                RateLimiter pytest fixture.
+
+        Returns:
+            None.
+    """
+
+    api_mock = APIMock()
+
+    # Wrap the mock user_timeline method
+    method = rate_limited(
+        method=api_mock.user_timeline,
+        endpoint=ENDPOINT,
+        api_object=api_mock,
+        rate_limiter=rate_limiter
+    )
+
+    assert method.pagination_mode == 'id'
+    assert method.__self__ is api_mock
+    assert method() == 'page'
+    assert rate_limiter.buckets[ENDPOINT]['remaining'] == 1
+
+    return None
@@ -0,0 +1,125 @@
+#!/usr/bin/env pytest
+""" Tests for tweeter/sketch.py. """
+
+# Imports - Python Standard Library
+from collections import Counter
+import json
+
+# Imports - Third-Party
+
+# Imports - Local
+from app.tweeter.sketch import SpaceSaving
+
+# Constants
+SKETCH_CAPACITY = 10
+HEAVY_HITTERS = ['wwt', 'ai', 'cloud']
+SKETCH_STREAM = (
+    # Heavy hitters, mixed with a long tail of hashtags seen once
+    [HEAVY_HITTERS[index % 3] for index in range(300)] +
+    [f'tail{index}' for index in range(200)] +
+    [HEAVY_HITTERS[index % 3] for index in range(300)]
+)
+
+
+# Test functions
+def test_space_saving_exact() -> None:
+    """ Test SpaceSaving counts exactly when under capacity.
+
+        Args:
+            None.
+
+        Returns:
+            None.
+    """
+
+    items = ['one', 'two', 'two', 'three', 'three', 'three']
+    sketch = SpaceSaving(capacity=SKETCH_CAPACITY)
+    sketch.update(items)
+
+    assert sketch.most_common() == Counter(items).most_common()
+    assert all(error == 0 for _, _, error in sketch.top())
+
+    return None
+
+
+def test_space_saving_heavy_hitters() -> None:
+    """ Test SpaceSaving keeps heavy hitters within the error bound.
+
+        Args:
+            None.
+
+        Returns:
+            None.
+    """
+
+    sketch = SpaceSaving(capacity=SKETCH_CAPACITY)
+    sketch.update(SKETCH_STREAM)
+    exact = Counter(SKETCH_STREAM)
+
+    # Memory is fixed, and the heavy hitters are the top items
+    assert len(sketch.counts) == SKETCH_CAPACITY
+    assert len(sketch._heap) <= SKETCH_CAPACITY * 4
+    assert {item for item, _ in sketch.most_common(n=3)} == set(HEAVY_HITTERS)
+
+    # Counts never underestimate, and overestimate by at most the bound
+    for item, count, error in sketch.top():
+        assert count - error <= exact[item] <= count
+        assert count - exact[item] <= sketch.error_bound
+
+    return None
+
+
+def test_space_saving_merge() -> None:
+    """ Test merging SpaceSaving sketches from separate workers.
+
+        Args:
+            None.
+
+        Returns:
+            None.
+    """
+
+    half = len(SKETCH_STREAM) // 2
+    first = SpaceSaving(capacity=SKETCH_CAPACITY)
+    first.update(SKETCH_STREAM[:half])
+    second = SpaceSaving(capacity=SKETCH_CAPACITY)
+    second.update(SKETCH_STREAM[half:])
+
+    merged = first + second
+    exact = Counter(SKETCH_STREAM)
+
+    assert merged.total == len(SKETCH_STREAM)
+    assert len(merged.counts) <= SKETCH_CAPACITY
+    assert {item for item, _ in merged.most_common(n=3)} == set(HEAVY_HITTERS)
+
+    for item, count, error in merged.top():
+        assert count - error <= exact[item] <= count
+
+    return None
+
+
+def test_space_saving_serialization() -> None:
+    """ Test the SpaceSaving to_dict and from_dict methods.
+
+        Args:
+            None.
+
+        Returns:
+            None.
+    """
+
+    sketch = SpaceSaving(capacity=SKETCH_CAPACITY)
+    sketch.update(SKETCH_STREAM)
+
+    # Round trip through JSON, as when saving a sketch between runs
+    restored = SpaceSaving.from_dict(json.loads(json.dumps(sketch.to_dict())))
+
+    assert restored.capacity == sketch.capacity
+    assert restored.total == sketch.total
+    assert restored.top() == sketch.top()
+
+    # A restored sketch keeps counting
+    restored.update(['wwt'])
+    assert restored.counts['wwt'] == sketch.counts['wwt'] + 1
+
+    return None
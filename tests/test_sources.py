@@ -0,0 +1,170 @@
+#!/usr/bin/env pytest
+""" Tests for tweeter/sources.py. """
+
+# Imports - Python Standard Library
+from pathlib import Path
+from typing import Iterator, List, Union
+from unittest.mock import patch
+import gzip
+
+# Imports - Third-Party
+from tweepy.models import Status
+
+# Imports - Local
+from app.tweeter import sources
+from app.tweeter.scheduler import RateLimiter
+from app.tweeter.sources import RecordingSource, ReplaySource, TweetSource
+
+# Constants
+SCREEN_NAME = 'wwt_inc'
+TWEET_PAGES = [
+    [
+        {
+            'id': tweet_id,
+            'text': f'Tweet {tweet_id} #brand',
+            'created_at': 'Thu Jan 20 19:35:26 +0000 2022'
+        }
+        for tweet_id in range(page_start, page_start - 3, -1)
+    ]
+    for page_start in (30, 20, 10)
+]
+
+
+# Test classes
+class StaticSource(TweetSource):
+    """ Source with a fixed set of pages for TWEET_PAGES. """
+
+    def pages(
+        self,
+        screen_name: str,
+        since_id: Union[int, str, None] = None,
+        rate_limiter: RateLimiter = None
+    ) -> Iterator[List[Status]]:
+        """ Yield TWEET_PAGES as tweepy Status objects. """
+
+        for page in TWEET_PAGES:
+            yield [Status.parse(api=None, json=tweet) for tweet in page]
+
+
+# Test functions
+def test_record_replay(
+    tmp_path: Path
+) -> None:
+    """ Test a RecordingSource file replays with a ReplaySource.
+
+        Args:
+            tmp_path (pathlib.Path):
+                pytest temporary directory.
+
+        Returns:
+            None.
+    """
+
+    recording_path = tmp_path / 'recording.jsonl.gz'
+
+    # Record the static source, then replay the recording
+    with RecordingSource(
+        source=StaticSource(),
+        path=recording_path
+    ) as recorder:
+        recorded = [
+            tweet.id for tweet in recorder.tweets(screen_name=SCREEN_NAME)
+        ]
+
+    replayed = [
+        tweet.id
+        for tweet in ReplaySource(path=recording_path).tweets(
+            screen_name=SCREEN_NAME
+        )
+    ]
+
+    assert recorded == [tweet['id'] for page in TWEET_PAGES for tweet in page]
+    assert replayed == recorded
+
+    return None
+
+
+def test_replay_filters(
+    tmp_path: Path
+) -> None:
+    """ Test ReplaySource filters by account and since_id.
+
+        Args:
+            tmp_path (pathlib.Path):
+                pytest temporary directory.
+
+        Returns:
+            None.
+    """
+
+    recording_path = tmp_path / 'recording.jsonl.gz'
+
+    with RecordingSource(
+        source=StaticSource(),
+        path=recording_path
+    ) as recorder:
+        list(recorder.pages(screen_name=SCREEN_NAME))
+
+    replay = ReplaySource(path=recording_path)
+
+    # Replay only tweets newer than 20, and no tweets for another account
+    newer_ids = [
+        tweet.id
+        for tweet in replay.tweets(screen_name=SCREEN_NAME, since_id=20)
+    ]
+
+    assert newer_ids == [30, 29, 28]
+    assert list(replay.pages(screen_name='another_account')) == []
+
+    return None
+
+
+def test_replay_reads_once(
+    tmp_path: Path
+) -> None:
+    """ Test ReplaySource reads the recording once for every account.
+
+        Args:
+            tmp_path (pathlib.Path):
+                pytest temporary directory.
+
+        Returns:
+            None.
+    """
+
+    recording_path = tmp_path / 'recording.jsonl.gz'
+    replay = ReplaySource(path=recording_path)
+    screen_names = [SCREEN_NAME, 'another_account']
+
+    def record(screen_name: str) -> None:
+        with RecordingSource(
+            source=StaticSource(),
+            path=recording_path
+        ) as recorder:
+            list(recorder.pages(screen_name=screen_name))
+
+    for screen_name in screen_names:
+        record(screen_name=screen_name)
+
+    with patch.object(
+        target=sources.gzip,
+        attribute='open',
+        wraps=gzip.open
+    ) as gzip_open:
+        replayed = [
+            len(list(replay.tweets(screen_name=screen_name)))
+            for screen_name in screen_names
+        ]
+
+        assert replayed == [9, 9]
+        assert gzip_open.call_count == 1
+
+        # Appending to the recording (one more open) has the next replay
+        # read it again, once, with the new pages
+        record(screen_name=SCREEN_NAME)
+
+        assert len(list(replay.tweets(screen_name=SCREEN_NAME))) == 18
+        assert len(list(replay.tweets(screen_name=SCREEN_NAME))) == 18
+        assert gzip_open.call_count == 3
+
+    return None
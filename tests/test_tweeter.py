@@ -2,18 +2,38 @@
 """ Tests for tweeter.py. """
 
 # Imports - Python Standard Library
+from collections import Counter
+from contextlib import contextmanager, ExitStack
+from functools import partial
+from itertools import groupby
+from pathlib import Path
 from types import GeneratorType
-from typing import List
+from typing import Iterable, Iterator, List, Tuple
 from unittest.mock import MagicMock, patch
+import gzip
+import json
+import logging
 
 # Imports - Third-Party
+from pytest import fixture, raises
 from tweepy.api import API
+from tweepy.models import Status as TweepyStatus
+import sqlalchemy
 import tweepy
 
 # Imports - Local
+from app.db import db
+from app.tweeter import tweeter
 from app.tweeter.tweeter import (
-    twitter_api_auth, get_top_n_tweets, hashtag_counter
+    twitter_api_auth, get_top_n_tweets, split_id_range, backfill_tweets,
+    LiveSource, ingest_accounts, ingest_tweets, pipeline_ingest_tweets,
+    extract_hashtags, hashtag_counter, parallel_hashtag_counter,
+    log_ingest_stats, log_top_hashtags
 )
+from app.db.db_models import Hashtag, TweetData
+from app.tweeter.pipeline import StageStats
+from app.tweeter.sketch import SpaceSaving
+from app.tweeter.sources import RECORDING_ENCODING, ReplaySource
 
 
 # class objects
@@ -27,6 +47,97 @@ class TweepyAPIMock:
         return None
 
 
+class TimelineAPIMock(API):
+    """ Mock a tweepy.api.API object with a synthetic user timeline.
+
+        Overrides the request method, so tweepy.Cursor pages through
+        the timeline with since_id, max_id, and count parameters.
+    """
+
+    def __init__(
+        self,
+        tweet_ids: List[int]
+    ) -> None:
+        """ Create a timeline of tweets with the given IDs.
+
+            Args:
+                tweet_ids (List[int]):
+                    List of tweet IDs in the timeline.
+
+            Returns:
+                None.
+        """
+
+        super().__init__()
+        self.tweet_ids = sorted(tweet_ids, reverse=True)
+        self.requests = 0
+
+        return None
+
+    def request(
+        self,
+        method: str,
+        endpoint: str,
+        *,
+        parser=None,
+        payload_list: bool = False,
+        payload_type: str = None,
+        endpoint_parameters=(),
+        **kwargs
+    ):
+        """ Mock of the request method, returning a timeline page.
+
+            Args:
+                method (str):
+                    HTTP method.
+
+                endpoint (str):
+                    Twitter API endpoint name.
+
+                parser (tweepy.parsers.Parser, optional):
+                    Parser for the response payload.
+
+                payload_list (bool, optional):
+                    True if the payload is a list.
+
+                payload_type (str, optional):
+                    tweepy model name of the payload.
+
+                endpoint_parameters (Tuple, optional):
+                    Parameter names accepted by the endpoint.
+
+                kwargs:
+                    Request parameters.
+
+            Returns:
+                Parsed timeline page.
+        """
+
+        self.requests += 1
+        since_id = int(kwargs.get('since_id') or 0)
+        max_id = int(kwargs.get('max_id') or self.tweet_ids[0])
+        count = int(kwargs.get('count') or 20)
+
+        page = [
+            {
+                'id': tweet_id,
+                'text': f'Tweet {tweet_id} #brand',
+                'created_at': TWEET_MOCK[0].get('created_at')
+            }
+            for tweet_id in self.tweet_ids
+            if since_id < tweet_id <= max_id
+        ][:count]
+
+        result = (parser or self.parser).parse(
+            json.dumps(page),
+            api=self,
+            payload_list=payload_list,
+            payload_type=payload_type
+        )
+
+        return result
+
+
 class Status:
     """ Mock a Status object in the tweepy.Cursor response object. """
 
@@ -125,6 +236,16 @@ TWEET_MOCK = [
     }
 ]
 
+TIMELINE_IDS = [
+    (tweet_minute * 60000) << 22 for tweet_minute in range(1, 1001)
+]
+
+MAIN_CALLS = (
+    'add_tweets', 'record_since_id', 'recount_hashtags',
+    'bump_dataset_version', 'create_staging_tables', 'swap_staging_tables'
+)  # db functions called by tweeter.main, in the order tests check
+SCREEN_NAME = 'wwt_inc'
+
 CURSOR_STATUS_MOCK = Status(
     mock_api=API,
     mock_tweets=TWEET_MOCK
@@ -135,6 +256,177 @@ CURSOR_MOCK = CursorMock(
 )
 
 
+# pytest fixtures
+@fixture
+def ingest_db(
+    tmp_path: Path
+) -> Iterator[sqlalchemy.engine.Engine]:
+    """ A pytest fixture to run ingests against an SQLite database file.
+
+        The database is shared by the ingest threads, through the
+        db.session scoped session.  SQLite allows one writer at a time,
+        so the pipeline runs with a single writer thread.
+
+        Args:
+            tmp_path (pathlib.Path):
+                pytest temporary directory.
+
+        Yields:
+            engine (sqlalchemy.engine.Engine):
+                Engine object bound to the database file.
+    """
+
+    engine = sqlalchemy.create_engine(f'sqlite:///{tmp_path / "ingest.db"}')
+    db.upgrade_schema(engine=engine)
+    db.remove_session()
+
+    with patch.object(target=db, attribute='_engine', new=engine), \
+            patch.object(
+                target=tweeter,
+                attribute='pipeline_ingest_tweets',
+                new=partial(tweeter.pipeline_ingest_tweets, writers=1)
+            ):
+        yield engine
+
+    db.remove_session()
+    engine.dispose()
+
+    return None
+
+
+# Test helper functions
+def write_recording(
+    path: Path,
+    tweet_ids: Iterable[int],
+    screen_name: str = SCREEN_NAME
+) -> None:
+    """ Append a timeline to a ReplaySource recording, in pages of 200.
+
+        Args:
+            path (pathlib.Path):
+                Path of the gzip JSONL recording file.
+
+            tweet_ids (Iterable[int]):
+                Tweet IDs in the timeline.
+
+            screen_name (str, optional):
+                Twitter account of the timeline.  Default value is
+                SCREEN_NAME.
+
+        Returns:
+            None.
+    """
+
+    tweets = [
+        {
+            'id': tweet_id,
+            'text': f'Tweet {tweet_id} #brand',
+            'created_at': TWEET_MOCK[0].get('created_at'),
+            'favorite_count': 0,
+            'retweet_count': 0
+        }
+        for tweet_id in sorted(tweet_ids, reverse=True)
+    ]
+
+    with gzip.open(path, mode='at', encoding=RECORDING_ENCODING) as recording:
+        for start in range(0, len(tweets), tweeter.TWEET_PAGE_SIZE):
+            recording.write(json.dumps({
+                'screen_name': screen_name,
+                'tweets': tweets[start:start + tweeter.TWEET_PAGE_SIZE]
+            }) + '\n')
+
+    return None
+
+
+def stored_counts() -> tuple:
+    """ Get the number of stored tweets, and the count of #brand.
+
+        Args:
+            None.
+
+        Returns:
+            tweet_count, brand_count (tuple):
+                Number of rows in the tweets table, and the count of
+                the brand hashtag.
+    """
+
+    tweet_count = db.session.query(TweetData).count()
+    brand_count = db.session.query(Hashtag.count).filter(
+        Hashtag.name == 'brand'
+    ).scalar()
+
+    return tweet_count, brand_count
+
+
+@contextmanager
+def record_calls(
+    *names: str
+) -> Iterator[MagicMock]:
+    """ Record the calls to db functions, in the order they are made.
+
+        Args:
+            names (str):
+                Names of the db functions to wrap.
+
+        Yields:
+            calls (unittest.mock.MagicMock):
+                Mock with the wrapped functions attached, and their
+                calls in mock_calls.
+    """
+
+    calls = MagicMock()
+
+    with ExitStack() as stack:
+        for name in names:
+            calls.attach_mock(
+                stack.enter_context(
+                    patch.object(target=db, attribute=name,
+                                 wraps=getattr(db, name))
+                ),
+                name
+            )
+
+        yield calls
+
+    return None
+
+
+def call_order(
+    calls: MagicMock
+) -> List[str]:
+    """ Get the order of recorded calls, with repeated calls merged.
+
+        Args:
+            calls (unittest.mock.MagicMock):
+                Mock yielded by record_calls.
+
+        Returns:
+            order (List[str]):
+                Names of the called functions, in call order.
+    """
+
+    order = [name for name, _ in groupby(call[0] for call in calls.mock_calls)]
+
+    return order
+
+
+def main_state() -> Tuple[int, str]:
+    """ Get the dataset version and the high-water mark of SCREEN_NAME.
+
+        Args:
+            None.
+
+        Returns:
+            version, since_id (Tuple[int, str]):
+                Dataset version number, and the recorded since_id.
+    """
+
+    version, _ = db.get_dataset_version()
+    since_id = db.get_since_id(screen_name=SCREEN_NAME)
+
+    return version, since_id
+
+
 # Test functions
 def test_twitter_auth() -> None:
     """ Test the twitter_auth function.
@@ -190,6 +482,388 @@ def test_get_top_n_tweets(
     return None
 
 
+@patch.object(
+    target=tweepy,
+    attribute='Cursor',
+    return_value=CURSOR_MOCK
+)
+def test_get_top_n_tweets_since_id(
+    cursor: MagicMock
+) -> None:
+    """ Test the get_top_n_tweets function with a since_id.
+
+        Args:
+            cursor (unittest.mock.MagicMock):
+                Mocked cursor object.
+
+        Returns:
+            None.
+    """
+
+    # Call the get_top_n_tweets function with a high-water mark
+    get_top_n_tweets(
+        api_object=TWEEPY_API_MOCK,
+        since_id=TWEET_MOCK[0].get('id')
+    )
+
+    # Assert the high-water mark is passed to the cursor
+    assert cursor.call_args.kwargs.get('since_id') == TWEET_MOCK[0].get('id')
+
+    return None
+
+
+@patch.object(
+    target=tweeter,
+    attribute='TWEET_SLICE',
+    new=3
+)
+def test_get_top_n_tweets_slice() -> None:
+    """ Test only full loads are limited to TWEET_SLICE tweets.
+
+        Args:
+            None.
+
+        Returns:
+            None.
+    """
+
+    api_mock = TimelineAPIMock(tweet_ids=TIMELINE_IDS)
+
+    full_load = list(get_top_n_tweets(api_object=api_mock))
+    incremental_load = list(
+        get_top_n_tweets(api_object=api_mock, since_id=TIMELINE_IDS[0])
+    )
+
+    # Incremental loads reach the since_id, however many tweets are newer
+    assert len(full_load) == 3
+    assert [tweet.id for tweet in incremental_load] == sorted(
+        TIMELINE_IDS[1:],
+        reverse=True
+    )
+
+    return None
+
+
+@patch.object(
+    target=tweepy,
+    attribute='Cursor',
+    return_value=CURSOR_MOCK
+)
+def test_get_top_n_tweets_page_size(
+    cursor: MagicMock
+) -> None:
+    """ Test the get_top_n_tweets function requests full pages.
+
+        Args:
+            cursor (unittest.mock.MagicMock):
+                Mocked cursor object.
+
+        Returns:
+            None.
+    """
+
+    get_top_n_tweets(
+        api_object=TWEEPY_API_MOCK
+    )
+
+    assert cursor.call_args.kwargs.get('count') == 200
+
+    return None
+
+
+def test_split_id_range() -> None:
+    """ Test the split_id_range function.
+
+        Args:
+            None.
+
+        Returns:
+            None.
+    """
+
+    # Split the synthetic timeline into four ranges
+    id_ranges = split_id_range(
+        since_id=TIMELINE_IDS[0],
+        max_id=TIMELINE_IDS[-1],
+        ranges=4
+    )
+
+    # Assert the ranges are newest first, and have no gaps or overlaps
+    assert len(id_ranges) == 4
+    assert id_ranges[0][1] == TIMELINE_IDS[-1]
+    assert id_ranges[-1][0] == TIMELINE_IDS[0]
+    for newer, older in zip(id_ranges, id_ranges[1:]):
+        assert newer[0] == older[1]
+
+    return None
+
+
+def test_backfill_tweets() -> None:
+    """ Test the backfill_tweets function.
+
+        Args:
+            None.
+
+        Returns:
+            None.
+    """
+
+    api_mock = TimelineAPIMock(tweet_ids=TIMELINE_IDS)
+
+    # Backfill the synthetic timeline through the mock API
+    with patch.object(
+        target=tweeter,
+        attribute='twitter_api_auth',
+        return_value=api_mock
+    ):
+        tweets = list(backfill_tweets(ranges=4))
+
+    # Assert every tweet is collected once, newest first
+    assert [tweet.id for tweet in tweets] == sorted(TIMELINE_IDS, reverse=True)
+
+    return None
+
+
+def test_live_source() -> None:
+    """ Test the LiveSource.pages method.
+
+        Args:
+            None.
+
+        Returns:
+            None.
+    """
+
+    api_mock = TimelineAPIMock(tweet_ids=TIMELINE_IDS)
+
+    # Page through the synthetic timeline, limited to TWEET_SLICE tweets
+    with patch.object(
+        target=tweeter,
+        attribute='twitter_api_auth',
+        return_value=api_mock
+    ):
+        pages = list(LiveSource().pages(screen_name='wwt_inc'))
+
+    assert [len(page) for page in pages] == [200, 200, 100]
+
+    return None
+
+
+@patch.object(
+    target=tweeter,
+    attribute='_ingest_account',
+    side_effect=lambda screen_name, since_id, **kwargs: (
+        Counter({screen_name: 1, 'brand': 1}),
+        {'write': StageStats(name='write')}
+    )
+)
+def test_ingest_accounts(
+    ingest_account: MagicMock
+) -> None:
+    """ Test the ingest_accounts function.
+
+        Args:
+            ingest_account (unittest.mock.MagicMock):
+                Mocked _ingest_account function.
+
+        Returns:
+            None.
+    """
+
+    # Call the ingest_accounts function with two accounts
+    hashtag_count, account_stats = ingest_accounts(
+        accounts=['account_1', 'account_2'],
+        since_ids={'account_2': TWEET_MOCK[0].get('id')}
+    )
+
+    # Assert each account is ingested with its own high-water mark
+    since_ids = {
+        call.kwargs['screen_name']: call.kwargs['since_id']
+        for call in ingest_account.call_args_list
+    }
+    assert since_ids == {
+        'account_1': None,
+        'account_2': TWEET_MOCK[0].get('id')
+    }
+    assert hashtag_count == {'account_1': 1, 'account_2': 1, 'brand': 2}
+    assert list(account_stats) == ['account_1', 'account_2']
+
+    return None
+
+
+@patch.object(
+    target=db,
+    attribute='add_tweets'
+)
+def test_ingest_tweets(
+    add_tweets: MagicMock
+) -> None:
+    """ Test the ingest_tweets function.
+
+        Args:
+            add_tweets (unittest.mock.MagicMock):
+                Mocked db.add_tweets function.
+
+        Returns:
+            None.
+    """
+
+    # Stream five tweets into the mocked database, two at a time
+    hashtag_count = ingest_tweets(
+        tweets=[CURSOR_STATUS_MOCK] * 5,
+        screen_name='wwt_inc',
+        chunk_size=2,
+        session=None
+    )
+
+    # Assert tweets are written in bounded chunks, and hashtags are counted
+    chunk_sizes = [
+        len(call.kwargs.get('tweets')) for call in add_tweets.call_args_list
+    ]
+    assert chunk_sizes == [2, 2, 1]
+    assert hashtag_count['brand'] == 5
+
+    return None
+
+
+@patch.object(
+    target=db,
+    attribute='remove_session'
+)
+@patch.object(
+    target=db,
+    attribute='add_tweets'
+)
+def test_pipeline_ingest_tweets(
+    add_tweets: MagicMock,
+    remove_session: MagicMock
+) -> None:
+    """ Test the pipeline_ingest_tweets function.
+
+        Args:
+            add_tweets (unittest.mock.MagicMock):
+                Mocked db.add_tweets function.
+
+            remove_session (unittest.mock.MagicMock):
+                Mocked db.remove_session function.
+
+        Returns:
+            None.
+    """
+
+    # Stream five tweets through the pipeline, two at a time
+    hashtag_count, stats = pipeline_ingest_tweets(
+        tweets=[CURSOR_STATUS_MOCK] * 5,
+        screen_name='wwt_inc',
+        chunk_size=2
+    )
+
+    # Assert every tweet is written, and each writer session is removed
+    written = sum(
+        len(call.kwargs.get('tweets')) for call in add_tweets.call_args_list
+    )
+    assert written == 5
+    assert remove_session.call_count == 3
+    assert hashtag_count['brand'] == 5
+    assert stats['fetch'].items == stats['write'].items == 5
+
+    return None
+
+
+def test_log_ingest_stats(
+    caplog
+) -> None:
+    """ Test the log_ingest_stats function reports each pipeline stage.
+
+        Args:
+            caplog (pytest.LogCaptureFixture):
+                pytest fixture to capture log records.
+
+        Returns:
+            None.
+    """
+
+    write = StageStats(name='write')
+    write.record(items=400, busy=2.0, blocked=0.5)
+
+    with caplog.at_level(logging.INFO, logger=tweeter.__name__):
+        log_ingest_stats(account_stats={'wwt_inc': {'write': write}})
+
+    assert caplog.messages == [
+        'wwt_inc write: 400 tweets, 200.0 tweets/s, 0.500s blocked'
+    ]
+
+    return None
+
+
+def test_log_top_hashtags(
+    caplog
+) -> None:
+    """ Test the log_top_hashtags function reports exact and approximate
+        counts.
+
+        Args:
+            caplog (pytest.LogCaptureFixture):
+                pytest fixture to capture log records.
+
+        Returns:
+            None.
+    """
+
+    hashtags = ['brand', 'brand', 'brand', 'cloud', 'wwt']
+    sketch = SpaceSaving(capacity=2)
+    sketch.update(hashtags)
+
+    with caplog.at_level(logging.INFO, logger=tweeter.__name__):
+        log_top_hashtags(hashtag_count=Counter(hashtags), n=2)
+        log_top_hashtags(hashtag_count=sketch, n=2)
+
+    # Sketch counts are logged with their error bounds
+    assert caplog.messages == [
+        '#brand: 3 tweets (+/- 0)',
+        '#cloud: 1 tweets (+/- 0)',
+        '#brand: 3 tweets (+/- 0)',
+        '#wwt: 2 tweets (+/- 1)'
+    ]
+
+    return None
+
+
+def test_extract_hashtags() -> None:
+    """ Test the extract_hashtags function.
+
+        Args:
+            None.
+
+        Returns:
+            None.
+    """
+
+    # Create a tweet with hashtag entities that differ from the text
+    tweet = TweepyStatus.parse(
+        api=None,
+        json={
+            'text': '#ignored text',
+            'entities': {
+                'hashtags': [
+                    {'text': 'Brand'},
+                    {'text': 'ai'},
+                    {'text': 'brand_new'},
+                    {'text': 'café'}
+                ]
+            }
+        }
+    )
+
+    # Assert entities are used, with the same rules as VALID_HASHTAG
+    assert extract_hashtags(tweet=tweet) == ['brand', 'brand', 'caf']
+
+    # Assert tweets without entities fall back to the text
+    assert extract_hashtags(tweet=CURSOR_STATUS_MOCK) == ['brand']
+
+    return None
+
+
 def test_hashtag_counter() -> None:
     """ Test the get_tweets function.
 
@@ -210,3 +884,281 @@ def test_hashtag_counter() -> None:
     assert list(hashtag_count.values())[0] == 1
 
     return None
+
+
+def test_hashtag_counter_capacity() -> None:
+    """ Test the hashtag_counter function with an approximate count.
+
+        Args:
+            None.
+
+        Returns:
+            None.
+    """
+
+    texts = [
+        TweepyStatus.parse(api=None, json={'text': text})
+        for text in ['#one #two #two', '#two #three', '#four']
+    ]
+
+    # Track two hashtags, so the long tail is folded into them
+    hashtag_count = hashtag_counter(tweets=texts, capacity=2)
+
+    assert len(hashtag_count) == 2
+    assert list(hashtag_count)[0] == 'two'
+
+    return None
+
+
+def test_parallel_hashtag_counter() -> None:
+    """ Test the parallel_hashtag_counter function.
+
+        Args:
+            None.
+
+        Returns:
+            None.
+    """
+
+    tweets = [CURSOR_STATUS_MOCK] * 25
+    texts = ['#one #two #two', '#two #three'] * 10
+
+    # Count tweets and text in small chunks across two processes
+    tweet_count = parallel_hashtag_counter(
+        tweets=tweets,
+        workers=2,
+        chunk_size=4
+    )
+    text_count = parallel_hashtag_counter(
+        tweets=texts,
+        workers=2,
+        chunk_size=3
+    )
+
+    assert tweet_count == hashtag_counter(tweets=tweets)
+    assert text_count == {'two': 30, 'one': 10, 'three': 10}
+    assert list(text_count)[0] == 'two'
+
+    return None
+
+
+def test_main_incremental_recovery(
+    ingest_db: sqlalchemy.engine.Engine,
+    tmp_path: Path
+) -> None:
+    """ Test an incremental load after a load that failed part way.
+
+        Args:
+            ingest_db (sqlalchemy.engine.Engine):
+                Engine object of the ingest database.
+
+            tmp_path (pathlib.Path):
+                pytest temporary directory.
+
+        Returns:
+            None.
+    """
+
+    recording_path = tmp_path / 'recording.jsonl.gz'
+    write_recording(path=recording_path, tweet_ids=range(1, 501))
+    source = ReplaySource(path=recording_path)
+    add_tweets = db.add_tweets
+
+    def fail_oldest_chunk(tweets: List, **kwargs) -> bool:
+        if any(tweet.id == 1 for tweet in tweets):
+            raise RuntimeError('Write failed')
+
+        return add_tweets(tweets=tweets, **kwargs)
+
+    # The newest chunks are committed, before the oldest chunk fails
+    with patch.object(
+        target=db,
+        attribute='add_tweets',
+        new=fail_oldest_chunk
+    ), raises(RuntimeError):
+        tweeter.main(incremental=True, accounts=[SCREEN_NAME], source=source)
+
+    assert stored_counts() == (400, 400)
+    assert db.get_latest_tweet_id(screen_name=SCREEN_NAME) == '500'
+    assert db.get_since_id(screen_name=SCREEN_NAME) is None
+
+    # The next load fetches the missing tweets, and counts only them
+    tweeter.main(incremental=True, accounts=[SCREEN_NAME], source=source)
+
+    assert stored_counts() == (500, 500)
+    assert db.get_since_id(screen_name=SCREEN_NAME) == '500'
+
+    # Later loads only fetch tweets after the high-water mark
+    write_recording(path=recording_path, tweet_ids=range(501, 511))
+
+    with patch.object(
+        target=db,
+        attribute='add_tweets',
+        wraps=db.add_tweets
+    ) as written:
+        tweeter.main(incremental=True, accounts=[SCREEN_NAME], source=source)
+
+    assert sum(
+        len(call.kwargs['tweets']) for call in written.call_args_list
+    ) == 10
+    assert stored_counts() == (510, 510)
+    assert db.get_since_id(screen_name=SCREEN_NAME) == '510'
+
+    return None
+
+
+def test_main_full(
+    ingest_db: sqlalchemy.engine.Engine,
+    tmp_path: Path
+) -> None:
+    """ Test a full load upserts tweets, then recounts the hashtags.
+
+        Args:
+            ingest_db (sqlalchemy.engine.Engine):
+                Engine object of the ingest database.
+
+            tmp_path (pathlib.Path):
+                pytest temporary directory.
+
+        Returns:
+            None.
+    """
+
+    recording_path = tmp_path / 'recording.jsonl.gz'
+    write_recording(path=recording_path, tweet_ids=range(1, 301))
+    source = ReplaySource(path=recording_path)
+
+    # A stale count is replaced by the recount, not added to
+    db.session.add(Hashtag(name='brand', count=5))
+    db.session.commit()
+
+    for run in (1, 2):
+        with record_calls(*MAIN_CALLS) as calls:
+            tweeter.main(
+                incremental=False,
+                accounts=[SCREEN_NAME],
+                source=source,
+                refresh=False
+            )
+
+        assert call_order(calls=calls) == [
+            'add_tweets',
+            'record_since_id',
+            'recount_hashtags',
+            'bump_dataset_version'
+        ]
+        assert stored_counts() == (300, 300)
+        assert main_state() == (run, '300')
+
+    return None
+
+
+def test_main_incremental(
+    ingest_db: sqlalchemy.engine.Engine,
+    tmp_path: Path
+) -> None:
+    """ Test an incremental load adds new tweets to the hashtag counts.
+
+        Args:
+            ingest_db (sqlalchemy.engine.Engine):
+                Engine object of the ingest database.
+
+            tmp_path (pathlib.Path):
+                pytest temporary directory.
+
+        Returns:
+            None.
+    """
+
+    recording_path = tmp_path / 'recording.jsonl.gz'
+    write_recording(path=recording_path, tweet_ids=range(1, 301))
+    source = ReplaySource(path=recording_path)
+
+    # New tweets are merged into the stored counts, without a recount
+    db.session.add(Hashtag(name='brand', count=5))
+    db.session.commit()
+
+    with record_calls(*MAIN_CALLS) as calls:
+        tweeter.main(incremental=True, accounts=[SCREEN_NAME], source=source)
+
+    assert call_order(calls=calls) == [
+        'add_tweets',
+        'record_since_id',
+        'bump_dataset_version'
+    ]
+    assert stored_counts() == (300, 305)
+    assert main_state() == (1, '300')
+
+    # A load with no new tweets writes nothing, and bumps the version
+    with record_calls(*MAIN_CALLS) as calls:
+        tweeter.main(incremental=True, accounts=[SCREEN_NAME], source=source)
+
+    assert 'add_tweets' not in call_order(calls=calls)
+    assert stored_counts() == (300, 305)
+    assert main_state() == (2, '300')
+
+    return None
+
+
+def test_main_refresh(
+    ingest_db: sqlalchemy.engine.Engine,
+    tmp_path: Path
+) -> None:
+    """ Test a refresh loads staging tables, then swaps them in.
+
+        Args:
+            ingest_db (sqlalchemy.engine.Engine):
+                Engine object of the ingest database.
+
+            tmp_path (pathlib.Path):
+                pytest temporary directory.
+
+        Returns:
+            None.
+    """
+
+    recording_path = tmp_path / 'recording.jsonl.gz'
+    write_recording(path=recording_path, tweet_ids=range(1, 301))
+    write_recording(
+        path=recording_path,
+        tweet_ids=range(1001, 1011),
+        screen_name='wwt_dev'
+    )
+    source = ReplaySource(path=recording_path)
+
+    # Load both accounts, then refresh only SCREEN_NAME
+    tweeter.main(
+        incremental=True,
+        accounts=[SCREEN_NAME, 'wwt_dev'],
+        source=source
+    )
+
+    assert stored_counts() == (310, 310)
+    assert main_state() == (1, '300')
+
+    with record_calls(*MAIN_CALLS) as calls:
+        tweeter.main(
+            incremental=False,
+            accounts=[SCREEN_NAME],
+            source=source,
+            refresh=True
+        )
+
+    # The swap increments the version, and the marks are recorded after
+    assert call_order(calls=calls) == [
+        'create_staging_tables',
+        'add_tweets',
+        'swap_staging_tables',
+        'record_since_id'
+    ]
+    assert all(
+        call.kwargs.get('staging') is True
+        for call in calls.add_tweets.call_args_list
+    )
+
+    # The refreshed dataset replaces the old one, with exact counts
+    assert stored_counts() == (300, 300)
+    assert main_state() == (2, '300')
+    assert db.get_since_id(screen_name='wwt_dev') is None
+
+    return None
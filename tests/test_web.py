@@ -0,0 +1,559 @@
+#!/usr/bin/env pytest
+""" Tests for web/web.py. """
+
+# Imports - Python Standard Library
+from datetime import datetime
+from types import SimpleNamespace
+from pathlib import Path
+from typing import Dict, Tuple
+import gzip
+from unittest.mock import MagicMock, patch
+from wsgiref.util import setup_testing_defaults
+
+# Imports - Third-Party
+from pytest import fixture, raises
+
+# Imports - Local
+from app.db import cache
+from app.db.db import TweetPage
+from app.web import assets, web
+
+# Constants
+DATASET_VERSION = (2, datetime(2022, 3, 1, 12, 0, 0))
+
+
+# Functions
+def wsgi_get(
+    path: str,
+    headers: Dict = None
+) -> Tuple[str, Dict, bytes]:
+    """ Send a GET request to the bottle app through its WSGI interface.
+
+        Args:
+            path (str):
+                Request path.
+
+            headers (Dict, optional):
+                WSGI environ request headers, such as HTTP_IF_NONE_MATCH.
+                Default value is None.
+
+        Returns:
+            status, headers, body (Tuple[str, Dict, bytes]):
+                Response status line, headers, and body.
+    """
+
+    environ = {'PATH_INFO': path}
+    environ.update(headers or {})
+    setup_testing_defaults(environ)
+    started = {}
+
+    def start_response(status, response_headers, exc_info=None):
+        started['status'] = status
+        started['headers'] = dict(response_headers)
+
+    body = b''.join(web.app(environ, start_response))
+
+    return started['status'], started['headers'], body
+
+
+# pytest fixtures
+@fixture
+def cache_mock() -> Dict[str, MagicMock]:
+    """ A pytest fixture to mock the cached queries and dataset version.
+
+        Args:
+            None.
+
+        Returns:
+            mocks (Dict[str, MagicMock]):
+                Mocks of cache.get_tweets and cache.get_hashtags.
+    """
+
+    with patch.object(
+        target=cache.query_cache,
+        attribute='version',
+        return_value=DATASET_VERSION
+    ), patch.object(
+        target=cache,
+        attribute='get_tweets',
+        return_value=TweetPage()
+    ) as get_tweets, patch.object(
+        target=cache,
+        attribute='get_hashtags',
+        return_value=[]
+    ) as get_hashtags, patch.object(
+        target=web,
+        attribute='APP_RELEASED',
+        new=datetime(2022, 1, 1)
+    ):
+        web.page_cache.clear()
+        web.fragment_cache.clear()
+        yield {'get_tweets': get_tweets, 'get_hashtags': get_hashtags}
+
+
+# Test functions
+@patch.object(
+    target=web,
+    attribute='run'
+)
+def test_main_development(
+    mock_run: MagicMock
+) -> None:
+    """ Test the main function runs the bottle development server.
+
+        Args:
+            mock_run (unittest.mock.MagicMock):
+                Mock of the bottle run function.
+
+        Returns:
+            None.
+    """
+
+    web.main(mode='development')
+
+    assert 'server' not in mock_run.call_args.kwargs
+    assert mock_run.call_args.kwargs['reloader'] is web.APP_RELOADER
+
+    return None
+
+
+@patch.object(
+    target=web.db,
+    attribute='set_pool_size'
+)
+@patch.object(
+    target=web,
+    attribute='run'
+)
+def test_main_production(
+    mock_run: MagicMock,
+    mock_set_pool_size: MagicMock
+) -> None:
+    """ Test the main function runs pre-forked, threaded workers.
+
+        Args:
+            mock_run (unittest.mock.MagicMock):
+                Mock of the bottle run function.
+
+            mock_set_pool_size (unittest.mock.MagicMock):
+                Mock of the db.set_pool_size function.
+
+        Returns:
+            None.
+    """
+
+    # The default workers fit in the database connection budget
+    assert web.APP_WORKERS * web.APP_THREADS <= web.APP_DB_CONNECTIONS
+
+    web.main(mode='production')
+
+    # Each worker pools a connection per thread, without overflow
+    mock_set_pool_size.assert_called_once_with(
+        pool_size=web.APP_THREADS,
+        max_overflow=0
+    )
+
+    kwargs = mock_run.call_args.kwargs
+
+    assert kwargs['server'] == web.APP_SERVER
+    assert kwargs['debug'] is False
+    assert kwargs['reloader'] is False
+    assert kwargs['workers'] == web.APP_WORKERS
+    assert kwargs['threads'] == web.APP_THREADS
+    assert kwargs['worker_class'] == 'gthread'
+
+    # Unknown modes are rejected, instead of running the wrong server
+    with raises(ValueError):
+        web.main(mode='staging')
+
+    # Workers that would exhaust the database connections are rejected
+    with patch.object(target=web, attribute='APP_WORKERS', new=13), \
+            raises(ValueError, match='APP_DB_CONNECTIONS'):
+        web.main(mode='production')
+
+    assert mock_run.call_count == 1
+
+    return None
+
+
+def test_index_conditional(
+    cache_mock: Dict[str, MagicMock]
+) -> None:
+    """ Test the index route validators and 304 responses.
+
+        Args:
+            cache_mock (Dict[str, MagicMock]):
+                Mocks of the cached query functions.
+
+        Returns:
+            None.
+    """
+
+    status, headers, body = wsgi_get(path='/')
+
+    assert status == '200 OK'
+    assert headers['Etag'] == f'W/"2-{web.APP_RELEASE}"'
+    assert headers['Last-Modified'] == 'Tue, 01 Mar 2022 12:00:00 GMT'
+    assert headers['Cache-Control'] == web.APP_CACHE_CONTROL
+    assert cache_mock['get_tweets'].call_count == 1
+
+    # A current ETag or date gets a 304, without queries or rendering
+    for conditional_headers in (
+        {'HTTP_IF_NONE_MATCH': f'"x", {headers["Etag"]}'},
+        {'HTTP_IF_MODIFIED_SINCE': headers['Last-Modified']}
+    ):
+        status, not_modified_headers, body = wsgi_get(
+            path='/',
+            headers=conditional_headers
+        )
+
+        assert status == '304 Not Modified'
+        assert body == b''
+        assert not_modified_headers['Etag'] == headers['Etag']
+        assert not_modified_headers['Last-Modified'] == \
+            headers['Last-Modified']
+        assert 'Content-Type' not in not_modified_headers
+
+    assert cache_mock['get_tweets'].call_count == 1
+
+    # If-None-Match takes precedence over If-Modified-Since
+    status, _, _ = wsgi_get(
+        path='/',
+        headers={
+            'HTTP_IF_NONE_MATCH': 'W/"1-old"',
+            'HTTP_IF_MODIFIED_SINCE': headers['Last-Modified']
+        }
+    )
+
+    assert status == '200 OK'
+
+    return None
+
+
+def test_index_page_cache(
+    cache_mock: Dict[str, MagicMock]
+) -> None:
+    """ Test rendered pages and tweet fragments are cached.
+
+        Args:
+            cache_mock (Dict[str, MagicMock]):
+                Mocks of the cached query functions.
+
+        Returns:
+            None.
+    """
+
+    tweets = [
+        SimpleNamespace(
+            tweet_id=str(tweet_id),
+            tweet_text=f'Tweet {tweet_id} #wwt',
+            likes=tweet_id,
+            retweets=0,
+            created=datetime(2022, 3, 1),
+            screen_name=screen_name
+        )
+        for tweet_id, screen_name in enumerate(('wwt_inc', 'wwt_dev', None))
+    ]
+    cache_mock['get_tweets'].return_value = TweetPage(tweets)
+
+    with patch.object(
+        target=web,
+        attribute='template',
+        wraps=web.template
+    ) as mock_template:
+        _, _, body = wsgi_get(path='/')
+        _, _, cached_body = wsgi_get(path='/')
+
+        # The second request is sent from the page cache
+        assert cached_body == body
+        assert b'Tweet 2 #wwt' in body
+
+        # Tweets link to their account, or to the default account
+        assert b'https://twitter.com/wwt_dev/status/1"' in body
+        assert b'https://twitter.com/wwt_inc/status/2"' in body
+        assert cache_mock['get_tweets'].call_count == 1
+        assert mock_template.call_count == len(tweets) + 1
+
+        # Another page renders again, but shares the tweet fragments
+        wsgi_get(path='/wwt')
+
+        assert cache_mock['get_tweets'].call_count == 2
+        assert mock_template.call_count == len(tweets) + 2
+
+        # Only tweets with new counts are rendered again
+        tweets[0].likes += 1
+        wsgi_get(path='/wwt/')
+
+        assert mock_template.call_count == len(tweets) + 4
+
+    return None
+
+
+def test_api_tweets(
+    cache_mock: Dict[str, MagicMock]
+) -> None:
+    """ Test the tweets API pages, field selection, and errors.
+
+        Args:
+            cache_mock (Dict[str, MagicMock]):
+                Mocks of the cached query functions.
+
+        Returns:
+            None.
+    """
+
+    page = TweetPage([
+        SimpleNamespace(tweet_id='2', likes=5, created=datetime(2022, 3, 1))
+    ])
+    page.next_cursor = 'older'
+    cache_mock['get_tweets'].return_value = page
+
+    status, headers, body = wsgi_get(
+        path='/api/tweets',
+        headers={'QUERY_STRING': 'hashtag=wwt&limit=1&fields=tweet_id,created'}
+    )
+
+    assert status == '200 OK'
+    assert headers['Content-Type'] == web.API_CONTENT_TYPE
+    assert 'Etag' in headers
+    assert headers['Link'] == (
+        '</api/tweets?hashtag=wwt&limit=1&fields=tweet_id%2Ccreated'
+        '&cursor=older>; rel="next"'
+    )
+    assert body == b'{"tweet_id":"2","created":"2022-03-01T00:00:00"}\n'
+    assert cache_mock['get_tweets'].call_args.kwargs == {
+        'search_tag': '#wwt',
+        'limit': 1,
+        'cursor': None
+    }
+
+    for query_string in (
+        'fields=id',
+        'limit=0',
+        f'limit={web.API_MAX_LIMIT + 1}',
+        'hashtag=ab',
+        'hashtag=%23',
+        'hashtag=w-w'
+    ):
+        status, _, _ = wsgi_get(
+            path='/api/tweets',
+            headers={'QUERY_STRING': query_string}
+        )
+
+        assert status == '400 Bad Request'
+
+    # Invalid hashtags are rejected before any tweets are read
+    assert cache_mock['get_tweets'].call_count == 1
+
+    return None
+
+
+@patch.object(
+    target=web,
+    attribute='API_STREAM_CHUNK_SIZE',
+    new=2
+)
+@patch.object(
+    target=web.db,
+    attribute='remove_session'
+)
+@patch.object(
+    target=web.db,
+    attribute='stream_tweets',
+    return_value=iter([{'tweet_id': str(index)} for index in range(3)])
+)
+def test_api_tweets_stream(
+    mock_stream_tweets: MagicMock,
+    mock_remove_session: MagicMock,
+    cache_mock: Dict[str, MagicMock]
+) -> None:
+    """ Test the tweets API streams all tweets in chunks.
+
+        Args:
+            mock_stream_tweets (unittest.mock.MagicMock):
+                Mock of the db.stream_tweets function.
+
+            mock_remove_session (unittest.mock.MagicMock):
+                Mock of the db.remove_session function.
+
+            cache_mock (Dict[str, MagicMock]):
+                Mocks of the cached query functions.
+
+        Returns:
+            None.
+    """
+
+    environ = {'PATH_INFO': '/api/tweets', 'QUERY_STRING': 'fields=tweet_id'}
+    setup_testing_defaults(environ)
+    started = {}
+
+    def start_response(status, response_headers, exc_info=None):
+        started['headers'] = dict(response_headers)
+
+    chunks = list(web.app(environ, start_response))
+
+    # The response has no Content-Length, so it is sent in chunks
+    assert 'Content-Length' not in started['headers']
+    assert chunks == [
+        b'{"tweet_id":"0"}\n{"tweet_id":"1"}\n',
+        b'{"tweet_id":"2"}\n'
+    ]
+    assert mock_stream_tweets.call_args.kwargs == {
+        'search_tag': None,
+        'fields': ['tweet_id']
+    }
+    assert mock_remove_session.called
+    assert not cache_mock['get_tweets'].called
+
+    return None
+
+
+def test_api_hashtags(
+    cache_mock: Dict[str, MagicMock]
+) -> None:
+    """ Test the hashtags API prefix filter and pages.
+
+        Args:
+            cache_mock (Dict[str, MagicMock]):
+                Mocks of the cached query functions.
+
+        Returns:
+            None.
+    """
+
+    cache_mock['get_hashtags'].return_value = [
+        SimpleNamespace(name=name, count=count)
+        for name, count in (('cloud', 3), ('code', 2), ('data', 4), ('wwt', 9))
+    ]
+
+    status, headers, body = wsgi_get(
+        path='/api/hashtags',
+        headers={'QUERY_STRING': 'hashtag=%23c&limit=1'}
+    )
+
+    assert status == '200 OK'
+    assert body == b'{"name":"cloud","count":3}\n'
+    assert headers['Link'] == (
+        '</api/hashtags?hashtag=%23c&limit=1&cursor=cloud>; rel="next"'
+    )
+
+    # The last page has no next link
+    status, headers, body = wsgi_get(
+        path='/api/hashtags',
+        headers={'QUERY_STRING': 'hashtag=c&limit=1&cursor=cloud&fields=name'}
+    )
+
+    assert body == b'{"name":"code"}\n'
+    assert 'Link' not in headers
+
+    return None
+
+
+def test_index_compressed(
+    cache_mock: Dict[str, MagicMock]
+) -> None:
+    """ Test pages are compressed for clients that accept gzip.
+
+        Args:
+            cache_mock (Dict[str, MagicMock]):
+                Mocks of the cached query functions.
+
+        Returns:
+            None.
+    """
+
+    _, headers, body = wsgi_get(path='/')
+
+    assert 'Content-Encoding' not in headers
+    assert headers['Vary'] == 'Accept-Encoding'
+
+    for accept_encoding in ('gzip, deflate', 'gzip;q=0.5', '*'):
+        with patch.object(
+            target=assets,
+            attribute='ENCODINGS',
+            new=('gzip',)
+        ):
+            _, headers, gzip_body = wsgi_get(
+                path='/',
+                headers={'HTTP_ACCEPT_ENCODING': accept_encoding}
+            )
+
+        assert headers['Content-Encoding'] == 'gzip'
+        assert gzip.decompress(gzip_body) == body
+
+    # Refused encodings and small bodies are not compressed
+    _, headers, _ = wsgi_get(
+        path='/',
+        headers={'HTTP_ACCEPT_ENCODING': 'gzip;q=0'}
+    )
+
+    assert 'Content-Encoding' not in headers
+
+    with patch.object(
+        target=web,
+        attribute='APP_COMPRESS_MIN_SIZE',
+        new=10**6
+    ):
+        _, headers, _ = wsgi_get(
+            path='/api/hashtags',
+            headers={'HTTP_ACCEPT_ENCODING': 'gzip'}
+        )
+
+    assert 'Content-Encoding' not in headers
+
+    return None
+
+
+def test_send_static_fingerprinted(
+    tmp_path: Path
+) -> None:
+    """ Test fingerprinted assets are immutable and precompressed.
+
+        Args:
+            tmp_path (pathlib.Path):
+                pytest temporary directory, used as the static directory.
+
+        Returns:
+            None.
+    """
+
+    (tmp_path / 'css').mkdir()
+    (tmp_path / 'css' / 'style.css').write_bytes(
+        b'body { margin: 0; }\n' * 100
+    )
+    manifest = assets.build(static_path=tmp_path)
+
+    with patch.object(
+        target=web,
+        attribute='APP_STATIC_PATH',
+        new=str(tmp_path)
+    ), patch.object(
+        target=web,
+        attribute='static_manifest',
+        new=manifest
+    ), patch.object(
+        target=web,
+        attribute='static_fingerprints',
+        new=set(manifest.values())
+    ):
+        url = web.static_url(filename='css/style.css')
+        status, headers, body = wsgi_get(
+            path=url,
+            headers={'HTTP_ACCEPT_ENCODING': 'gzip'}
+        )
+
+        assert url == f"/static/{manifest['css/style.css']}"
+        assert status == '200 OK'
+        assert headers['Cache-Control'] == web.APP_STATIC_CACHE_CONTROL
+        assert headers['Content-Encoding'] == 'gzip'
+        assert headers['Content-Type'].startswith('text/css')
+        assert gzip.decompress(body) == (
+            tmp_path / 'css' / 'style.css'
+        ).read_bytes()
+
+        # The original file is sent without the long-lived cache header
+        _, headers, _ = wsgi_get(path='/static/css/style.css')
+
+        assert 'Cache-Control' not in headers
+
+    return None